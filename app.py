@@ -1,5 +1,5 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response
-import sqlite3, os, json
+from flask import Flask, render_template, request, redirect, url_for, jsonify, flash, Response, stream_with_context
+import sqlite3, os, json, io
 from datetime import datetime
 from werkzeug.utils import secure_filename
 from ultralytics import YOLO
@@ -9,13 +9,28 @@ from werkzeug.exceptions import RequestEntityTooLarge
 import folium
 import requests
 import tempfile
+import time
 from dotenv import load_dotenv
+from inference_batcher import BatchInferenceScheduler
+from inference_pool import InferenceWorkerPool, is_inference_worker
+from classification_queue import ClassificationQueue, ClassificationWorkerPool
+from detection_cache import DetectionCache, file_fingerprint
+from stream_monitor import StreamMonitor, parse_stream_sources
+from model_backends import backend_path
+from article_store import ArticleStore
+from article_warehouse import ArticleWarehouse, query_filters
+from dashboard_rollups import init_dashboard_rollups, monthly_report_count
+from spatial_index import init_spatial_index, incidents_in_bbox, incidents_within_radius
+from render_cache import RenderCache, init_data_version, data_version
+from gemini_stream import DEFAULT_BASE_URL, stream_url, stream_text, sse_answer
 
 # Load environment variables from .env file
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+# GEMINI_BASE_URL can point at a local mock server (benchmarks/mock_gemini.py)
+GEMINI_URL = f"{os.getenv('GEMINI_BASE_URL', DEFAULT_BASE_URL)}/models/gemini-2.0-flash:generateContent"
+GEMINI_STREAM_URL = stream_url(GEMINI_URL)
 GEMINI_HEADERS = {
     "Content-Type": "application/json",
     "X-goog-api-key": GEMINI_API_KEY
@@ -31,145 +46,161 @@ UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Load model and class definitions
-model = YOLO("model/best.pt")
+# Video files that /stream-monitor may open by name
+STREAM_FOLDER = os.getenv('STREAM_FOLDER', 'static/videos')
+# Live cameras /stream-monitor may open, by name: "gate=rtsp://10.0.0.5/live,yard=rtsp://...".
+# Requests pass the name, never a URL, so the server only connects where configured
+STREAM_SOURCES = parse_stream_sources(os.getenv('STREAM_SOURCES', ''))
+STREAM_TARGET_FPS = float(os.getenv('STREAM_TARGET_FPS', '5'))
+
+# Grid cells per map tile width when clustering incidents for /api/incidents/clusters
+CLUSTER_CELLS_PER_TILE = int(os.getenv('CLUSTER_CELLS_PER_TILE', '8'))
+
+# Run /detect-json on the decoded image in memory instead of a temp JPEG on disk
+IN_MEMORY_INFERENCE = os.getenv('IN_MEMORY_INFERENCE', '1') != '0'
+
+# Load model and class definitions. MODEL_BACKEND selects an export made by
+# export_model.py: pytorch, onnx, onnx-int8, openvino or openvino-int8
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'pytorch')
+MODEL_PATH = backend_path(MODEL_BACKEND)
+model = YOLO(MODEL_PATH, task='detect')
 CLASS_NAMES = ['Hardhat','Mask','NO-Hardhat','NO-Mask','NO-Safety Vest',
                'Person','Safety Cone','Safety Vest','machinery','vehicle']
 PPE = {"Hardhat","Mask","Safety Vest"}
 VIOL = {"NO-Hardhat","NO-Mask","NO-Safety Vest"}
+PERSON_CLASS = CLASS_NAMES.index("Person")
+
+# How PPE/violation boxes are matched to people: 'center' (center distance in px),
+# 'iou' (box overlap) or 'containment' (share of the label box inside the person box)
+ASSOCIATION_METHOD = os.getenv('PPE_ASSOCIATION_METHOD', 'center')
+ASSOCIATION_THRESHOLDS = {
+    'center': float(os.getenv('PPE_MAX_CENTER_DISTANCE', '200')),
+    'iou': float(os.getenv('PPE_MIN_IOU', '0.01')),
+    'containment': float(os.getenv('PPE_MIN_CONTAINMENT', '0.5'))
+}
+
+# Batch images from concurrent requests and multi-photo reports into one forward pass
+INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', '8'))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '10'))
+# Longest a request or classification worker waits for its boxes before giving up
+INFERENCE_TIMEOUT = float(os.getenv('INFERENCE_TIMEOUT_SECONDS', '120'))
+inference_scheduler = BatchInferenceScheduler(model,
+                                              max_batch=INFERENCE_MAX_BATCH,
+                                              max_wait_ms=INFERENCE_MAX_WAIT_MS)
+
+# Optionally run inference in separate worker processes to use more CPU cores.
+# Created before any threads start so the workers can fork with the loaded model.
+# Restarted workers are spawned and import this module again; they must not start
+# a pool or classification workers of their own.
+INFERENCE_PROCESSES = int(os.getenv('INFERENCE_PROCESSES', '0'))
+INFERENCE_WORKER = is_inference_worker()
+inference_pool = None
+if INFERENCE_PROCESSES > 0 and not INFERENCE_WORKER:
+    inference_pool = InferenceWorkerPool(MODEL_PATH,
+                                         workers=INFERENCE_PROCESSES,
+                                         max_batch=INFERENCE_MAX_BATCH,
+                                         model=model)
+
+# Report photos are classified by background workers draining a SQLite job queue.
+# Workers share the batch scheduler, so enough of them to fill a batch keeps it busy.
+# Set CLASSIFY_WORKERS=0 to run them only in separate `python classification_queue.py` processes.
+CLASSIFY_WORKERS = int(os.getenv('CLASSIFY_WORKERS', str(INFERENCE_MAX_BATCH)))
+os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+classification_queue = ClassificationQueue(DB_PATH)
+
+# Report count rollups and indexes that keep dashboard queries to index lookups
+init_dashboard_rollups(DB_PATH)
+
+# Trigger-maintained R*Tree over report coordinates for radius and bbox queries
+SPATIAL_INDEX = init_spatial_index(DB_PATH)
+
+# The folium map is rendered once per reports-table version and shared by every viewer
+init_data_version(DB_PATH)
+map_render_cache = RenderCache('incident map')
+
+# Skip inference for images already analyzed with the same weights and association settings
+DETECTION_CACHE_DB = os.getenv('DETECTION_CACHE_DB', 'db/detection_cache.db')
+detection_cache = DetectionCache(
+    DETECTION_CACHE_DB,
+    model_fingerprint=f"{file_fingerprint(MODEL_PATH)[:16]}-{ASSOCIATION_METHOD}-{ASSOCIATION_THRESHOLDS[ASSOCIATION_METHOD]}",
+    memory_items=int(os.getenv('DETECTION_CACHE_ITEMS', '256')),
+    max_bytes=int(os.getenv('DETECTION_CACHE_MAX_MB', '64')) * 1024 * 1024
+)
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def image_to_array(img):
+    """Convert a decoded PIL RGB image to the BGR uint8 array layout YOLO expects"""
+    return cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)
+
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
-def load_processed_articles():
-    """Load processed health & safety articles from JSON file"""
-    try:
-        # Look for the most recent processed articles file
-        processed_files = [f for f in os.listdir('.') if f.startswith('processed_articles_') and f.endswith('.json')]
-        if not processed_files:
-            return []
-        
-        # Get the most recent file
-        latest_file = max(processed_files, key=lambda x: os.path.getctime(x))
-        
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        articles = data.get('articles', [])
-        
-        # Filter articles that have Gemini summaries and content
-        processed_articles = []
-        for article in articles:
-            if article.get('gemini_summary') and article.get('content'):
-                processed_articles.append(article)
-                
-        return processed_articles[:20]  # Limit to 20 most recent
-        
-    except Exception as e:
-        print(f"Error loading processed articles: {str(e)}")
-        return []
+# Every scraped and processed article across all runs (see article_warehouse.py).
+# Point ARTICLE_WAREHOUSE_DB at the orchestrator's warehouse to share it;
+# processed_articles_*.json files in the working directory are imported too
+ARTICLE_WAREHOUSE_DB = os.getenv('ARTICLE_WAREHOUSE_DB', 'db/articles.db')
+article_warehouse = ArticleWarehouse(ARTICLE_WAREHOUSE_DB)
 
-def calculate_news_metrics(articles):
-    """Calculate metrics from processed articles"""
-    metrics = {
-        'total_articles': len(articles),
-        'high_risk': 0,
-        'medium_risk': 0,
-        'low_risk': 0,
-        'total_fines': 0,
-        'construction_incidents': 0,
-        'severity_distribution': {},
-        'incident_types': {},
-        'recent_companies': []
-    }
-    
-    for article in articles:
-        summary = article.get('gemini_summary', {})
-        if not summary:
-            continue
-            
-        # Count severity levels
-        severity = summary.get('severity', 'Unknown')
-        if severity in ['Critical', 'High']:
-            metrics['high_risk'] += 1
-        elif severity == 'Medium':
-            metrics['medium_risk'] += 1
-        elif severity == 'Low':
-            metrics['low_risk'] += 1
-            
-        # Track severity distribution
-        metrics['severity_distribution'][severity] = metrics['severity_distribution'].get(severity, 0) + 1
-        
-        # Track incident types
-        incident_type = summary.get('type', 'Unknown')
-        metrics['incident_types'][incident_type] = metrics['incident_types'].get(incident_type, 0) + 1
-        
-        # Count construction incidents
-        industry = summary.get('industry', '')
-        if 'construction' in industry.lower():
-            metrics['construction_incidents'] += 1
-            
-        # Sum fines
-        fine = summary.get('fine', '')
-        if fine and fine != 'None' and '£' in str(fine):
-            try:
-                fine_amount = int(str(fine).replace('£', '').replace(',', ''))
-                metrics['total_fines'] += fine_amount
-            except:
-                pass
-                
-        # Collect company names
-        company = summary.get('company', '')
-        if company and company != 'Unknown' and len(company) > 3:
-            if company not in metrics['recent_companies']:
-                metrics['recent_companies'].append(company)
-                
-    return metrics
-
-def get_trend_data(articles):
-    """Generate trend data for charts"""
-    # Group articles by date for trend analysis
-    daily_counts = {}
-    severity_trends = {'Critical': [], 'High': [], 'Medium': [], 'Low': []}
-    
-    for article in articles:
-        # Extract date from scraped_at or processed_at
-        date_str = article.get('scraped_at', '') or article.get('processed_at', '')
-        if date_str:
-            try:
-                date = datetime.fromisoformat(date_str.replace('Z', '')).strftime('%Y-%m-%d')
-                daily_counts[date] = daily_counts.get(date, 0) + 1
-                
-                # Track severity by date
-                summary = article.get('gemini_summary', {})
-                severity = summary.get('severity')
-                if severity in severity_trends:
-                    severity_trends[severity].append({'date': date, 'count': 1})
-            except:
-                continue
-                
-    # Convert to chart-friendly format
-    dates = sorted(daily_counts.keys())[-7:]  # Last 7 days
-    trend_data = [{'date': date, 'incidents': daily_counts.get(date, 0)} for date in dates]
+# The most recent articles, with metrics and trends aggregated over the whole
+# history in SQL, reused until the warehouse version changes
+article_store = ArticleStore('.', warehouse=article_warehouse, derive=lambda articles: {
+    'metrics': article_warehouse.news_metrics(),
+    'trends': article_warehouse.daily_counts(7)
+})
+
+def box_centers(boxes):
+    """Centers of an (N, 4+) array of [x1,y1,x2,y2,...] boxes"""
+    return (boxes[:, :2] + boxes[:, 2:4]) / 2
+
+def pairwise_overlap(label_boxes, person_boxes, method):
+    """(labels, persons) matrix of IoU or containment of each label box in each person box"""
+    x1 = np.maximum(label_boxes[:, None, 0], person_boxes[None, :, 0])
+    y1 = np.maximum(label_boxes[:, None, 1], person_boxes[None, :, 1])
+    x2 = np.minimum(label_boxes[:, None, 2], person_boxes[None, :, 2])
+    y2 = np.minimum(label_boxes[:, None, 3], person_boxes[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
     
-    return trend_data
+    label_area = (label_boxes[:, 2] - label_boxes[:, 0]) * (label_boxes[:, 3] - label_boxes[:, 1])
+    if method == 'containment':
+        return inter / np.maximum(label_area[:, None], 1e-9)
+    if method == 'iou':
+        person_area = (person_boxes[:, 2] - person_boxes[:, 0]) * (person_boxes[:, 3] - person_boxes[:, 1])
+        union = label_area[:, None] + person_area[None, :] - inter
+        return inter / np.maximum(union, 1e-9)
+    raise ValueError(f"Unknown association method: {method}")
 
-def get_center(box):
-    # Handle both formats: [x1,y1,x2,y2] and [x1,y1,x2,y2,conf,cls]
-    if len(box) >= 4:
-        x1,y1,x2,y2 = box[:4]  # Take only first 4 values
-        return ((x1+x2)/2,(y1+y2)/2)
+def associate_detections(label_boxes, person_boxes, method=None, threshold=None):
+    """
+    Assign every label box to its best matching person in one vectorized pass.
+    Returns an array of person indices, -1 where no person is close enough.
+    """
+    method = method or ASSOCIATION_METHOD
+    if threshold is None:
+        threshold = ASSOCIATION_THRESHOLDS[method]
+    
+    if len(label_boxes) == 0 or len(person_boxes) == 0:
+        return np.full(len(label_boxes), -1, dtype=int)
+    
+    rows = np.arange(len(label_boxes))
+    if method == 'center':
+        diff = box_centers(label_boxes)[:, None, :] - box_centers(person_boxes)[None, :, :]
+        dist = np.sqrt((diff ** 2).sum(axis=2))
+        owners = dist.argmin(axis=1)
+        matched = dist[rows, owners] < threshold
     else:
-        raise ValueError(f"Box must have at least 4 coordinates, got {len(box)}")
+        overlap = pairwise_overlap(label_boxes, person_boxes, method)
+        owners = overlap.argmax(axis=1)
+        matched = overlap[rows, owners] >= threshold
+    
+    return np.where(matched, owners, -1)
 
 def get_incidents_from_db():
-    """Fetch incident data from the database"""
+    """Fetch incident data from the database; a failed read raises rather than looking like no incidents"""
     try:
         conn = get_db_connection()
         # Fetch incidents with location data (latitude and longitude not null)
@@ -197,7 +228,7 @@ def get_incidents_from_db():
         return incidents_list
     except Exception as e:
         print(f"Error fetching incidents from database: {str(e)}")
-        return []
+        raise
 
 def get_incident_color(incident_type):
     """Get marker color based on incident type"""
@@ -211,8 +242,80 @@ def get_incident_color(incident_type):
     }
     return color_map.get(incident_type, 'gray')
 
+def parse_bbox(value):
+    """Parse a 'west,south,east,north' query value into floats"""
+    west, south, east, north = [float(v) for v in value.split(',')]
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise ValueError("bbox must be west,south,east,north within valid coordinates")
+    return west, south, east, north
+
+def get_incident_clusters(conn, bbox, zoom):
+    """
+    Cluster incidents inside a bounding box on a lat/long grid sized for the
+    zoom level. Grouping happens in SQLite, so only one row per occupied cell
+    leaves the database however many incidents the view contains.
+    """
+    west, south, east, north = bbox
+    # Roughly CLUSTER_CELLS_PER_TILE cells across each 256px map tile
+    cell = 360.0 / (2 ** max(0, min(int(zoom), 22)) * CLUSTER_CELLS_PER_TILE)
+    
+    cells = conn.execute("""
+        SELECT CAST((latitude + 90) / ? AS INTEGER) AS gy,
+               CAST((longitude + 180) / ? AS INTEGER) AS gx,
+               COUNT(*) AS count, AVG(latitude) AS lat, AVG(longitude) AS lon,
+               MAX(id) AS id, MAX(created_at) AS latest
+        FROM reports
+        WHERE latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?
+        GROUP BY gy, gx
+    """, (cell, cell, south, north, west, east)).fetchall()
+    
+    # Full details only for cells holding a single incident
+    single_ids = [c['id'] for c in cells if c['count'] == 1]
+    details = {}
+    for i in range(0, len(single_ids), 500):
+        chunk = single_ids[i:i + 500]
+        rows = conn.execute(f"""
+            SELECT id, incident_type, description, created_at, company_name
+            FROM reports WHERE id IN ({','.join('?' * len(chunk))})
+        """, chunk).fetchall()
+        details.update({r['id']: r for r in rows})
+    
+    features = []
+    for c in cells:
+        geometry = {'type': 'Point', 'coordinates': [c['lon'], c['lat']]}
+        detail = details.get(c['id']) if c['count'] == 1 else None
+        if detail:
+            incident_type = detail['incident_type'] or 'Unknown'
+            properties = {
+                'cluster': False,
+                'count': 1,
+                'id': detail['id'],
+                'type': incident_type,
+                'description': detail['description'] or 'No description',
+                'company': detail['company_name'] or 'Unknown Company',
+                'timestamp': detail['created_at'],
+                'color': get_incident_color(incident_type)
+            }
+        else:
+            properties = {'cluster': True, 'count': c['count'], 'latest': c['latest']}
+        features.append({'type': 'Feature', 'geometry': geometry, 'properties': properties})
+    
+    return {
+        'type': 'FeatureCollection',
+        'features': features,
+        'total': sum(c['count'] for c in cells),
+        'zoom': zoom,
+        'cell_size': cell
+    }
+
 def generate_incident_map():
-    """Generate Folium map with real incident data"""
+    """
+    Generate Folium map with real incident data
+    
+    Errors are raised rather than rendered as a fallback map, so the render
+    cache never keeps the fallback for this data version; /map-data serves
+    basic_incident_map() instead.
+    """
     try:
         # Get incidents from database
         incidents = get_incidents_from_db()
@@ -303,9 +406,27 @@ def generate_incident_map():
         
     except Exception as e:
         print(f"Error generating map: {str(e)}")
-        # Return a basic map if there's an error
-        basic_map = folium.Map(location=[5.5, -59.5], zoom_start=6)
-        return basic_map._repr_html_()
+        raise
+
+def basic_incident_map():
+    """Map without incidents, shown when the incident map cannot be generated"""
+    basic_map = folium.Map(location=[5.5, -59.5], zoom_start=6)
+    return basic_map._repr_html_()
+
+def detect_frames(frames):
+    """Run YOLO over BGR arrays, returning one (N, 6) [x1,y1,x2,y2,conf,cls] array each"""
+    backend = inference_pool if inference_pool is not None else inference_scheduler
+    futures = [backend.submit(frame) for frame in frames]
+    # Bounded wait: a stuck backend surfaces as TimeoutError instead of hanging the thread
+    deadline = time.monotonic() + INFERENCE_TIMEOUT
+    results = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+    if inference_pool is None:
+        results = [r.boxes.data.cpu().numpy() for r in results]
+    return results
+
+def detect_boxes(image):
+    """Run YOLO on one BGR array and return its (N, 6) boxes"""
+    return detect_frames([image])[0]
 
 def analyze_detections(results):
     try:
@@ -318,52 +439,56 @@ def analyze_detections(results):
         if results[0].boxes.data is None or len(results[0].boxes.data) == 0:
             return ["No objects detected"]
         
-        persons, labels = [], []
-        arr = results[0].boxes.data.cpu().numpy()
+        return analyze_boxes(results[0].boxes.data.cpu().numpy())
         
-        for b in arr:
-            if len(b) < 6:  # Ensure we have all required values
-                continue
-                
-            x1,y1,x2,y2,conf,cls = b
-            cls_idx = int(cls)
-            
-            if cls_idx >= len(CLASS_NAMES):  # Validate class index
-                continue
-                
-            label = CLASS_NAMES[cls_idx]
-            labels.append((label,[x1,y1,x2,y2]))
-            
-            if label=="Person":
-                persons.append({"box":[x1,y1,x2,y2],"ppe":set(),"violations":set()})
+    except Exception as e:
+        print(f"Error in analyze_detections: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return ["Analysis error occurred"]
+
+def person_violations(arr):
+    """[{"box", "violations"}] for each person in an (N, 6) array of detection boxes"""
+    if len(arr) == 0 or arr.ndim != 2 or arr.shape[1] < 6:
+        return []
+    
+    # Validate class indices
+    cls_idx = arr[:, 5].astype(int)
+    valid = (cls_idx >= 0) & (cls_idx < len(CLASS_NAMES))
+    boxes, cls_idx = arr[valid, :4], cls_idx[valid]
+    
+    is_person = cls_idx == PERSON_CLASS
+    person_boxes = boxes[is_person]
+    if len(person_boxes) == 0:
+        return []
+    
+    # Associate PPE and violations with persons
+    label_cls = cls_idx[~is_person]
+    owners = associate_detections(boxes[~is_person], person_boxes)
+    
+    persons = [{"box": box, "violations": set()} for box in person_boxes]
+    for cls, owner in zip(label_cls[owners >= 0], owners[owners >= 0]):
+        label = CLASS_NAMES[cls]
+        if label in VIOL:
+            persons[owner]["violations"].add(label)
+    
+    return persons
+
+def analyze_boxes(arr):
+    """Per-person violations from an (N, 6) array of detection boxes"""
+    try:
+        if len(arr) == 0:
+            return ["No objects detected"]
+        
+        if arr.ndim != 2 or arr.shape[1] < 6:  # Ensure we have all required values
+            return ["No objects detected"]
+        
+        persons = person_violations(arr)
         
         # If no persons detected, return empty analysis
         if not persons:
             return ["No persons detected in image"]
         
-        # Associate PPE and violations with persons
-        for label,box in labels:
-            if label=="Person": 
-                continue
-                
-            c = get_center(box)
-            closest,dist = None,float("inf")
-            
-            for p in persons:
-                try:
-                    d = np.linalg.norm(np.array(c)-np.array(get_center(p["box"])))
-                    if d<dist:
-                        dist,closest = d,p
-                except Exception as e:
-                    print(f"Error calculating distance: {e}")
-                    continue
-            
-            if closest and dist<200:
-                if label in PPE: 
-                    closest["ppe"].add(label)
-                if label in VIOL: 
-                    closest["violations"].add(label)
-        
         # Generate results for each person
         results_list = []
         for p in persons:
@@ -375,11 +500,31 @@ def analyze_detections(results):
         return results_list
         
     except Exception as e:
-        print(f"Error in analyze_detections: {str(e)}")
+        print(f"Error in analyze_boxes: {str(e)}")
         import traceback
         traceback.print_exc()
         return ["Analysis error occurred"]
 
+def remember_detections(cache_key, vio):
+    """Cache analysis results unless the analysis itself failed"""
+    if vio != ["Analysis error occurred"]:
+        detection_cache.put(cache_key, vio)
+
+def classify_photo(path):
+    """Run PPE detection on a saved report photo, reusing cached results"""
+    with open(path, 'rb') as f:
+        image_bytes = f.read()
+    
+    cache_key = detection_cache.key_for(image_bytes)
+    cached = detection_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    image = image_to_array(Image.open(io.BytesIO(image_bytes)).convert('RGB'))
+    vio = analyze_boxes(detect_boxes(image))
+    remember_detections(cache_key, vio)
+    return vio
+
 def validate_form_data(form_data):
     """Validate required form fields"""
     required_fields = ['reporterType', 'incidentType', 'industry', 'companyName', 'description']
@@ -422,10 +567,11 @@ def home():
         
         conn.close()
         
-        # Load processed health & safety articles
-        articles = load_processed_articles()
-        news_metrics = calculate_news_metrics(articles)
-        trend_data = get_trend_data(articles)
+        # Load processed health & safety articles with precomputed metrics
+        news = article_store.snapshot()
+        articles = news['articles']
+        news_metrics = news['metrics']
+        trend_data = news['trends']
         
         # Combine database metrics with news metrics for enhanced dashboard
         enhanced_metrics = {
@@ -458,16 +604,18 @@ def home():
 def ai_voice_ui():
     return render_template("ai.html")
 
-@app.route('/ask', methods=['POST'])
-def ask():
-    user_input = request.json.get('message')
-
+def assistant_prompt(user_input):
     # Build prompt from your system — you can customize this
-    prompt = f"""You are an HSSE voice assistant. Answer based on internal company knowledge only.
+    return f"""You are an HSSE voice assistant. Answer based on internal company knowledge only.
 
 Question: {user_input}
 """
 
+@app.route('/ask', methods=['POST'])
+def ask():
+    user_input = request.json.get('message')
+    prompt = assistant_prompt(user_input)
+
     payload = {
         "contents": [
             {
@@ -490,20 +638,43 @@ Question: {user_input}
     except Exception as e:
         return jsonify({"response": f"Internal error: {str(e)}"}), 500
 
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    """/ask as server-sent events, relayed from streamGenerateContent as the answer is generated"""
+    prompt = assistant_prompt(request.json.get('message'))
+    chunks = stream_text(GEMINI_STREAM_URL, GEMINI_HEADERS, prompt)
+    return Response(stream_with_context(sse_answer(chunks)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 
 @app.route('/api/news-data')
 def api_news_data():
-    """API endpoint to serve processed news data as JSON"""
+    """
+    API endpoint to serve processed news data as JSON. Filters (source,
+    severity, industry, type, company, since, until) plus limit/offset query
+    the whole history; without them this is the cached latest snapshot.
+    """
     try:
-        articles = load_processed_articles()
-        news_metrics = calculate_news_metrics(articles)
-        trend_data = get_trend_data(articles)
+        filters = query_filters(request.args)
+        if filters or 'limit' in request.args or 'offset' in request.args:
+            limit = min(request.args.get('limit', 20, type=int), 500)
+            return jsonify({
+                'success': True,
+                'articles': article_warehouse.query_articles(limit=limit, offset=request.args.get('offset', 0, type=int),
+                                                             **filters),
+                'total': article_warehouse.count_articles(**filters),
+                'metrics': article_warehouse.news_metrics(**filters),
+                'trends': article_warehouse.daily_counts(7, **filters),
+                'timestamp': datetime.now().isoformat()
+            })
+        
+        news = article_store.snapshot()
         
         return jsonify({
             'success': True,
-            'articles': articles,
-            'metrics': news_metrics,
-            'trends': trend_data,
+            'articles': news['articles'],
+            'metrics': news['metrics'],
+            'trends': news['trends'],
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -528,29 +699,133 @@ def map_view():
         print(f"Error loading map page: {str(e)}")
         return render_template('map.html', incident_count=0)
 
+def conditional_response(etag, build):
+    """Answer 304 when the client already has `etag`, otherwise the response from `build`"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    # Pollers revalidate every time, but a matching ETag costs one version lookup
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def reports_version():
+    conn = get_db_connection()
+    try:
+        return data_version(conn)
+    finally:
+        conn.close()
+
 @app.route('/map-data')
 def map_data():
     """Route to serve the map HTML content"""
     try:
-        map_html = generate_incident_map()
-        return Response(map_html, mimetype='text/html')
+        version = reports_version()
+        return conditional_response(
+            f"map-{version}",
+            lambda: Response(map_render_cache.get(version, generate_incident_map), mimetype='text/html')
+        )
     except Exception as e:
         print(f"Error generating map data: {str(e)}")
-        return Response(f"<html><body><h3>Error loading map: {str(e)}</h3></body></html>", 
-                       mimetype='text/html')
+        # Served without an ETag and not cached, so the next poll renders the real map again
+        try:
+            response = Response(basic_incident_map(), mimetype='text/html')
+        except Exception:
+            response = Response(f"<html><body><h3>Error loading map: {str(e)}</h3></body></html>", 
+                                mimetype='text/html')
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+@app.route('/api/incidents/clusters')
+def incident_clusters():
+    """GeoJSON of clustered incidents inside the viewport bbox at a zoom level"""
+    try:
+        bbox = parse_bbox(request.args.get('bbox', '-180,-90,180,90'))
+        zoom = request.args.get('zoom', 6, type=int)
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    
+    try:
+        conn = get_db_connection()
+        try:
+            # Same data version and viewport means the same clusters
+            etag = f"clusters-{data_version(conn)}-{zoom}-{'_'.join(f'{v:.5f}' for v in bbox)}"
+            return conditional_response(etag, lambda: jsonify(get_incident_clusters(conn, bbox, zoom)))
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"Error clustering incidents: {str(e)}")
+        return jsonify(error=str(e)), 500
+
+def incident_filters():
+    """Optional type, time window and limit filters shared by the incident query endpoints"""
+    days = request.args.get('days', type=float)
+    limit = request.args.get('limit', 1000, type=int)
+    if days is not None and days <= 0:
+        raise ValueError("days must be positive")
+    return {
+        'incident_type': request.args.get('type') or None,
+        'since_days': days,
+        'limit': max(1, min(limit, 10000))
+    }
+
+@app.route('/api/incidents/nearby')
+def incidents_nearby():
+    """Incidents within radius_km of lat/lon, e.g. ?lat=6.8&lon=-58.1&radius_km=5&days=30"""
+    if not SPATIAL_INDEX:
+        return jsonify(error="Spatial index unavailable"), 503
+    try:
+        lat = float(request.args['lat'])
+        lon = float(request.args['lon'])
+        radius_km = float(request.args.get('radius_km', 5))
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius_km <= 0:
+            raise ValueError("lat/lon out of range or non-positive radius_km")
+        filters = incident_filters()
+    except KeyError as e:
+        return jsonify(error=f"Missing parameter: {e.args[0]}"), 400
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    
+    try:
+        conn = get_db_connection()
+        incidents = incidents_within_radius(conn, lat, lon, radius_km, **filters)
+        conn.close()
+        return jsonify(center=[lat, lon], radius_km=radius_km, count=len(incidents), incidents=incidents)
+    except Exception as e:
+        print(f"Error querying nearby incidents: {str(e)}")
+        return jsonify(error=str(e)), 500
+
+@app.route('/api/incidents/within')
+def incidents_within():
+    """Incidents inside ?bbox=west,south,east,north with the same filters as /nearby"""
+    if not SPATIAL_INDEX:
+        return jsonify(error="Spatial index unavailable"), 503
+    try:
+        bbox = parse_bbox(request.args['bbox'])
+        filters = incident_filters()
+    except KeyError as e:
+        return jsonify(error=f"Missing parameter: {e.args[0]}"), 400
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    
+    try:
+        conn = get_db_connection()
+        incidents = incidents_in_bbox(conn, bbox, **filters)
+        conn.close()
+        return jsonify(bbox=list(bbox), count=len(incidents), incidents=incidents)
+    except Exception as e:
+        print(f"Error querying incidents in bbox: {str(e)}")
+        return jsonify(error=str(e)), 500
 
 def get_dashboard_metrics(conn):
     """Get national HSSE metrics"""
     try:
         # Current month incidents
-        current_incidents = conn.execute(
-            "SELECT COUNT(*) as count FROM reports WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')"
-        ).fetchone()['count']
+        current_incidents = monthly_report_count(conn)
         
         # Previous month incidents for comparison
-        prev_incidents = conn.execute(
-            "SELECT COUNT(*) as count FROM reports WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now', '-1 month')"
-        ).fetchone()['count']
+        prev_incidents = monthly_report_count(conn, months_ago=1)
         
         # Calculate percentage change
         incidents_change = calculate_percentage_change(current_incidents, prev_incidents)
@@ -644,14 +919,34 @@ def detect_json():
     if not fn:
         return jsonify(error="Invalid filename"), 400
     
+    # Repeat uploads of the same photo skip decoding and inference entirely
+    image_bytes = imgf.read()
+    cache_key = detection_cache.key_for(image_bytes)
+    cached = detection_cache.get(cache_key)
+    if cached is not None:
+        return jsonify(violations=cached)
+    
     try:
-        img = Image.open(imgf).convert('RGB')
+        img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
     except UnidentifiedImageError:
         return jsonify(error="Unsupported image format"), 400
     except Exception as e:
         print(f"Error opening image: {str(e)}")
         return jsonify(error="Error processing image"), 400
 
+    if IN_MEMORY_INFERENCE:
+        try:
+            vio = analyze_boxes(detect_boxes(image_to_array(img)))
+            remember_detections(cache_key, vio)
+            
+            print(f"Analysis successful for {fn}: {vio}")
+            return jsonify(violations=vio)
+        except Exception as e:
+            print(f"Error in detect_json: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return jsonify(error=f"Error analyzing image: {str(e)}"), 500
+
     # Generate unique filename to avoid conflicts
     timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
     jpg = f"temp_{timestamp}_{os.path.splitext(fn)[0]}.jpg"
@@ -665,6 +960,7 @@ def detect_json():
 
         res = model.predict(source=path, save=False)
         vio = analyze_detections(res)
+        remember_detections(cache_key, vio)
         
         print(f"Analysis successful for {path}: {vio}")
         
@@ -689,6 +985,45 @@ def detect_json():
             pass
         return jsonify(error=f"Error analyzing image: {str(e)}"), 500
 
+@app.route('/api/map-cache/stats')
+def map_cache_stats():
+    """Render/hit counters for the cached folium incident map"""
+    return jsonify(map_render_cache.get_stats())
+
+@app.route('/api/detection-cache/stats')
+def detection_cache_stats():
+    """Hit/miss counters for the PPE detection result cache"""
+    return jsonify(detection_cache.get_stats())
+
+@app.route('/stream-monitor')
+def stream_monitor():
+    """Server-sent events of PPE violations found in a video file or a configured live stream"""
+    source = request.args.get('source', '')
+    if source in STREAM_SOURCES:
+        video = STREAM_SOURCES[source]
+    elif '://' in source:
+        return jsonify(error="Live sources must be referred to by a name configured in STREAM_SOURCES"), 400
+    else:
+        fn = secure_filename(source)
+        video = os.path.join(STREAM_FOLDER, fn)
+        if not fn or not os.path.isfile(video):
+            return jsonify(error=f"Video not found in {STREAM_FOLDER}"), 404
+    
+    monitor = StreamMonitor(detect_frames, person_violations,
+                            target_fps=request.args.get('fps', STREAM_TARGET_FPS, type=float),
+                            batch_size=INFERENCE_MAX_BATCH)
+    
+    def generate():
+        try:
+            for event in monitor.events(video):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            print(f"Error monitoring stream {video}: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/report', methods=['GET','POST'])
 def report():
     if request.method == 'GET':
@@ -740,7 +1075,7 @@ def report():
             rpt_id = cur.lastrowid
             conn.commit()
 
-            # Handle photo uploads and classification
+            # Save photo uploads and queue them for background classification
             photos = request.files.getlist('photos')
             for photo in photos:
                 if photo and photo.filename and allowed_file(photo.filename):
@@ -763,34 +1098,19 @@ def report():
                         # Save photo
                         photo.save(ppath)
                         
-                        # Insert photo record
+                        # Insert photo record and its classification job together
                         cur2 = conn.execute(
                             'INSERT INTO photos(report_id,file_path) VALUES(?,?)',
                             (rpt_id, ppath)
                         )
-                        photo_id = cur2.lastrowid
-                        
-                        # Analyze photo
-                        try:
-                            res = model.predict(source=ppath, save=False)
-                            vio = analyze_detections(res)
-                            conn.execute(
-                                'INSERT INTO photo_classifications(photo_id,results_json) VALUES(?,?)',
-                                (photo_id, json.dumps(vio))
-                            )
-                        except Exception as e:
-                            # Log error but continue - photo is saved even if analysis fails
-                            print(f"Error analyzing photo {fname}: {str(e)}")
-                            conn.execute(
-                                'INSERT INTO photo_classifications(photo_id,results_json) VALUES(?,?)',
-                                (photo_id, json.dumps(['Analysis failed']))
-                            )
+                        classification_queue.enqueue(conn, rpt_id, cur2.lastrowid, ppath)
                     except Exception as e:
                         flash(f'Error processing photo {photo.filename}: {str(e)}')
                         continue
 
             conn.commit()
             conn.close()
+            classification_queue.notify()
             
             flash('Report submitted successfully!')
             return redirect(url_for('report'))
@@ -802,5 +1122,29 @@ def report():
     else:
         return jsonify(error="Method not allowed"), 405
 
+@app.route('/report/<int:report_id>/status')
+def report_status(report_id):
+    """Poll the background classification status of a report's photos"""
+    try:
+        photos = classification_queue.report_status(report_id)
+        counts = {}
+        for photo in photos:
+            counts[photo['status']] = counts.get(photo['status'], 0) + 1
+        
+        return jsonify({
+            'report_id': report_id,
+            'complete': all(p['status'] in ('done', 'failed') for p in photos),
+            'counts': counts,
+            'photos': photos
+        })
+    except Exception as e:
+        print(f"Error getting report status: {str(e)}")
+        return jsonify(error=str(e)), 500
+
+if CLASSIFY_WORKERS > 0 and not INFERENCE_WORKER:
+    classification_pool = ClassificationWorkerPool(classification_queue, classify_photo,
+                                                   workers=CLASSIFY_WORKERS)
+    classification_pool.start()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class ArticleStore:
+    """
+    Keeps the newest processed_articles_*.json parsed in memory together with
+    values derived from it, and reloads only when the files change on disk.
+
+    With a warehouse (article_warehouse.py) the articles are instead the most
+    recent across all runs, reloaded when the warehouse version changes, and
+    processed files dropped into the directory are imported into it.
+    """
+
+    def __init__(self, directory: str = '.', prefix: str = 'processed_articles_',
+                 limit: int = 20, derive: Optional[Callable[[list], Dict[str, Any]]] = None,
+                 check_interval: float = 2.0, warehouse=None):
+        """
+        Initialize the store
+
+        Args:
+            directory: Folder the processor writes its output files to
+            prefix: File name prefix of processed article files
+            limit: Articles kept after filtering
+            derive: Computes extra values (metrics, trends) from the articles
+                once per load instead of once per request
+            check_interval: Seconds between stat() checks for changed files
+            warehouse: ArticleWarehouse to read from instead of the newest file
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.limit = limit
+        self.derive = derive
+        self.check_interval = check_interval
+        self.warehouse = warehouse
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._dir_mtime = None
+        self._file_mtime = None
+        self._version = None
+        self._next_check = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current articles and derived values, reloading first if files changed"""
+        now = time.monotonic()
+        if self._snapshot is not None and now < self._next_check:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is None or now >= self._next_check:
+                self._next_check = now + self.check_interval
+                if self._changed():
+                    self._snapshot = self._load()
+            return self._snapshot
+
+    def invalidate(self):
+        """Force a reload on the next snapshot, e.g. right after writing a new file"""
+        with self._lock:
+            self._dir_mtime = None
+            self._next_check = 0.0
+
+    def _changed(self) -> bool:
+        if self.warehouse is not None:
+            return self._warehouse_changed()
+
+        # A new output file changes the directory mtime; a rewrite changes the file's
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+
+        file_mtime = None
+        if self._snapshot and self._snapshot.get('source_file'):
+            try:
+                file_mtime = os.stat(self._snapshot['source_file']).st_mtime_ns
+            except OSError:
+                pass
+
+        changed = (self._snapshot is None or dir_mtime != self._dir_mtime
+                   or file_mtime != self._file_mtime)
+        self._dir_mtime = dir_mtime
+        return changed
+
+    def _warehouse_changed(self) -> bool:
+        try:
+            dir_mtime = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        try:
+            if dir_mtime != self._dir_mtime:
+                self.warehouse.import_processed_files(self.directory, self.prefix)
+                self._dir_mtime = dir_mtime
+            version = self.warehouse.version()
+        except Exception as e:
+            logger.error(f"Error checking article warehouse: {e}")
+            return self._snapshot is None
+
+        changed = self._snapshot is None or version != self._version
+        self._version = version
+        return changed
+
+    def _latest_file(self) -> Optional[str]:
+        processed_files = [os.path.join(self.directory, f) for f in os.listdir(self.directory)
+                           if f.startswith(self.prefix) and f.endswith('.json')]
+        if not processed_files:
+            return None
+        return max(processed_files, key=os.path.getctime)
+
+    def _load(self) -> Dict[str, Any]:
+        articles = []
+        latest_file = None
+        self._file_mtime = None
+        try:
+            if self.warehouse is not None:
+                articles = self.warehouse.query_articles(limit=self.limit)
+                logger.info(f"Loaded {len(articles)} processed articles from {self.warehouse.db_path}")
+                return self._with_derived({'articles': articles, 'source_file': None, 'loaded_at': time.time()})
+
+            latest_file = self._latest_file()
+            if latest_file:
+                self._file_mtime = os.stat(latest_file).st_mtime_ns
+                with open(latest_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                # Keep articles that have Gemini summaries and content
+                articles = [a for a in data.get('articles', [])
+                            if a.get('gemini_summary') and a.get('content')][:self.limit]
+                logger.info(f"Loaded {len(articles)} processed articles from {latest_file}")
+        except Exception as e:
+            logger.error(f"Error loading processed articles: {e}")
+            # Retry on the next check instead of caching the failure
+            self._dir_mtime = None
+            self._version = None
+
+        return self._with_derived({
+            'articles': articles,
+            'source_file': latest_file,
+            'loaded_at': time.time()
+        })
+
+    def _with_derived(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        if self.derive:
+            snapshot.update(self.derive(snapshot['articles']))
+        return snapshot
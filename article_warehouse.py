@@ -0,0 +1,514 @@
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Filter columns are NOCASE so "construction" matches "Construction" and the
+# plain indexes below still serve the lookup
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS articles (
+        url TEXT PRIMARY KEY,
+        title TEXT,
+        source TEXT COLLATE NOCASE,
+        scraped_at TEXT NOT NULL,
+        first_seen_at TEXT NOT NULL,
+        last_seen_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS article_content (
+        url TEXT PRIMARY KEY REFERENCES articles(url),
+        content TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS article_summaries (
+        url TEXT PRIMARY KEY REFERENCES articles(url),
+        type TEXT COLLATE NOCASE,
+        severity TEXT COLLATE NOCASE,
+        industry TEXT COLLATE NOCASE,
+        company TEXT COLLATE NOCASE,
+        location TEXT,
+        fine TEXT,
+        fine_amount INTEGER,
+        summary TEXT,
+        lesson TEXT,
+        details TEXT NOT NULL,
+        processed_at TEXT NOT NULL,
+        source_file TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS dashboard_summaries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        summary TEXT NOT NULL,
+        total_articles INTEGER,
+        processed_articles INTEGER,
+        source_file TEXT,
+        created_at TEXT NOT NULL
+    )""",
+    # One row per scraper/processor output (or imported file), for /api/files
+    """CREATE TABLE IF NOT EXISTS ingest_sources (
+        name TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        articles INTEGER NOT NULL DEFAULT 0,
+        mtime_ns INTEGER,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""",
+    # Same shape as the dashboard app's data_versions (render_cache.py): bumped
+    # once per ingest so readers can tell cheaply whether anything changed
+    """CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )""",
+    "INSERT OR IGNORE INTO data_versions(name, version) VALUES ('articles', 0)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, scraped_at)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_scraped_at ON articles(scraped_at)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_severity ON article_summaries(severity)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_industry ON article_summaries(industry)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_type ON article_summaries(type)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_company ON article_summaries(company)",
+    "CREATE INDEX IF NOT EXISTS idx_summaries_processed_at ON article_summaries(processed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_dashboard_summaries_created_at ON dashboard_summaries(created_at)",
+]
+
+# Query filter name -> column
+FILTER_COLUMNS = {
+    'source': 'a.source',
+    'severity': 's.severity',
+    'industry': 's.industry',
+    'incident_type': 's.type',
+    'company': 's.company',
+}
+
+SUMMARY_FIELDS = ('type', 'severity', 'industry', 'company', 'location', 'fine', 'summary', 'lesson')
+
+def parse_fine(fine) -> Optional[int]:
+    """Fine in pounds from a summary's `fine` field ("£40,000"), None if there is no amount"""
+    if not fine or fine == 'None' or '£' not in str(fine):
+        return None
+    try:
+        return int(str(fine).replace('£', '').replace(',', '').strip())
+    except ValueError:
+        return None
+
+def query_filters(args: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Warehouse query filters from request arguments
+
+    Args:
+        args: Mapping such as Flask's request.args, using `source`, `severity`,
+            `industry`, `type`, `company`, `since` and `until`
+
+    Returns:
+        Keyword arguments for ArticleWarehouse.query_articles and friends
+    """
+    filters = {name: args.get(name) for name in ('source', 'severity', 'industry', 'company', 'since', 'until')}
+    filters['incident_type'] = args.get('type')
+    return {name: value for name, value in filters.items() if value}
+
+def _chunks(items: Iterable, size: int):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class ArticleWarehouse:
+    """
+    SQLite store of every scraped article, its content and its Gemini summary
+    across all runs, so readers query the history through indexes instead of
+    globbing timestamped output files and parsing the newest one.
+
+    Ingest is a bulk upsert keyed by URL: the same story scraped or summarized
+    again updates its row rather than adding a duplicate.
+    """
+
+    def __init__(self, db_path: str = 'articles.db', batch_size: int = 500):
+        """
+        Initialize the warehouse, creating tables and indexes if needed
+
+        Args:
+            db_path: SQLite file shared by the scraper, processor and readers
+            batch_size: Articles per executemany round while ingesting
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        try:
+            # WAL lets the dashboards read while a run is ingesting
+            conn.execute('PRAGMA journal_mode=WAL')
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # Ingest
+
+    def upsert_scraped(self, articles: Iterable[Dict[str, Any]], source_file: Optional[str] = None) -> int:
+        """
+        Bulk upsert scraped articles and their content
+
+        Args:
+            articles: Dicts with `url`, `title`, `source`, `scraped_at` and
+                optionally `content`, as written by ScrapeWriter
+            source_file: Output file the articles came from, listed by /api/files
+
+        Returns:
+            Number of articles written
+        """
+        return self._ingest(articles, 'scraped_data', source_file, with_summaries=False)
+
+    def upsert_processed(self, articles: Iterable[Dict[str, Any]], source_file: Optional[str] = None) -> int:
+        """
+        Bulk upsert processed articles: the article, its content and its `gemini_summary`
+
+        Args:
+            articles: Processed article dicts as produced by DataProcessor
+            source_file: Output file the articles were published as
+
+        Returns:
+            Number of articles written
+        """
+        return self._ingest(articles, 'processed_data', source_file, with_summaries=True)
+
+    def _ingest(self, articles, kind, source_file, with_summaries, mtime_ns=None) -> int:
+        now = datetime.now().isoformat()
+        written = 0
+        conn = self._connect()
+        try:
+            with conn:
+                for chunk in _chunks((a for a in articles if a.get('url')), self.batch_size):
+                    self._write_chunk(conn, chunk, now, with_summaries, source_file)
+                    written += len(chunk)
+                if source_file:
+                    self._record_source(conn, source_file, kind, written, now, mtime_ns)
+                conn.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'articles'")
+        finally:
+            conn.close()
+
+        logger.info(f"Stored {written} articles ({kind})" + (f" from {source_file}" if source_file else ''))
+        return written
+
+    @staticmethod
+    def _write_chunk(conn, chunk, now, with_summaries, source_file):
+        # A story first seen in an older run keeps its original scrape time
+        conn.executemany("""
+            INSERT INTO articles(url, title, source, scraped_at, first_seen_at, last_seen_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = COALESCE(NULLIF(excluded.title, ''), articles.title),
+                source = COALESCE(NULLIF(excluded.source, ''), articles.source),
+                scraped_at = MIN(articles.scraped_at, excluded.scraped_at),
+                last_seen_at = excluded.last_seen_at
+        """, [(a['url'], a.get('title', ''), a.get('source', ''),
+               a.get('scraped_at') or a.get('processed_at') or now, now, now) for a in chunk])
+
+        conn.executemany("""
+            INSERT INTO article_content(url, content, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET content = excluded.content, updated_at = excluded.updated_at
+            WHERE article_content.content != excluded.content
+        """, [(a['url'], a['content'], now) for a in chunk if a.get('content')])
+
+        if not with_summaries:
+            return
+        rows = []
+        for a in chunk:
+            summary = a.get('gemini_summary')
+            if not isinstance(summary, dict) or not summary:
+                continue
+            values = [summary.get(field) for field in SUMMARY_FIELDS]
+            rows.append((a['url'], *(None if v is None else str(v) for v in values),
+                         parse_fine(summary.get('fine')), json.dumps(summary, ensure_ascii=False),
+                         a.get('processed_at') or now, source_file))
+        conn.executemany(f"""
+            INSERT INTO article_summaries(url, {', '.join(SUMMARY_FIELDS)}, fine_amount, details,
+                                          processed_at, source_file)
+            VALUES ({', '.join('?' * (len(SUMMARY_FIELDS) + 5))})
+            ON CONFLICT(url) DO UPDATE SET
+                {', '.join(f'{field} = excluded.{field}' for field in SUMMARY_FIELDS)},
+                fine_amount = excluded.fine_amount, details = excluded.details,
+                processed_at = excluded.processed_at, source_file = excluded.source_file
+        """, rows)
+
+    @staticmethod
+    def _record_source(conn, name, kind, articles, now, mtime_ns=None):
+        # A writer flushing in batches adds to its count; a re-imported file replaces it
+        created_at = datetime.fromtimestamp(mtime_ns / 1e9).isoformat() if mtime_ns else now
+        conn.execute("""
+            INSERT INTO ingest_sources(name, kind, articles, mtime_ns, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                articles = CASE WHEN excluded.mtime_ns IS NULL
+                                THEN ingest_sources.articles + excluded.articles ELSE excluded.articles END,
+                mtime_ns = COALESCE(excluded.mtime_ns, ingest_sources.mtime_ns),
+                updated_at = excluded.updated_at
+        """, (name, kind, articles, mtime_ns, created_at, now))
+
+    def forget_source(self, name: str):
+        """Drop an output file from the ingest record, e.g. one deleted because its run found nothing new"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM ingest_sources WHERE name = ?', (name,))
+        finally:
+            conn.close()
+
+    def add_dashboard_summary(self, summary: str, total_articles: Optional[int] = None,
+                              processed_articles: Optional[int] = None, source_file: Optional[str] = None,
+                              created_at: Optional[str] = None):
+        """Store the executive summary generated for a processing run"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("""
+                    INSERT INTO dashboard_summaries(summary, total_articles, processed_articles, source_file, created_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (summary, total_articles, processed_articles, source_file,
+                      created_at or datetime.now().isoformat()))
+                conn.execute("UPDATE data_versions SET version = version + 1 WHERE name = 'articles'")
+        finally:
+            conn.close()
+
+    def import_processed_files(self, directory: str = '.', prefix: str = 'processed_articles_') -> int:
+        """
+        Ingest processed_articles_*.json files that are new or changed since
+        they were last imported, e.g. history from before the warehouse or
+        files copied in from another machine
+
+        Args:
+            directory: Folder holding processed article files
+            prefix: File name prefix of processed article files
+
+        Returns:
+            Number of files imported
+        """
+        try:
+            names = sorted(f for f in os.listdir(directory) if f.startswith(prefix) and f.endswith('.json'))
+        except OSError as e:
+            logger.error(f"Cannot list {directory}: {e}")
+            return 0
+
+        conn = self._connect()
+        try:
+            known = {row['name']: row['mtime_ns'] for row in conn.execute('SELECT name, mtime_ns FROM ingest_sources')}
+        finally:
+            conn.close()
+
+        imported = 0
+        for name in names:
+            path = os.path.join(directory, name)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                # Files the processor ingested as it wrote them have no mtime recorded
+                if name in known and known[name] in (None, mtime_ns):
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error importing {path}: {e}")
+                continue
+
+            self._ingest(data.get('articles', []), 'processed_data', name, True, mtime_ns)
+            if data.get('dashboard_summary') and name not in known:
+                self.add_dashboard_summary(data['dashboard_summary'], data.get('total_articles'),
+                                           data.get('processed_articles'), name, data.get('processed_at'))
+            imported += 1
+
+        if imported:
+            logger.info(f"Imported {imported} processed article files from {directory}")
+        return imported
+
+    # Queries
+
+    def version(self) -> int:
+        """Bumped on every ingest; a primary-key lookup, cheap enough for every request"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT version FROM data_versions WHERE name = 'articles'").fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _where(filters: Dict[str, Any], summarized: bool) -> Tuple[str, str, list]:
+        unknown = set(filters) - set(FILTER_COLUMNS) - {'since', 'until'}
+        if unknown:
+            raise TypeError(f"Unknown article filters: {', '.join(sorted(unknown))}")
+
+        clauses, params = [], []
+        for name, column in FILTER_COLUMNS.items():
+            if filters.get(name):
+                clauses.append(f'{column} = ?')
+                params.append(filters[name])
+        # Dates are ISO strings, so `since`/`until` may be days or full timestamps
+        if filters.get('since'):
+            clauses.append('a.scraped_at >= ?')
+            params.append(filters['since'])
+        if filters.get('until'):
+            clauses.append('a.scraped_at < ?')
+            params.append(filters['until'])
+
+        needs_summary = summarized or any(filters.get(n) for n in FILTER_COLUMNS if n != 'source')
+        join = ('JOIN' if needs_summary else 'LEFT JOIN') + ' article_summaries s ON s.url = a.url'
+        where = ('WHERE ' + ' AND '.join(clauses)) if clauses else ''
+        return join, where, params
+
+    def query_articles(self, limit: int = 20, offset: int = 0, summarized: bool = True,
+                       with_content: bool = True, **filters) -> List[Dict[str, Any]]:
+        """
+        Articles matching the filters, newest first
+
+        Args:
+            limit: Maximum articles returned
+            offset: Articles skipped, for paging
+            summarized: Only articles with a Gemini summary
+            with_content: Include the article body
+            **filters: `source`, `severity`, `industry`, `incident_type`,
+                `company` (exact, case-insensitive), `since` (inclusive) and
+                `until` (exclusive) ISO dates on the scrape time
+
+        Returns:
+            Article dicts in the processed_articles_*.json shape
+        """
+        join, where, params = self._where(filters, summarized)
+        content = 'c.content' if with_content else "''"
+        content_join = 'LEFT JOIN article_content c ON c.url = a.url' if with_content else ''
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT a.url, a.title, a.source, a.scraped_at, {content} AS content,
+                       s.details, s.processed_at
+                FROM articles a {join} {content_join}
+                {where}
+                ORDER BY a.scraped_at DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset]).fetchall()
+        finally:
+            conn.close()
+
+        articles = []
+        for row in rows:
+            article = {'title': row['title'], 'url': row['url'], 'source': row['source'],
+                       'content': row['content'] or '', 'scraped_at': row['scraped_at']}
+            if row['details'] is not None:
+                article['gemini_summary'] = json.loads(row['details'])
+                article['processed_at'] = row['processed_at']
+            articles.append(article)
+        return articles
+
+    def count_articles(self, summarized: bool = True, **filters) -> int:
+        """Number of articles matching the filters (see query_articles)"""
+        join, where, params = self._where(filters, summarized)
+        conn = self._connect()
+        try:
+            return conn.execute(f'SELECT COUNT(*) FROM articles a {join} {where}', params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def news_metrics(self, companies: int = 20, **filters) -> Dict[str, Any]:
+        """
+        Dashboard news metrics over every summarized article matching the filters
+
+        Args:
+            companies: Most recently reported companies listed
+            **filters: As for query_articles
+
+        Returns:
+            Totals, severity and type distributions and recent companies, as
+            the dashboard's news section expects
+        """
+        join, where, params = self._where(filters, True)
+        conn = self._connect()
+        try:
+            totals = conn.execute(f"""
+                SELECT COUNT(*),
+                       COALESCE(SUM(s.severity IN ('Critical', 'High')), 0),
+                       COALESCE(SUM(s.severity = 'Medium'), 0),
+                       COALESCE(SUM(s.severity = 'Low'), 0),
+                       COALESCE(SUM(s.fine_amount), 0),
+                       COALESCE(SUM(s.industry LIKE '%construction%'), 0)
+                FROM articles a {join} {where}
+            """, params).fetchone()
+            severities = conn.execute(f"""
+                SELECT COALESCE(s.severity, 'Unknown'), COUNT(*) FROM articles a {join} {where}
+                GROUP BY 1 ORDER BY 2 DESC
+            """, params).fetchall()
+            types = conn.execute(f"""
+                SELECT COALESCE(s.type, 'Unknown'), COUNT(*) FROM articles a {join} {where}
+                GROUP BY 1 ORDER BY 2 DESC
+            """, params).fetchall()
+            company_clause = (where + ' AND ' if where else 'WHERE ') + \
+                "s.company IS NOT NULL AND s.company != 'Unknown' AND LENGTH(s.company) > 3"
+            recent = conn.execute(f"""
+                SELECT s.company FROM articles a {join} {company_clause}
+                GROUP BY s.company ORDER BY MAX(a.scraped_at) DESC LIMIT ?
+            """, params + [companies]).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            'total_articles': totals[0],
+            'high_risk': totals[1],
+            'medium_risk': totals[2],
+            'low_risk': totals[3],
+            'total_fines': totals[4],
+            'construction_incidents': totals[5],
+            'severity_distribution': {row[0]: row[1] for row in severities},
+            'incident_types': {row[0]: row[1] for row in types},
+            'recent_companies': [row[0] for row in recent]
+        }
+
+    def daily_counts(self, days: int = 7, **filters) -> List[Dict[str, Any]]:
+        """Summarized articles per scrape day for the most recent `days` days with any, oldest first"""
+        join, where, params = self._where(filters, True)
+        conn = self._connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT SUBSTR(a.scraped_at, 1, 10) AS day, COUNT(*) FROM articles a {join} {where}
+                GROUP BY day ORDER BY day DESC LIMIT ?
+            """, params + [days]).fetchall()
+        finally:
+            conn.close()
+        return [{'date': row[0], 'incidents': row[1]} for row in reversed(rows)]
+
+    def latest_dashboard_summary(self) -> Optional[Dict[str, Any]]:
+        """Most recent executive summary with its run's counts, None before the first run"""
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT summary, total_articles, processed_articles, source_file, created_at
+                FROM dashboard_summaries ORDER BY created_at DESC, id DESC LIMIT 1
+            """).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {'processed_at': row['created_at'], 'total_articles': row['total_articles'],
+                'processed_articles': row['processed_articles'], 'dashboard_summary': row['summary'],
+                'source_file': row['source_file']}
+
+    def list_sources(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Scraper and processor outputs ingested so far, newest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT name, kind, articles, created_at, updated_at FROM ingest_sources
+                ORDER BY created_at DESC LIMIT ?
+            """, (limit,)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Reading processed articles as history grows: globbing processed_articles_*.json
+and parsing files (the newest one, or every one to see all history) versus
+indexed queries against the article warehouse.
+
+    python benchmarks/article_warehouse_benchmark.py --sizes 1000 10000 50000
+
+Articles are synthetic, 500 per file like successive processing runs.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_warehouse import ArticleWarehouse
+
+SEVERITIES = ['Critical', 'High', 'Medium', 'Low']
+INDUSTRIES = ['Construction', 'Manufacturing', 'Healthcare', 'Mining', 'Transport', 'Energy']
+SOURCES = ['hse', 'constructionnews', 'shponline', 'healthandsafetyatwork']
+
+
+def make_article(i, rng):
+    return {
+        'title': f'Firm {i} fined after incident',
+        'url': f'https://example.com/news/{i}',
+        'source': rng.choice(SOURCES),
+        'content': 'A worker was hurt at a site after failures in planning. ' * 30,
+        'scraped_at': f'2025-{1 + i % 12:02d}-{1 + i % 28:02d}T00:00:00',
+        'gemini_summary': {
+            'type': rng.choice(['Fatality', 'Injury', 'Fine']), 'severity': rng.choice(SEVERITIES),
+            'industry': rng.choice(INDUSTRIES), 'company': f'Company {i % 2000} Ltd', 'location': 'Leeds',
+            'summary': 'A worker was injured after failures in planning.', 'fine': f'£{rng.randrange(5, 500) * 1000}',
+            'lesson': 'Plan the work.'
+        }
+    }
+
+
+def write_corpus(directory, size, per_file=500):
+    rng = random.Random(size)
+    for start in range(0, size, per_file):
+        articles = [make_article(i, rng) for i in range(start, min(size, start + per_file))]
+        path = os.path.join(directory, f'processed_articles_{start:08d}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'dashboard_summary': 'Incidents rose this quarter.', 'articles': articles}, f)
+
+
+def timed(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def newest_file(directory):
+    latest = max(Path(directory).glob('processed_articles_*.json'), key=os.path.getctime)
+    with open(latest, 'r', encoding='utf-8') as f:
+        return json.load(f)['articles'][:20]
+
+
+def filtered_from_files(directory):
+    # What answering "high severity mining incidents" needs without the warehouse
+    matches = []
+    for path in Path(directory).glob('processed_articles_*.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            matches.extend(a for a in json.load(f)['articles']
+                           if a['gemini_summary']['severity'] == 'High' and a['gemini_summary']['industry'] == 'Mining')
+    return sorted(matches, key=lambda a: a['scraped_at'], reverse=True)[:20]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark article reads from files versus the warehouse')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'articles':>9}{'import s':>10}{'newest file ms':>16}{'latest 20 ms':>14}"
+          f"{'filter files ms':>17}{'filter sql ms':>15}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(directory, size)
+            warehouse = ArticleWarehouse(os.path.join(directory, 'articles.db'))
+            start = time.perf_counter()
+            warehouse.import_processed_files(directory)
+            imported = time.perf_counter() - start
+
+            filters = {'severity': 'High', 'industry': 'Mining'}
+            print(f"{size:>9}{imported:>10.2f}"
+                  f"{timed(lambda: newest_file(directory), args.runs):>16.1f}"
+                  f"{timed(lambda: warehouse.query_articles(limit=20), args.runs):>14.1f}"
+                  f"{timed(lambda: filtered_from_files(directory), args.runs):>17.1f}"
+                  f"{timed(lambda: warehouse.query_articles(limit=20, **filters), args.runs):>15.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
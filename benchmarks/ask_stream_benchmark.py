@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Time-to-first-sentence for the voice assistant against the local mock
+Gemini server: the blocking generateContent call behind /ask versus the
+streamGenerateContent relay behind /ask/stream.
+
+    python benchmarks/ask_stream_benchmark.py --latency 0.4 --chunk-delay 0.15
+
+Speech can start once the first sentence event arrives; with the blocking
+call it has to wait for the whole answer.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gemini_stream import stream_url, stream_text, sse_answer
+from mock_gemini import MockGeminiServer
+
+PROMPT = "You are an HSSE voice assistant.\n\nQuestion: What do the fall incidents have in common?\n"
+HEADERS = {"Content-Type": "application/json", "X-goog-api-key": "mock"}
+
+
+def blocking(url):
+    start = time.perf_counter()
+    response = requests.post(url, headers=HEADERS, json={"contents": [{"parts": [{"text": PROMPT}]}]})
+    response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+def streaming(url):
+    start = time.perf_counter()
+    first_sentence = None
+    for frame in sse_answer(stream_text(url, HEADERS, PROMPT)):
+        event = frame.split('\n', 1)[0][len('event: '):]
+        if event == 'sentence' and first_sentence is None:
+            first_sentence = time.perf_counter() - start
+        elif event == 'error':
+            raise RuntimeError(json.loads(frame.split('data: ', 1)[1])['response'])
+    return first_sentence, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /ask time to first sentence')
+    parser.add_argument('--latency', type=float, default=0.4, help='Mock time to first chunk in seconds')
+    parser.add_argument('--chunk-delay', type=float, default=0.15, help='Mock seconds per streamed chunk')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(args.latency, rate=1000, chunk_delay=args.chunk_delay).start()
+    generate_url = f"{server.base_url}/models/gemini-2.0-flash:generateContent"
+    try:
+        print(f"mock latency {args.latency}s, {args.chunk_delay}s per chunk, {args.runs} runs\n")
+        print(f"{'variant':<28}{'first sentence s':>18}{'full answer s':>16}")
+        for name, run, url in [('generateContent (/ask)', blocking, generate_url),
+                               ('streamGenerateContent (SSE)', streaming, stream_url(generate_url))]:
+            results = [run(url) for _ in range(args.runs)]
+            print(f"{name:<28}{statistics.median(r[0] for r in results):>18.2f}"
+                  f"{statistics.median(r[1] for r in results):>16.2f}")
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare inference backends on latency and accuracy over data/css-data/valid.
+
+Export the backends first with export_model.py, then from the repository root:
+
+    python benchmarks/backend_benchmark.py --backends pytorch onnx openvino-int8
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_backends import MODEL_BACKENDS, backend_path, dataset_yaml, load_model
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure_latency(model, images, warmup):
+    for image in images[:warmup]:
+        model.predict(source=image, save=False, verbose=False)
+
+    latencies = []
+    for image in images:
+        start = time.perf_counter()
+        model.predict(source=image, save=False, verbose=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PPE model backends')
+    parser.add_argument('--backends', nargs='+', default=list(MODEL_BACKENDS),
+                        choices=list(MODEL_BACKENDS))
+    parser.add_argument('--dataset', default='data/css-data')
+    parser.add_argument('--latency-images', type=int, default=100,
+                        help='Validation images timed per backend')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--imgsz', type=int, default=640)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.dataset, 'valid', 'images', '*.jpg')))
+    images = [cv2.imread(p) for p in paths[:args.latency_images]]
+    if not images:
+        print(f"No validation images found under {args.dataset}/valid/images")
+        return 1
+
+    data = dataset_yaml(args.dataset)
+    rows = []
+    try:
+        for backend in args.backends:
+            if not os.path.exists(backend_path(backend)):
+                print(f"Skipping {backend}: {backend_path(backend)} not found")
+                continue
+
+            print(f"Benchmarking {backend}...")
+            model = load_model(backend)
+            latencies = measure_latency(model, images, args.warmup)
+            metrics = model.val(data=data, imgsz=args.imgsz, batch=1, plots=False, verbose=False)
+            rows.append({
+                'backend': backend,
+                'p50_ms': percentile(latencies, 50),
+                'p99_ms': percentile(latencies, 99),
+                'map50': metrics.box.map50,
+                'map50_95': metrics.box.map
+            })
+    finally:
+        os.remove(data)
+
+    if not rows:
+        return 1
+
+    baseline = next((r for r in rows if r['backend'] == 'pytorch'), rows[0])
+    print(f"\n{'backend':<15}{'p50 ms':>10}{'p99 ms':>10}{'mAP50':>10}{'mAP50-95':>10}{'ΔmAP50-95':>12}")
+    for row in rows:
+        delta = row['map50_95'] - baseline['map50_95']
+        print(f"{row['backend']:<15}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+              f"{row['map50']:>10.3f}{row['map50_95']:>10.3f}{delta:>+12.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
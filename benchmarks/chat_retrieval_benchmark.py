@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prompt size for the HSSE chat as the incident history grows: every summary
+stuffed into the prompt versus the top-k incidents from the BM25 index.
+
+    python benchmarks/chat_retrieval_benchmark.py --sizes 100 1000 10000
+
+Articles are synthetic, written as processed_articles_*.json files into a
+temporary directory, 500 per file like successive processing runs.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'gemini-chat-with-hsse-data'))
+
+from incident_index import IncidentIndex
+
+TYPES = ['Fatality', 'Injury', 'Fine', 'Fire', 'Chemical', 'Equipment', 'Fall']
+INDUSTRIES = ['Construction', 'Manufacturing', 'Healthcare', 'Mining', 'Transport', 'Energy']
+PLACES = ['Leeds', 'Glasgow', 'Cardiff', 'Bristol', 'Hull', 'Derby', 'Belfast', 'Norwich']
+HAZARDS = ['scaffold', 'forklift', 'roof', 'excavator', 'solvent', 'crane', 'ladder', 'press brake']
+QUESTIONS = ['Who was fined for a forklift incident in Hull?',
+             'What happened with the crane in Glasgow?',
+             'Which chemical incidents involved solvent exposure?']
+
+
+def make_article(i, rng):
+    hazard, place = rng.choice(HAZARDS), rng.choice(PLACES)
+    return {
+        'title': f'Firm {i} fined after {hazard} incident in {place}',
+        'url': f'https://example.com/news/{i}',
+        'content': f'A worker was hurt by a {hazard} at a site in {place}. ' * 5,
+        'scraped_at': f'2025-{1 + i % 12:02d}-01T00:00:00',
+        'gemini_summary': {
+            'type': rng.choice(TYPES), 'severity': rng.choice(['Critical', 'High', 'Medium', 'Low']),
+            'industry': rng.choice(INDUSTRIES), 'company': f'Company {i} Ltd', 'location': place,
+            'summary': f'A worker was injured by a {hazard} at a site in {place} after failures in planning.',
+            'fine': f'£{rng.randrange(5, 500) * 1000}', 'lesson': f'Control {hazard} risks with planning.'
+        }
+    }
+
+
+def write_corpus(directory, size, per_file=500):
+    rng = random.Random(size)
+    for start in range(0, size, per_file):
+        articles = [make_article(i, rng) for i in range(start, min(size, start + per_file))]
+        path = os.path.join(directory, f'processed_articles_{start:08d}.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'dashboard_summary': 'Incidents rose this quarter.', 'articles': articles}, f)
+
+
+def stuffed_chars(directory):
+    """Characters of summary text the old prompt sent with every question"""
+    total = 0
+    for name in os.listdir(directory):
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            for i, article in enumerate(json.load(f)['articles']):
+                s = article['gemini_summary']
+                total += len(f"{i+1}. [{s['company']}] ({s['type']}) - {s['summary']}\n")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HSSE chat retrieval')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--k', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'articles':>9}{'stuffed chars':>15}{'top-k chars':>13}{'build s':>9}{'search ms':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            write_corpus(directory, size)
+            index = IncidentIndex(directory)
+            start = time.perf_counter()
+            index.refresh(force=True)
+            build = time.perf_counter() - start
+
+            retrieved = 0
+            start = time.perf_counter()
+            for question in QUESTIONS:
+                docs = index.search(question, args.k)
+                retrieved = max(retrieved, sum(len(d['text']) + 4 for d in docs))
+            search_ms = (time.perf_counter() - start) * 1000 / len(QUESTIONS)
+
+            print(f"{size:>9}{stuffed_chars(directory):>15}{retrieved:>13}{build:>9.2f}{search_ms:>11.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark /detect-json with the in-memory inference path versus the
+original save-to-disk path.
+
+The detection cache is bypassed, since the same images are posted
+repeatedly and cache hits would otherwise be timed instead of inference.
+
+Run from the repository root (needs model/best.pt):
+
+    python benchmarks/detect_json_benchmark.py --requests 50
+"""
+
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as hsse_app
+
+
+class UncachedDetections:
+    """Stands in for app.detection_cache: every lookup misses and nothing is stored"""
+
+    def key_for(self, image_bytes):
+        return None
+
+    def get(self, key):
+        return None
+
+    def put(self, key, results):
+        pass
+
+    def get_stats(self):
+        return {}
+
+
+def read_io_bytes_written():
+    """Bytes this process has passed to write() so far (Linux only)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            for line in f:
+                if line.startswith('wchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(client, images, requests_count, in_memory):
+    """Post images round-robin to /detect-json and collect latency and I/O"""
+    hsse_app.IN_MEMORY_INFERENCE = in_memory
+    latencies = []
+    bytes_start = read_io_bytes_written()
+
+    for i in range(requests_count):
+        name, payload = images[i % len(images)]
+        start = time.perf_counter()
+        response = client.post(
+            '/detect-json',
+            data={'image': (io.BytesIO(payload), name)},
+            content_type='multipart/form-data'
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            print(f"  request {i} failed: {response.status_code} {response.get_json()}")
+
+    bytes_end = read_io_bytes_written()
+    bytes_per_request = None
+    if bytes_start is not None and bytes_end is not None:
+        bytes_per_request = (bytes_end - bytes_start) / requests_count
+
+    return {
+        'p50_ms': percentile(latencies, 50),
+        'p99_ms': percentile(latencies, 99),
+        'bytes_written_per_request': bytes_per_request
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /detect-json inference paths')
+    parser.add_argument('--images', default='data/css-data/test/images/*.jpg',
+                        help='Glob of images to post')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per mode')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed warmup requests per mode')
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.images))
+    if not paths:
+        print(f"No images match {args.images}")
+        return 1
+
+    images = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            images.append((os.path.basename(path), f.read()))
+
+    # Neither hashing, lookups nor SQLite writes should count towards the inference paths
+    hsse_app.detection_cache = UncachedDetections()
+    client = hsse_app.app.test_client()
+    print(f"Benchmarking {args.requests} requests per mode over {len(images)} images")
+
+    for label, in_memory in (('disk', False), ('in-memory', True)):
+        run_mode(client, images, args.warmup, in_memory)
+        stats = run_mode(client, images, args.requests, in_memory)
+        written = stats['bytes_written_per_request']
+        written_text = f"{written:,.0f}" if written is not None else "n/a"
+        print(f"{label:>10}: p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, "
+              f"bytes written/request {written_text}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
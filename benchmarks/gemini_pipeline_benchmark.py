@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Time article summarization against the local mock Gemini server: one
+request at a time, the adaptive concurrent pipeline, and the concurrent
+pipeline with several articles packed into each request.
+
+    python benchmarks/gemini_pipeline_benchmark.py --articles 200 --rate 20
+
+The sequential figure excludes the 1s sleep the old loop added after every
+article, so the real before/after gap is larger than shown. The response
+cache is disabled so every variant reaches the server.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gemini_rest_processor import DataProcessor
+from mock_gemini import MockGeminiServer
+
+
+def make_articles(n):
+    return [{
+        'title': f'Contractor fined after worker injured #{i}',
+        'url': f'https://example.com/news/{i}',
+        'source': 'mock',
+        'content': 'A worker fell from an unguarded edge during refurbishment work. ' * 20,
+        'scraped_at': ''
+    } for i in range(n)]
+
+
+def run(server, articles, max_concurrency, batch_size):
+    processor = DataProcessor(api_key='mock', base_url=server.base_url, max_concurrency=max_concurrency)
+    start = time.perf_counter()
+    processed = processor.process_articles_with_gemini(articles, max_articles=len(articles),
+                                                       batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    in_order = [a['url'] for a in processed] == [a['url'] for a in articles[:len(processed)]]
+    return elapsed, len(processed), in_order, processor.gemini.concurrency.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Gemini summarization throughput')
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='Mock response time in seconds')
+    parser.add_argument('--rate', type=float, default=20.0, help='Mock rate limit in requests per second')
+    parser.add_argument('--max-concurrency', type=int, default=16)
+    parser.add_argument('--batch-size', type=int, default=8, help='Articles per request in the batched variant')
+    parser.add_argument('--drop-every', type=int, default=0,
+                        help='Mock omits every Nth article from batch replies, to exercise the fallback')
+    parser.add_argument('--skip-sequential', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    os.environ['GEMINI_CACHE'] = '0'
+    articles = make_articles(args.articles)
+
+    variants = [] if args.skip_sequential else [('sequential', 1, 1)]
+    variants.append((f'adaptive (max {args.max_concurrency})', args.max_concurrency, 1))
+    variants.append((f'batched x{args.batch_size}', args.max_concurrency, args.batch_size))
+
+    print(f"{args.articles} articles, mock latency {args.latency}s, limit {args.rate} req/s\n")
+    print(f"{'variant':<24}{'seconds':>10}{'articles/s':>12}{'ok':>6}{'ordered':>9}"
+          f"{'requests':>10}{'req/article':>13}{'429s':>7}{'peak':>6}")
+    for name, concurrency, batch_size in variants:
+        server = MockGeminiServer(args.latency, args.rate, drop_every=args.drop_every).start()
+        try:
+            elapsed, done, in_order, stats = run(server, articles, concurrency, batch_size)
+        finally:
+            server.stop()
+        requests = server.stats['requests'] - server.stats['throttled']
+        print(f"{name:<24}{elapsed:>10.1f}{done / elapsed:>12.1f}{done:>6}{str(in_order):>9}"
+              f"{requests:>10}{requests / max(done, 1):>13.2f}{server.stats['throttled']:>7}"
+              f"{server.stats['peak_concurrency']:>6}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent API with a configurable
+latency and rate limit, for exercising the summarization pipeline offline.
+
+    python benchmarks/mock_gemini.py --port 8765 --rate 20
+    GEMINI_API_KEY=test GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta python ...
+
+Requests beyond the rate limit get a 429 with Retry-After and a Gemini-style
+RetryInfo body, like the real API. streamGenerateContent?alt=sse is served
+as chunked server-sent events, one chunk of a few words every
+--chunk-delay seconds; generateContent waits for the whole answer.
+"""
+
+import argparse
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Reply to free-form questions, long enough for streaming to matter
+CHAT_ANSWER = (
+    "Three incidents in the data involved falls from height. The most serious was a fatal fall "
+    "from an unguarded scaffold edge, which led to a fine of £250000. The other two were injuries "
+    "during roof work, where inspectors found missing edge protection. The common lesson is to plan "
+    "work at height and check that guardrails are in place before work starts."
+)
+
+class MockGeminiServer:
+    def __init__(self, latency=0.5, rate=20.0, burst=None, port=0, drop_every=0,
+                 chunk_delay=0.0, chunk_words=4):
+        """
+        Args:
+            latency: Seconds each successful request takes (before the first chunk when streaming)
+            rate: Requests per second accepted before answering 429
+            burst: Requests accepted back to back (default: one second's worth)
+            port: Port to listen on, 0 for any free port
+            drop_every: Omit every Nth article from batch replies (0 never)
+            chunk_delay: Seconds to generate each chunk of a free-form answer
+            chunk_words: Words per streamed chunk
+        """
+        self.latency = latency
+        self.drop_every = drop_every
+        self.chunk_delay = chunk_delay
+        self.chunk_words = chunk_words
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.stats = {'requests': 0, 'throttled': 0, 'peak_concurrency': 0}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, and chunked transfer for streamed replies
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                server.handle(self, json.loads(body or b'{}'))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1beta"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _take_token(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.stats['requests'] += 1
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            self.stats['throttled'] += 1
+            return (1 - self._tokens) / self.rate
+
+    def reply_text(self, prompt):
+        """
+        Response text for a prompt: a summary JSON object per TITLE line, or
+        for a batch prompt (ID lines before each TITLE) a JSON array of
+        summaries carrying those ids
+        """
+        titles = re.findall(r'^TITLE: (.*)$', prompt, flags=re.MULTILINE)
+        ids = re.findall(r'^ID: (.*)$', prompt, flags=re.MULTILINE)
+        summaries = [{
+            'type': 'Injury', 'severity': 'Medium', 'industry': 'Construction', 'company': 'Unknown',
+            'location': 'Unknown', 'summary': f'Summary of {title}', 'fine': 'None',
+            'lesson': 'Follow procedures'
+        } for title in titles]
+        if ids:
+            for summary, article_id in zip(summaries, ids):
+                summary['id'] = article_id
+            # Like the real model, occasionally leave an article out of a batch
+            if self.drop_every and len(summaries) > 1:
+                summaries = [s for n, s in enumerate(summaries, 1) if n % self.drop_every]
+            return json.dumps(summaries)
+        if len(summaries) == 1:
+            return json.dumps(summaries[0])
+        if summaries:
+            return json.dumps(summaries)
+        return 'API connection successful'
+
+    def chunks(self, prompt):
+        """Pieces of the answer as they would be generated"""
+        if 'TITLE: ' in prompt or 'API connection successful' in prompt:
+            return [self.reply_text(prompt)]
+        words = CHAT_ANSWER.split(' ')
+        return [' '.join(words[i:i + self.chunk_words]) + (' ' if i + self.chunk_words < len(words) else '')
+                for i in range(0, len(words), self.chunk_words)]
+
+    def handle(self, handler, payload):
+        wait = self._take_token()
+        if wait is not None:
+            retry_after = max(1, math.ceil(wait))
+            self._send(handler, 429, {'error': {
+                'code': 429, 'status': 'RESOURCE_EXHAUSTED', 'message': 'Quota exceeded',
+                'details': [{'@type': 'type.googleapis.com/google.rpc.RetryInfo', 'retryDelay': f'{retry_after}s'}]
+            }}, {'Retry-After': str(retry_after)})
+            return
+
+        with self._lock:
+            self._in_flight += 1
+            self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], self._in_flight)
+        try:
+            time.sleep(self.latency)
+            chunks = self.chunks(payload['contents'][0]['parts'][0]['text'])
+            if ':streamGenerateContent' in handler.path:
+                self._stream(handler, chunks)
+            else:
+                time.sleep(self.chunk_delay * (len(chunks) - 1))
+                self._send(handler, 200, {'candidates': [{'content': {'parts': [{'text': ''.join(chunks)}]}}]})
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _stream(self, handler, chunks):
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+        for n, text in enumerate(chunks):
+            if n:
+                time.sleep(self.chunk_delay)
+            event = json.dumps({'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}]})
+            data = f"data: {event}\r\n\r\n".encode('utf-8')
+            handler.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            handler.wfile.flush()
+        handler.wfile.write(b"0\r\n\r\n")
+
+    def _send(self, handler, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a mock Gemini API server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--rate', type=float, default=20.0)
+    parser.add_argument('--chunk-delay', type=float, default=0.15)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(args.latency, args.rate, port=args.port, chunk_delay=args.chunk_delay)
+    print(f"Mock Gemini API at {server.base_url} (latency {args.latency}s, {args.rate} req/s)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Measure scraper parsing throughput (pages per second) on saved HTML fixtures,
+comparing the original html.parser extractors with the single-pass ones.
+
+Save real pages once (needs network), then benchmark offline from the
+repository root:
+
+    python benchmarks/scraper_parse_benchmark.py --save
+    python benchmarks/scraper_parse_benchmark.py
+
+Fixtures are named <kind>_<n>.html where kind is one of constructionnews,
+bbc, hse-network, hse-press or article. Without fixtures, synthetic pages
+of similar shape are generated.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import HealthSafetyScraper
+
+FIXTURE_DIR = os.path.join('benchmarks', 'fixtures', 'scraper')
+
+
+# Extractors as they were before the single-pass rewrite, kept for comparison
+
+def legacy_select_links(html, base_url, selectors, source, accept):
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for selector in selectors:
+        for a_tag in soup.select(selector):
+            if not a_tag.get('href'):
+                continue
+            title = a_tag.get_text(strip=True)
+            url = urljoin(base_url, a_tag['href'])
+            if title and url not in [link['url'] for link in links] and accept(title, url):
+                links.append({'title': title, 'url': url, 'source': source,
+                              'scraped_at': datetime.now().isoformat()})
+    return links
+
+
+def legacy_constructionnews(html, base_url):
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for h2 in soup.find_all('h2'):
+        a_tag = h2.find('a', href=True)
+        if a_tag:
+            title = a_tag.get_text(strip=True)
+            url = urljoin(base_url, a_tag['href'])
+            if title and '/health-and-safety/' in url:
+                links.append({'title': title, 'url': url, 'source': 'constructionnews',
+                              'scraped_at': datetime.now().isoformat()})
+    return links
+
+
+LEGACY_EXTRACTORS = {
+    'constructionnews': legacy_constructionnews,
+    'bbc': lambda html, base: legacy_select_links(
+        html, base, ['div.liverpool-card div.anchor-inner-wrapper a', 'div[data-testid="liverpool-card"] a',
+                     'article a', '.media__link'], 'bbc', lambda t, u: True),
+    'hse-network': lambda html, base: legacy_select_links(
+        html, base, ['article a[href]', '.post-title a[href]', 'h2 a[href]', 'h3 a[href]'], 'hse-network',
+        lambda t, u: len(t) > 10 and 'hse-network.com' in u),
+    'hse-press': lambda html, base: legacy_select_links(
+        html, base, ['h2 a[href]', '.entry-title a[href]', 'article h2 a[href]', 'h3 a[href]'], 'hse-press',
+        lambda t, u: 'press.hse.gov.uk' in u),
+}
+
+
+def legacy_article_text(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside',
+                         'noscript', 'iframe', '.advertisement', '.ads',
+                         '.social-share', '.navigation', '.sidebar']):
+        element.decompose()
+    content = None
+    for selector in ['article .content', 'article .post-content', 'article .entry-content',
+                     '.main-content article', '.content article', 'article', '.post-content',
+                     '.entry-content', '#content', 'main', '.main']:
+        content = soup.select_one(selector)
+        if content and len(content.get_text(strip=True)) > 100:
+            break
+    if not content:
+        content = soup.find('body')
+    return ' '.join(content.get_text(separator=' ', strip=True).split()) if content else None
+
+
+def synthetic_fixtures():
+    """Listing and article pages shaped like the scraped sites"""
+    nav = ''.join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(60))
+    chrome = f'<header><nav><ul>{nav}</ul></nav></header><script>var x = 1;</script>'
+    footer = f'<footer><ul>{nav}</ul></footer>'
+
+    cards = ''.join(
+        f'<article class="post"><h2 class="entry-title post-title"><a href="story-{i}/">'
+        f'Worker injured in incident number {i} at site</a></h2>'
+        f'<div class="liverpool-card" data-testid="liverpool-card"><div class="anchor-inner-wrapper">'
+        f'<a href="/health-and-safety/story-{i}" class="media__link">Card {i} headline text</a></div></div>'
+        f'<p>{"Summary text. " * 20}</p>'
+        f'<h2><a href="/health-and-safety/story-{i}">Story {i}</a> <a href="/health-and-safety/more-{i}">More</a></h2>'
+        f'</article>'
+        for i in range(80))
+    listing = f'<html><body>{chrome}<main>{cards}</main><aside>{nav}</aside>{footer}</body></html>'
+
+    paragraphs = ''.join(f'<p>{"The inspector found serious failings on the site. " * 8}</p>' for _ in range(40))
+    article = (f'<html><body>{chrome}<div class="main-content"><article><h1>Headline</h1>'
+               f'<div class="entry-content">{paragraphs}</div></article></div>'
+               f'<aside>{nav}</aside>{footer}</body></html>')
+
+    fixtures = [(kind, listing) for kind in LEGACY_EXTRACTORS]
+    fixtures += [('article', article)] * 4
+    return fixtures
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        kind = os.path.basename(path).rsplit('_', 1)[0]
+        if kind in LEGACY_EXTRACTORS or kind == 'article':
+            with open(path, 'r', encoding='utf-8') as f:
+                fixtures.append((kind, f.read()))
+    return fixtures
+
+
+def save_fixtures(directory, articles_per_site):
+    """Fetch each site's listing page and a few of its articles"""
+    os.makedirs(directory, exist_ok=True)
+    scraper = HealthSafetyScraper(index_path=None)
+    kinds = ['constructionnews', 'bbc', 'hse-network', 'hse-press']
+    n = 0
+    for kind, site in zip(kinds, scraper.site_configs()):
+        html = scraper.fetch_page(site['url'])
+        if not html:
+            continue
+        with open(os.path.join(directory, f'{kind}_0.html'), 'w', encoding='utf-8') as f:
+            f.write(html)
+        for link in site['extractor'](html, site['url'])[:articles_per_site]:
+            article = scraper.fetch_page(link['url'])
+            if article:
+                with open(os.path.join(directory, f'article_{n}.html'), 'w', encoding='utf-8') as f:
+                    f.write(article)
+                n += 1
+    print(f"Saved fixtures to {directory}")
+
+
+def comparable(result):
+    """Extractor output without the scrape timestamps"""
+    if isinstance(result, list):
+        return [(link['title'], link['url'], link['source']) for link in result]
+    return result
+
+
+def mismatches(parse_page, legacy, fixtures):
+    """Fixtures whose links (in order) or article text differ from the legacy extractors"""
+    return [f'{kind} #{n}' for n, (kind, html) in enumerate(fixtures)
+            if comparable(parse_page(kind, html)) != comparable(legacy(kind, html))]
+
+
+def measure(parse_page, fixtures, min_seconds):
+    """Pages parsed per second, cycling through the fixtures for at least min_seconds"""
+    pages = 0
+    start = time.perf_counter()
+    while True:
+        for kind, html in fixtures:
+            parse_page(kind, html)
+        pages += len(fixtures)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraper HTML parsing')
+    parser.add_argument('--fixtures', default=FIXTURE_DIR)
+    parser.add_argument('--save', action='store_true', help='Fetch live pages into the fixture directory first')
+    parser.add_argument('--articles-per-site', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=3.0, help='Minimum time per variant')
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.fixtures, args.articles_per_site)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No fixtures in {args.fixtures}; using synthetic pages")
+        fixtures = synthetic_fixtures()
+
+    base_urls = {kind: site['url'] for kind, site in
+                 zip(['constructionnews', 'bbc', 'hse-network', 'hse-press'],
+                     HealthSafetyScraper(index_path=None).site_configs())}
+
+    def legacy(kind, html):
+        if kind == 'article':
+            return legacy_article_text(html)
+        return LEGACY_EXTRACTORS[kind](html, base_urls[kind])
+
+    def current(backend):
+        scraper = HealthSafetyScraper(index_path=None, parser=backend)
+        extractors = {kind: site['extractor'] for kind, site in
+                      zip(['constructionnews', 'bbc', 'hse-network', 'hse-press'], scraper.site_configs())}
+
+        def parse_page(kind, html):
+            if kind == 'article':
+                return scraper.extract_article_text(html)
+            return extractors[kind](html, base_urls[kind])
+        return parse_page
+
+    variants = [('legacy html.parser', legacy), ('single-pass html.parser', current('html.parser'))]
+    try:
+        import lxml  # noqa: F401
+        variants.append(('single-pass lxml', current('lxml')))
+    except ImportError:
+        print("lxml not installed; skipping the lxml backend")
+
+    for name, parse_page in variants[1:]:
+        different = mismatches(parse_page, legacy, fixtures)
+        if different:
+            print(f"{name} differs from the legacy extractors on: {', '.join(different)}")
+            return 1
+    print(f"Links (in order) and article text match the legacy extractors on every fixture")
+
+    print(f"{len(fixtures)} pages ({sum(k == 'article' for k, _ in fixtures)} articles)\n")
+    print(f"{'variant':<26}{'pages/s':>10}{'speedup':>10}")
+    baseline = None
+    for name, parse_page in variants:
+        rate = measure(parse_page, fixtures, args.seconds)
+        baseline = baseline or rate
+        print(f"{name:<26}{rate:>10.1f}{rate / baseline:>9.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
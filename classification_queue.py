@@ -0,0 +1,333 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+class ClassificationQueue:
+    """
+    Durable photo classification job queue stored in the HSSE SQLite database.
+    Jobs move pending -> running -> done, or back to pending for a retry and
+    finally failed once max_attempts is used up.
+
+    Each claim takes a lease with a fresh owner token. A worker whose lease
+    expired and was claimed by another worker cannot complete or fail the
+    job any more, so a slow worker never adds a duplicate classification.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3, lease_seconds: int = 300):
+        """
+        Initialize the queue and create its table if needed
+
+        Args:
+            db_path: Path to the SQLite database shared with the web app
+            max_attempts: Tries per photo before the job is marked failed
+            lease_seconds: How long a running job may go without finishing
+                before another worker assumes its owner crashed and retries it
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._wakeup = threading.Event()
+        self.init_schema()
+
+    def _connect(self):
+        # Autocommit mode so claims can use an explicit BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_schema(self):
+        conn = self._connect()
+        try:
+            # WAL lets the web process enqueue while worker processes read and write
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS classification_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    report_id INTEGER,
+                    photo_id INTEGER NOT NULL UNIQUE,
+                    file_path TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # Added after the table was first released; older databases get it here
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(classification_jobs)')}
+            if 'lease_owner' not in columns:
+                conn.execute('ALTER TABLE classification_jobs ADD COLUMN lease_owner TEXT')
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_classification_jobs_status ON classification_jobs(status, id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_classification_jobs_report ON classification_jobs(report_id)"
+            )
+        finally:
+            conn.close()
+
+    def enqueue(self, conn, report_id: int, photo_id: int, file_path: str):
+        """
+        Add a job using the caller's connection so it commits together with
+        the photo row it belongs to
+        """
+        conn.execute(
+            'INSERT INTO classification_jobs(report_id,photo_id,file_path) VALUES(?,?,?)',
+            (report_id, photo_id, file_path)
+        )
+
+    def notify(self):
+        """Wake idle in-process workers after new jobs are committed"""
+        self._wakeup.set()
+
+    def wait_for_work(self, timeout: float):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest pending (or abandoned) job, if any
+
+        An abandoned job whose attempts are used up is marked failed instead,
+        so a photo that kills its worker process is not retried forever.
+        """
+        owner = uuid.uuid4().hex
+        expired = f'-{int(self.lease_seconds)} seconds'
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            exhausted = conn.execute(
+                """SELECT id, photo_id FROM classification_jobs
+                   WHERE status = 'running' AND updated_at < datetime('now', ?) AND attempts >= ?""",
+                (expired, self.max_attempts)
+            ).fetchall()
+            if exhausted:
+                conn.executemany(
+                    """UPDATE classification_jobs
+                       SET status = 'failed', error = 'lease expired', lease_owner = NULL,
+                           updated_at = CURRENT_TIMESTAMP
+                       WHERE id = ?""",
+                    [(job['id'],) for job in exhausted]
+                )
+                # Same record fail() leaves when the last attempt raises
+                conn.executemany(
+                    'INSERT INTO photo_classifications(photo_id,results_json) VALUES(?,?)',
+                    [(job['photo_id'], json.dumps(['Analysis failed'])) for job in exhausted]
+                )
+                logger.warning(f"Classification jobs {[job['id'] for job in exhausted]} failed: "
+                               f"lease expired after {self.max_attempts} attempts")
+            row = conn.execute(
+                """SELECT * FROM classification_jobs
+                   WHERE status = 'pending'
+                      OR (status = 'running' AND updated_at < datetime('now', ?) AND attempts < ?)
+                   ORDER BY id LIMIT 1""",
+                (expired, self.max_attempts)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    """UPDATE classification_jobs
+                       SET status = 'running', attempts = attempts + 1, lease_owner = ?,
+                           updated_at = CURRENT_TIMESTAMP
+                       WHERE id = ?""",
+                    (owner, row['id'])
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        if not row:
+            return None
+        job = dict(row)
+        job['attempts'] += 1
+        job['lease_owner'] = owner
+        return job
+
+    @staticmethod
+    def _release(conn, job: Dict[str, Any], status: str, error: Optional[str]) -> bool:
+        # Only the holder of the current lease may finish the job
+        cursor = conn.execute(
+            """UPDATE classification_jobs
+               SET status = ?, error = ?, lease_owner = NULL, updated_at = CURRENT_TIMESTAMP
+               WHERE id = ? AND status = 'running' AND lease_owner = ?""",
+            (status, error, job['id'], job['lease_owner'])
+        )
+        if cursor.rowcount != 1:
+            logger.warning(f"Lease on classification job {job['id']} (photo {job['photo_id']}) was lost; "
+                           f"discarding this attempt's result")
+            return False
+        return True
+
+    def complete(self, job: Dict[str, Any], results: list) -> bool:
+        """
+        Store the classification and mark the job done in one transaction
+
+        Returns:
+            False if the lease had passed to another worker and nothing was stored
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if not self._release(conn, job, 'done', None):
+                conn.execute('ROLLBACK')
+                return False
+            conn.execute(
+                'INSERT INTO photo_classifications(photo_id,results_json) VALUES(?,?)',
+                (job['photo_id'], json.dumps(results))
+            )
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """
+        Return the job to pending for a retry, or mark it failed for good
+
+        Returns:
+            False if the lease had passed to another worker and nothing was changed
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            retry = job['attempts'] < self.max_attempts
+            if not self._release(conn, job, 'pending' if retry else 'failed', error):
+                conn.execute('ROLLBACK')
+                return False
+            if not retry:
+                # Keep the old behaviour of recording a failed classification
+                conn.execute(
+                    'INSERT INTO photo_classifications(photo_id,results_json) VALUES(?,?)',
+                    (job['photo_id'], json.dumps(['Analysis failed']))
+                )
+            conn.execute('COMMIT')
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def report_status(self, report_id: int) -> List[Dict[str, Any]]:
+        """Classification status and results for every photo in a report"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """SELECT j.photo_id, j.status, j.attempts, j.error, j.updated_at,
+                          (SELECT pc.results_json FROM photo_classifications pc
+                           WHERE pc.photo_id = j.photo_id
+                           ORDER BY pc.rowid DESC LIMIT 1) AS results_json
+                   FROM classification_jobs j
+                   WHERE j.report_id = ?
+                   ORDER BY j.photo_id""",
+                (report_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+        photos = []
+        for row in rows:
+            photos.append({
+                'photo_id': row['photo_id'],
+                'status': row['status'],
+                'attempts': row['attempts'],
+                'error': row['error'],
+                'updated_at': row['updated_at'],
+                'results': json.loads(row['results_json']) if row['results_json'] else None
+            })
+        return photos
+
+class ClassificationWorkerPool:
+    """Threads that drain a ClassificationQueue with a classify(file_path) callable"""
+
+    def __init__(self, job_queue: ClassificationQueue, classify: Callable[[str], list],
+                 workers: int = 2, poll_interval: float = 1.0):
+        self.job_queue = job_queue
+        self.classify = classify
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f'classifier-{i}')
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.workers} photo classification workers")
+
+    def stop(self):
+        self._stop.set()
+        self.job_queue.notify()
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.job_queue.claim()
+            except sqlite3.Error as e:
+                logger.error(f"Could not claim classification job: {e}")
+                time.sleep(self.poll_interval)
+                continue
+
+            if not job:
+                self.job_queue.wait_for_work(self.poll_interval)
+                continue
+
+            try:
+                results = self.classify(job['file_path'])
+            except Exception as e:
+                logger.warning(f"Classification failed for photo {job['photo_id']} "
+                               f"(attempt {job['attempts']}): {e}")
+                self._finish(self.job_queue.fail, job, str(e))
+                continue
+
+            self._finish(self.job_queue.complete, job, results)
+
+    def _finish(self, finish: Callable, job: Dict[str, Any], outcome):
+        # A locked database must not kill the worker; the job stays leased and
+        # is retried by whichever worker claims it after the lease expires
+        try:
+            finish(job, outcome)
+        except sqlite3.Error as e:
+            logger.error(f"Could not record classification job {job['id']}: {e}")
+            time.sleep(self.poll_interval)
+
+if __name__ == "__main__":
+    # Standalone worker process sharing the web app's database and model setup
+    parser = argparse.ArgumentParser(description='Run photo classification workers')
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Stop the imported app from starting its own in-process workers
+    os.environ['CLASSIFY_WORKERS'] = '0'
+    import app as hsse_app
+
+    pool = ClassificationWorkerPool(hsse_app.classification_queue, hsse_app.classify_photo,
+                                    workers=args.workers)
+    pool.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        print("\nStopping classification workers")
+        pool.stop()
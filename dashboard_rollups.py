@@ -0,0 +1,111 @@
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Per-day and per-month report counts kept current by triggers on `reports`,
+# so dashboard counts are primary-key lookups instead of strftime() table scans
+ROLLUP_TABLES = [
+    """CREATE TABLE IF NOT EXISTS report_daily_counts (
+        day TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS report_monthly_counts (
+        month TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )"""
+]
+
+ROLLUP_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_insert
+       AFTER INSERT ON reports WHEN NEW.created_at IS NOT NULL
+       BEGIN
+           INSERT INTO report_daily_counts(day, count) VALUES (date(NEW.created_at), 1)
+               ON CONFLICT(day) DO UPDATE SET count = count + 1;
+           INSERT INTO report_monthly_counts(month, count) VALUES (strftime('%Y-%m', NEW.created_at), 1)
+               ON CONFLICT(month) DO UPDATE SET count = count + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_delete
+       AFTER DELETE ON reports WHEN OLD.created_at IS NOT NULL
+       BEGIN
+           UPDATE report_daily_counts SET count = count - 1 WHERE day = date(OLD.created_at);
+           UPDATE report_monthly_counts SET count = count - 1 WHERE month = strftime('%Y-%m', OLD.created_at);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_reports_rollup_update
+       AFTER UPDATE OF created_at ON reports
+       BEGIN
+           UPDATE report_daily_counts SET count = count - 1
+               WHERE OLD.created_at IS NOT NULL AND day = date(OLD.created_at);
+           UPDATE report_monthly_counts SET count = count - 1
+               WHERE OLD.created_at IS NOT NULL AND month = strftime('%Y-%m', OLD.created_at);
+           INSERT INTO report_daily_counts(day, count)
+               SELECT date(NEW.created_at), 1 WHERE NEW.created_at IS NOT NULL
+               ON CONFLICT(day) DO UPDATE SET count = count + 1;
+           INSERT INTO report_monthly_counts(month, count)
+               SELECT strftime('%Y-%m', NEW.created_at), 1 WHERE NEW.created_at IS NOT NULL
+               ON CONFLICT(month) DO UPDATE SET count = count + 1;
+       END"""
+]
+
+DASHBOARD_INDEXES = [
+    'CREATE INDEX IF NOT EXISTS idx_reports_created_at ON reports(created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_reports_lat_lon ON reports(latitude, longitude)'
+]
+
+REGIONAL_INDEX = 'CREATE INDEX IF NOT EXISTS idx_regional_data_incident_count ON regional_data(incident_count DESC)'
+
+def _exists(conn, kind, name):
+    return conn.execute(
+        'SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?', (kind, name)
+    ).fetchone() is not None
+
+def init_dashboard_rollups(db_path: str):
+    """
+    Create the rollup tables, triggers and dashboard indexes. The first time
+    the triggers are installed the rollups are backfilled from existing
+    reports in the same transaction, so no insert is counted twice.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        if not _exists(conn, 'table', 'reports'):
+            logger.warning("reports table not found; skipping dashboard rollups")
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for statement in ROLLUP_TABLES:
+                conn.execute(statement)
+
+            if not _exists(conn, 'trigger', 'trg_reports_rollup_insert'):
+                conn.execute('DELETE FROM report_daily_counts')
+                conn.execute('DELETE FROM report_monthly_counts')
+                conn.execute("""
+                    INSERT INTO report_daily_counts(day, count)
+                    SELECT date(created_at), COUNT(*) FROM reports
+                    WHERE created_at IS NOT NULL GROUP BY date(created_at)
+                """)
+                conn.execute("""
+                    INSERT INTO report_monthly_counts(month, count)
+                    SELECT strftime('%Y-%m', created_at), COUNT(*) FROM reports
+                    WHERE created_at IS NOT NULL GROUP BY strftime('%Y-%m', created_at)
+                """)
+                logger.info("Backfilled report rollups from existing reports")
+
+            for statement in ROLLUP_TRIGGERS + DASHBOARD_INDEXES:
+                conn.execute(statement)
+            if _exists(conn, 'table', 'regional_data'):
+                conn.execute(REGIONAL_INDEX)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+def monthly_report_count(conn, months_ago: int = 0) -> int:
+    """Reports created in the current month (or `months_ago` months back)"""
+    row = conn.execute(
+        "SELECT count FROM report_monthly_counts WHERE month = strftime('%Y-%m', 'now', ?)",
+        (f'-{int(months_ago)} month',)
+    ).fetchone()
+    return row['count'] if row else 0
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+def file_fingerprint(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    SHA-256 of a weights file, or of every file in an exported model
+    directory, read in chunks so large weights stay cheap
+    """
+    if os.path.isdir(path):
+        files = sorted(os.path.join(root, name)
+                       for root, _, names in os.walk(path) for name in names)
+    else:
+        files = [path]
+
+    digest = hashlib.sha256()
+    for file in files:
+        with open(file, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class DetectionCache:
+    """
+    Two-tier cache of PPE analysis results keyed by image content and model.
+    An in-memory LRU sits in front of a SQLite table that is trimmed by size.
+    """
+
+    def __init__(self, db_path: str, model_fingerprint: str,
+                 memory_items: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite file for the persistent tier
+            model_fingerprint: Identifies the weights and analysis settings, so
+                results from a different model are never served
+            memory_items: Entries kept in the in-memory LRU tier
+            max_bytes: Total size of stored results before the oldest are evicted
+        """
+        self.db_path = db_path
+        self.model_fingerprint = model_fingerprint
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0
+        }
+        self.init_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS detection_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    results_json TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_detection_cache_last_used ON detection_cache(last_used_at)"
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def key_for(self, image_bytes: bytes) -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return f"{self.model_fingerprint}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return cached results for a key, promoting disk hits into memory"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._memory[key]
+
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT results_json FROM detection_cache WHERE cache_key = ?', (key,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        'UPDATE detection_cache SET last_used_at = CURRENT_TIMESTAMP WHERE cache_key = ?',
+                        (key,)
+                    )
+                    conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Detection cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if not row:
+                self.stats['misses'] += 1
+                return None
+            self.stats['disk_hits'] += 1
+            results = json.loads(row['results_json'])
+            self._remember(key, results)
+            return results
+
+    def put(self, key: str, results: Any):
+        """Store results in both tiers and trim the persistent tier to max_bytes"""
+        with self._lock:
+            self._remember(key, results)
+
+        payload = json.dumps(results)
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    '''INSERT OR REPLACE INTO detection_cache(cache_key,results_json,size)
+                       VALUES(?,?,?)''',
+                    (key, payload, len(payload))
+                )
+                self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Detection cache write failed: {e}")
+
+    def _remember(self, key, results):
+        self._memory[key] = results
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM detection_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used rows until the table fits again
+        excess = total - self.max_bytes
+        rows = conn.execute(
+            'SELECT cache_key, size FROM detection_cache ORDER BY last_used_at, created_at'
+        )
+        doomed = []
+        for row in rows:
+            if excess <= 0:
+                break
+            doomed.append((row['cache_key'],))
+            excess -= row['size']
+
+        conn.executemany('DELETE FROM detection_cache WHERE cache_key = ?', doomed)
+        with self._lock:
+            self.stats['evictions'] += len(doomed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_items'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Export the trained PPE detector for the alternative inference backends.
+
+    python export_model.py                          # ONNX only
+    python export_model.py --formats onnx onnx-int8 openvino openvino-int8
+
+Select the served backend with MODEL_BACKEND=<name> when starting app.py, and
+compare them first with benchmarks/backend_benchmark.py.
+"""
+
+import argparse
+import os
+import sys
+
+from model_backends import MODEL_BACKENDS, MODEL_DIR, backend_path, dataset_yaml
+
+def export_onnx(model, imgsz):
+    # Dynamic axes so the batch scheduler can send more than one image
+    return model.export(format='onnx', imgsz=imgsz, dynamic=True, simplify=True)
+
+def export_onnx_int8(model, imgsz, model_dir):
+    """Dynamic (weight-only) INT8 quantization of the ONNX export"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    onnx_path = backend_path('onnx', model_dir)
+    if not os.path.exists(onnx_path):
+        onnx_path = export_onnx(model, imgsz)
+
+    int8_path = backend_path('onnx-int8', model_dir)
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+def export_openvino(model, imgsz, int8=False, data=None):
+    # INT8 uses post-training quantization calibrated on the dataset
+    return model.export(format='openvino', imgsz=imgsz, dynamic=True, int8=int8, data=data)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the PPE model for other inference backends')
+    parser.add_argument('--weights', default=backend_path('pytorch'), help='Trained PyTorch weights')
+    parser.add_argument('--formats', nargs='+', default=['onnx'],
+                        choices=[b for b in MODEL_BACKENDS if b != 'pytorch'])
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--dataset', default='data/css-data', help='Calibration data for openvino-int8')
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    model_dir = os.path.dirname(args.weights) or MODEL_DIR
+    model = YOLO(args.weights)
+    data = None
+
+    for fmt in args.formats:
+        print(f"Exporting {fmt}...")
+        if fmt == 'onnx':
+            path = export_onnx(model, args.imgsz)
+        elif fmt == 'onnx-int8':
+            path = export_onnx_int8(model, args.imgsz, model_dir)
+        elif fmt == 'openvino':
+            path = export_openvino(model, args.imgsz)
+        else:
+            data = data or dataset_yaml(args.dataset)
+            path = export_openvino(model, args.imgsz, int8=True, data=data)
+        print(f"  {fmt}: {path}")
+
+    if data:
+        os.remove(data)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
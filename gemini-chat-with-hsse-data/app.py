@@ -1,46 +1,42 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 from dotenv import load_dotenv
 import os
-import json
 import requests
 from datetime import datetime
+from gemini_stream import DEFAULT_BASE_URL, stream_url, stream_text, sse, sse_answer
+from incident_index import IncidentIndex
 
 load_dotenv()
 
 app = Flask(__name__)
 
-# === Load HSSE JSON Data ===
-with open("processed_articles_20250705_172810.json", "r", encoding="utf-8") as f:
-    hsse_data = json.load(f)
-
-dashboard_summary = hsse_data.get("dashboard_summary", "")
-article_summaries = []
-
-for i, article in enumerate(hsse_data.get("articles", [])):
-    summary = article.get("gemini_summary", {})
-    if isinstance(summary, dict):
-        company = summary.get("company", "Unknown")
-        incident_type = summary.get("type", "Unknown")
-        summary_text = summary.get("summary", "")
-        article_summaries.append(f"{i+1}. [{company}] ({incident_type}) - {summary_text}")
-
-incident_summary_text = "\n".join(article_summaries)
+# === HSSE Incident Index ===
+# Questions carry only the most relevant incidents instead of the whole history
+CHAT_TOP_K = int(os.getenv("CHAT_TOP_K", "8"))
+incident_index = IncidentIndex(
+    ".", db_path=os.getenv("HSSE_DB_PATH", os.path.join("..", "db", "hsse.db"))
+)
+incident_index.refresh(force=True)
 
 # === Gemini API Setup ===
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
+GEMINI_URL = f"{os.getenv('GEMINI_BASE_URL', DEFAULT_BASE_URL)}/models/gemini-2.0-flash:generateContent"
+GEMINI_STREAM_URL = stream_url(GEMINI_URL)
 HEADERS = {
     "Content-Type": "application/json",
     "X-goog-api-key": GEMINI_API_KEY
 }
 
-def ask_gemini(user_prompt):
-    prompt = f"""You are an HSSE incident analysis assistant. Only use the information provided below.
+def build_prompt(user_prompt):
+    incidents = incident_index.search(user_prompt, CHAT_TOP_K)
+    incident_summary_text = "\n".join(f"{i+1}. {doc['text']}" for i, doc in enumerate(incidents))
+
+    return f"""You are an HSSE incident analysis assistant. Only use the information provided below.
 
 DASHBOARD SUMMARY:
-{dashboard_summary.strip()}
+{incident_index.dashboard_summary.strip()}
 
-INCIDENT SUMMARIES:
+INCIDENT SUMMARIES (the {len(incidents)} most relevant of {len(incident_index)} on record):
 {incident_summary_text.strip()}
 
 USER QUESTION:
@@ -51,6 +47,9 @@ Rules:
 - Only use this data to answer.
 - If the question cannot be answered from the data, say so.
 """
+
+def ask_gemini(user_prompt):
+    prompt = build_prompt(user_prompt)
     payload = {
         "contents": [
             {
@@ -67,27 +66,49 @@ Rules:
         return parts[0].get("text", "") if parts else "No answer found in data."
     return f"Error from Gemini: {response.status_code}"
 
-@app.route('/')
-def index():
-    return render_template("index.html")
-
-@app.route('/ask', methods=['POST'])
-def ask():
-    user_input = request.json.get('message')
-    response_text = ask_gemini(user_input)
-
+def report_file_for(user_input):
     # Optional logic to include a file based on keywords
-    file_info = None
     if any(kw in user_input.lower() for kw in ["summary", "report", "pdf"]):
         file_path = "static/sample_report.pdf"
         if os.path.exists(file_path):
-            file_info = {
+            return {
                 "name": os.path.basename(file_path),
                 "size": f"{os.path.getsize(file_path) // 1024} KB",
                 "url": f"/static/{os.path.basename(file_path)}"
             }
+    return None
+
+@app.route('/')
+def index():
+    return render_template("index.html")
+
+@app.route('/ask', methods=['POST'])
+def ask():
+    user_input = request.json.get('message')
+    response_text = ask_gemini(user_input)
+    file_info = report_file_for(user_input)
 
     return jsonify({"response": response_text, "file": file_info})
 
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    """/ask as server-sent events, relayed from streamGenerateContent as the answer is generated"""
+    user_input = request.json.get('message')
+    chunks = stream_text(GEMINI_STREAM_URL, HEADERS, build_prompt(user_input))
+
+    def generate():
+        file_info = report_file_for(user_input)
+        if file_info:
+            yield sse('file', file_info)
+        yield from sse_answer(chunks, empty_answer="No answer found in data.")
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/index/stats')
+def index_stats():
+    """Size of the incident index and search timings"""
+    return jsonify(incident_index.get_stats())
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5002, debug=True)
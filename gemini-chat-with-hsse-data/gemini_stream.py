@@ -0,0 +1,93 @@
+import json
+import logging
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# A sentence ends at . ! or ? (plus any closing quotes or brackets) followed
+# by whitespace, or at a line break. Text after the last boundary waits for
+# the next chunk, since the model may still be mid-sentence.
+SENTENCE_END = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+class GeminiStreamError(Exception):
+    """Gemini answered a streaming request with an error status"""
+
+def stream_url(generate_url: str) -> str:
+    """Server-sent events endpoint matching a generateContent URL"""
+    url = generate_url.replace(':generateContent', ':streamGenerateContent')
+    return url + ('&' if '?' in url else '?') + 'alt=sse'
+
+def stream_text(url: str, headers: dict, prompt: str, timeout=(10, 120), session=None) -> Iterator[str]:
+    """
+    Yield answer text from streamGenerateContent as the model produces it
+
+    Args:
+        url: streamGenerateContent URL with alt=sse (see stream_url)
+        headers: Request headers including the API key
+        prompt: Prompt text
+        timeout: Connect and between-chunk read timeouts in seconds
+        session: Optional requests session to reuse connections
+
+    Returns:
+        Iterator of text chunks
+    """
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    post = session.post if session is not None else requests.post
+
+    with post(url, headers=headers, json=payload, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            raise GeminiStreamError(f"Error from Gemini: {response.status_code}")
+
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            data = json.loads(line[5:].strip())
+            for candidate in data.get('candidates', [])[:1]:
+                for part in candidate.get('content', {}).get('parts', []):
+                    if part.get('text'):
+                        yield part['text']
+
+def split_sentences(buffer: str) -> Tuple[List[str], str]:
+    """Complete sentences at the front of `buffer` and the unfinished remainder"""
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        sentence = buffer[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    return sentences, buffer[start:]
+
+def sse(event: str, data: dict) -> str:
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_answer(chunks: Iterable[str], empty_answer: str = "I couldn't find an answer.") -> Iterator[str]:
+    """
+    Relay a streamed answer as server-sent events: `delta` for each chunk of
+    text, `sentence` as soon as each sentence is complete (so speech can
+    start on the first one), then `done` with the full answer, or `error`.
+    """
+    text = ''
+    pending = ''
+    try:
+        for chunk in chunks:
+            text += chunk
+            pending += chunk
+            yield sse('delta', {'text': chunk})
+
+            sentences, pending = split_sentences(pending)
+            for sentence in sentences:
+                yield sse('sentence', {'text': sentence})
+
+        if pending.strip():
+            yield sse('sentence', {'text': pending.strip()})
+        yield sse('done', {'response': text or empty_answer})
+    except (requests.RequestException, GeminiStreamError, ValueError) as e:
+        logger.error(f"Streaming answer failed: {e}")
+        yield sse('error', {'response': str(e) if isinstance(e, GeminiStreamError) else f"Internal error: {e}"})
@@ -0,0 +1,277 @@
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9£]+")
+
+STOPWORDS = frozenset("""
+a about after all an and any are as at be been by can did do does for from had has have
+how i in into is it its me most of on or our since so that the their them there these
+this those to us was we were what when where which who whom why will with you your
+""".split())
+
+def _stem(token: str) -> str:
+    # Light suffix stripping so "fined", "fines" and "fine" share a term
+    for suffix in ('ing', 'ies', 'ed', 'es', 's'):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix) and not token.endswith('ss'):
+            token = token[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+            break
+    return token[:-1] if len(token) > 3 and token.endswith('e') else token
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed terms without stopwords"""
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+class IncidentIndex:
+    """
+    BM25 index over processed news articles and submitted incident reports,
+    so each chat question carries only the incidents relevant to it.
+
+    The index follows its sources incrementally: processed_articles_*.json
+    files are re-read only when their mtime changes (articles are keyed by
+    URL, so the same story in several runs is indexed once), and report rows
+    are fetched by id after the last one seen.
+    """
+
+    def __init__(self, directory: str = '.', prefix: str = 'processed_articles_',
+                 db_path: Optional[str] = None, check_interval: float = 5.0,
+                 k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index
+
+        Args:
+            directory: Folder holding processed article files
+            prefix: File name prefix of processed article files
+            db_path: SQLite database with the `reports` table, None to skip reports
+            check_interval: Seconds between checks for new files and reports
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self.k1 = k1
+        self.b = b
+
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+
+        self._file_mtimes: Dict[str, int] = {}
+        self._last_report_id = 0
+        self._reports_version = None
+        self._next_check = 0.0
+        self.dashboard_summary = ''
+        self._dashboard_mtime = None
+        self.stats = {'files_loaded': 0, 'reports_loaded': 0, 'searches': 0, 'search_ms': 0.0}
+
+    # Index maintenance
+
+    def _add(self, key: str, text: str, indexed: str, source: str, sort_key: str):
+        self._remove(key)
+        terms = Counter(tokenize(indexed))
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[key] = tf
+        length = sum(terms.values())
+        self._docs[key] = {'key': key, 'text': text, 'source': source, 'length': length,
+                           'terms': list(terms), 'sort_key': sort_key}
+        self._total_length += length
+
+    def _remove(self, key: str):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for term in doc['terms']:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= doc['length']
+
+    def refresh(self, force: bool = False):
+        """Index new or changed article files and new reports; cheap when nothing changed"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        with self._lock:
+            if not force and now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+            self._refresh_files()
+            if self.db_path and os.path.exists(self.db_path):
+                self._refresh_reports()
+
+    def _refresh_files(self):
+        try:
+            names = [f for f in os.listdir(self.directory)
+                     if f.startswith(self.prefix) and f.endswith('.json')]
+        except OSError as e:
+            logger.error(f"Cannot list {self.directory}: {e}")
+            return
+
+        current = {}
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                current[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+
+        # Forget articles whose file was removed (unless a newer file has them too)
+        for path in set(self._file_mtimes) - set(current):
+            for key in [k for k, doc in self._docs.items() if doc['source'] == path]:
+                self._remove(key)
+            del self._file_mtimes[path]
+
+        # Oldest first, so the newest copy of a repeated article wins
+        for path in sorted(current, key=lambda p: current[p]):
+            if self._file_mtimes.get(path) != current[path]:
+                self._load_file(path, current[path])
+
+    def _load_file(self, path: str, mtime: int):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading {path}: {e}")
+            return
+
+        self._file_mtimes[path] = mtime
+        if data.get('dashboard_summary') and (self._dashboard_mtime is None or mtime >= self._dashboard_mtime):
+            self.dashboard_summary = data['dashboard_summary']
+            self._dashboard_mtime = mtime
+
+        count = 0
+        for article in data.get('articles', []):
+            summary = article.get('gemini_summary')
+            if not isinstance(summary, dict) or 'summary' not in summary:
+                continue
+            text = (f"[{summary.get('company', 'Unknown')}] ({summary.get('type', 'Unknown')}, "
+                    f"{summary.get('severity', 'Unknown')} severity, {summary.get('industry', 'Unknown')}) "
+                    f"at {summary.get('location', 'Unknown')} - {summary.get('summary', '')} "
+                    f"Fine: {summary.get('fine', 'None')}. Lesson: {summary.get('lesson', '')}")
+            indexed = f"{article.get('title', '')} {text} {article.get('content', '')[:1000]}"
+            key = f"article:{article.get('url') or article.get('title')}"
+            self._add(key, text, indexed, path, article.get('scraped_at') or article.get('processed_at') or '')
+            count += 1
+
+        self.stats['files_loaded'] += 1
+        logger.info(f"Indexed {count} articles from {path}")
+
+    def _refresh_reports(self):
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            try:
+                version = self._version(conn)
+                if version is not None and version == self._reports_version:
+                    return
+                rows = conn.execute("""
+                    SELECT id, incident_type, industry, company_name, description, location_text, created_at
+                    FROM reports WHERE id > ? ORDER BY id
+                """, (self._last_report_id,)).fetchall()
+
+                # Each insert bumps the version once; a larger jump means rows were
+                # updated or deleted, so re-read all reports
+                if (version is not None and self._reports_version is not None
+                        and version - self._reports_version > len(rows)):
+                    for key in [k for k, doc in self._docs.items() if doc['source'] == 'reports']:
+                        self._remove(key)
+                    self._last_report_id = 0
+                    rows = conn.execute("""
+                        SELECT id, incident_type, industry, company_name, description, location_text, created_at
+                        FROM reports ORDER BY id
+                    """).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error loading reports from {self.db_path}: {e}")
+            return
+
+        for row in rows:
+            text = (f"Internal report #{row['id']} [{row['company_name'] or 'Unknown'}] "
+                    f"({row['incident_type'] or 'Unknown'}, {row['industry'] or 'Unknown'}) "
+                    f"at {row['location_text'] or 'Unknown'} on {row['created_at']} - {row['description'] or ''}")
+            self._add(f"report:{row['id']}", text, text, 'reports', row['created_at'] or '')
+            self._last_report_id = max(self._last_report_id, row['id'])
+
+        self._reports_version = version
+        if rows:
+            self.stats['reports_loaded'] += len(rows)
+            logger.info(f"Indexed {len(rows)} reports")
+
+    @staticmethod
+    def _version(conn) -> Optional[int]:
+        # Maintained by the dashboard app's triggers (render_cache.py) when present
+        try:
+            row = conn.execute("SELECT version FROM data_versions WHERE name = 'reports'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row else None
+
+    # Queries
+
+    def search(self, query: str, k: int = 8) -> List[Dict[str, Any]]:
+        """
+        Most relevant incidents for a question
+
+        Args:
+            query: User question
+            k: Number of incidents returned
+
+        Returns:
+            Documents with `key`, `text` and `score`, best first. If no term
+            matches, the most recent incidents with score 0.
+        """
+        self.refresh()
+        start = time.perf_counter()
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[key]['length'] / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            if scores:
+                ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+            else:
+                ranked = sorted(self._docs, key=lambda key: self._docs[key]['sort_key'], reverse=True)[:k]
+            results = [{'key': key, 'text': self._docs[key]['text'], 'score': round(scores.get(key, 0.0), 3)}
+                       for key in ranked]
+
+            self.stats['searches'] += 1
+            self.stats['search_ms'] += (time.perf_counter() - start) * 1000
+        return results
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, documents=len(self._docs), terms=len(self._postings),
+                         files=len(self._file_mtimes))
+        stats['avg_search_ms'] = round(stats['search_ms'] / stats['searches'], 3) if stats['searches'] else 0.0
+        stats['search_ms'] = round(stats['search_ms'], 1)
+        return stats
@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class BatchInferenceScheduler:
+    """
+    Collects images from concurrent callers into dynamically sized batches
+    and runs them through a single YOLO model
+    """
+
+    def __init__(self, model, max_batch: int = 8, max_wait_ms: float = 10.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            model: Loaded ultralytics YOLO model
+            max_batch: Largest number of images sent to one predict call
+            max_wait_ms: How long the first image in a batch waits for company
+        """
+        self.model = model
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'batches': 0,
+            'images': 0,
+            'largest_batch': 0
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='yolo-batcher')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def submit(self, image) -> Future:
+        """
+        Queue one BGR image array for inference
+
+        Returns:
+            Future resolving to the ultralytics Results object for this image
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def predict(self, image, timeout: Optional[float] = None) -> Any:
+        """Run inference on one image and block until its result is ready"""
+        return self.submit(image).result(timeout=timeout)
+
+    def predict_many(self, images: list, timeout: Optional[float] = None) -> List[Any]:
+        """Queue several images at once so they can share batches, in order"""
+        futures = [self.submit(image) for image in images]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _collect_batch(self):
+        """Block for the first image, then gather more until full or max_wait passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Still take anything already waiting without blocking
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        images = [image for image, _ in batch]
+        futures = [future for _, future in batch]
+
+        try:
+            results = self.model.predict(source=images, save=False)
+        except Exception as e:
+            logger.error(f"Batch inference failed for {len(batch)} images: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self.stats['batches'] += 1
+        self.stats['images'] += len(batch)
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
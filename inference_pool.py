@@ -0,0 +1,285 @@
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import connection, resource_tracker, shared_memory
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A worker that keeps dying this soon after starting (e.g. it cannot load the
+# model) is given up on after MAX_QUICK_CRASHES in a row instead of respawned forever
+QUICK_CRASH_SECONDS = 30.0
+MAX_QUICK_CRASHES = 3
+
+def is_inference_worker() -> bool:
+    """
+    True inside an inference worker process. Spawned workers import the
+    application's __main__ module again, which can check this to skip
+    starting a pool or background threads of its own.
+    """
+    return mp.current_process().name.startswith('yolo-worker-')
+
+def _worker_main(model, model_path, task_queue, result_conn, max_batch, torch_threads):
+    """Inference worker process: read image handles, run YOLO, send back box arrays"""
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+
+    if model is None:
+        from ultralytics import YOLO
+        model = YOLO(model_path)
+
+    stopping = False
+    while not stopping:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        # Take whatever else is already queued so one forward pass covers it
+        tasks = [task]
+        while len(tasks) < max_batch:
+            try:
+                task = task_queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                stopping = True
+                break
+            tasks.append(task)
+
+        _run_tasks(model, tasks, result_conn)
+
+def _run_tasks(model, tasks, result_conn):
+    try:
+        images = []
+        for task_id, shm_name, shape, dtype in tasks:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                # Copy out so results never hold views into a block the parent frees
+                images.append(np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy())
+            finally:
+                shm.close()
+
+        results = model.predict(source=images, save=False)
+        for task, result in zip(tasks, results):
+            result_conn.send((task[0], result.boxes.data.cpu().numpy(), None))
+    except Exception as e:
+        for task in tasks:
+            result_conn.send((task[0], None, str(e)))
+
+class InferenceWorkerPool:
+    """
+    Pool of inference processes, each with its own YOLO model. Images travel
+    to the workers through shared memory; only the small box arrays come back,
+    through a pipe per worker.
+
+    Each task is assigned to one worker, so when a worker process dies (OOM,
+    segfault, CUDA abort) the futures it held fail instead of waiting forever,
+    their shared memory is released and the worker is restarted.
+
+    Replacements are always started with spawn and load the model from
+    model_path: by then the parent runs request and background threads, and
+    a forked child could inherit locks one of them held.
+    """
+
+    def __init__(self, model_path: str, workers: int = 2, max_batch: int = 8,
+                 model=None, torch_threads: Optional[int] = None):
+        """
+        Start the worker processes
+
+        Args:
+            model_path: Weights each worker loads when it cannot inherit a model
+            workers: Number of inference processes
+            max_batch: Most images a worker runs in one predict call
+            model: Already loaded model; with the fork start method workers
+                inherit it copy-on-write instead of loading the weights again
+            torch_threads: Intra-op threads per worker (default: cores / workers)
+        """
+        if 'fork' in mp.get_all_start_methods():
+            ctx = mp.get_context('fork')
+        else:
+            # Spawned workers re-import __main__, which must check
+            # is_inference_worker() before starting a pool of its own
+            ctx = mp.get_context('spawn')
+            model = None
+
+        if torch_threads is None:
+            torch_threads = max(1, (mp.cpu_count() or 1) // max(1, workers))
+
+        self._ctx = ctx
+        self._restart_ctx = mp.get_context('spawn')
+        self._worker_args = (model, model_path, max_batch, torch_threads)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._closing = False
+        self._stopped = False
+        self.stats = {'worker_restarts': 0, 'tasks_failed_by_crash': 0}
+
+        # Start the tracker before forking so workers share it rather than each
+        # starting their own, which would unlink blocks still in use when they exit
+        resource_tracker.ensure_running()
+
+        self._workers = [self._start_worker(i) for i in range(workers)]
+
+        self._collector = threading.Thread(target=self._collect, name='yolo-pool-collector')
+        self._collector.daemon = True
+        self._collector.start()
+        logger.info(f"Started {workers} inference worker processes ({torch_threads} threads each)")
+
+    def _start_worker(self, index: int, quick_crashes: int = 0, restart: bool = False) -> dict:
+        model, model_path, max_batch, torch_threads = self._worker_args
+        ctx = self._ctx
+        if restart:
+            # Never fork from the collector thread once the app's threads are running
+            ctx, model = self._restart_ctx, None
+        tasks = ctx.Queue()
+        reader, writer = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_worker_main,
+            args=(model, model_path, tasks, writer, max_batch, torch_threads),
+            name=f'yolo-worker-{index}'
+        )
+        process.daemon = True
+        process.start()
+        # Only the worker keeps the write end, so its death shows up as EOF
+        writer.close()
+        return {'index': index, 'process': process, 'tasks': tasks, 'results': reader, 'pending': set(),
+                'started': time.monotonic(), 'quick_crashes': quick_crashes}
+
+    def submit(self, image) -> Future:
+        """
+        Copy one BGR image into shared memory and queue it for a worker
+
+        Returns:
+            Future resolving to an (N, 6) array of [x1, y1, x2, y2, conf, cls]
+        """
+        image = np.ascontiguousarray(image)
+        shm = shared_memory.SharedMemory(create=True, size=max(image.nbytes, 1))
+        np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+
+        task_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            if self._closing:
+                shm.close()
+                shm.unlink()
+                raise RuntimeError("Inference pool closed")
+            if not self._workers:
+                shm.close()
+                shm.unlink()
+                raise RuntimeError("No inference workers running")
+            worker = min(self._workers, key=lambda w: len(w['pending']))
+            worker['pending'].add(task_id)
+            self._pending[task_id] = (future, shm, worker)
+            worker['tasks'].put((task_id, shm.name, image.shape, image.dtype.str))
+        return future
+
+    def predict(self, image, timeout: Optional[float] = None):
+        """Run inference on one image in a worker and wait for its boxes"""
+        return self.submit(image).result(timeout=timeout)
+
+    def _collect(self):
+        # Results and worker exits are watched together, so a crash is noticed
+        # even while no results are arriving
+        while True:
+            with self._lock:
+                workers = list(self._workers)
+            if self._stopped:
+                for worker in workers:
+                    self._drain(worker)
+                return
+
+            handles = {}
+            for worker in workers:
+                handles[worker['results']] = worker
+                handles[worker['process'].sentinel] = worker
+            for ready in connection.wait(list(handles), timeout=0.5):
+                worker = handles[ready]
+                self._drain(worker)
+                if not worker['process'].is_alive():
+                    self._worker_died(worker)
+
+    def _drain(self, worker: dict):
+        """Deliver every result the worker has already sent"""
+        results = worker['results']
+        try:
+            while not results.closed and results.poll():
+                self._deliver(*results.recv())
+        except (EOFError, OSError):
+            pass
+
+    def _deliver(self, task_id, boxes, error):
+        with self._lock:
+            entry = self._pending.pop(task_id, None)
+            if entry is not None:
+                entry[2]['pending'].discard(task_id)
+        if entry is None:
+            return
+        future, shm, _ = entry
+        shm.close()
+        shm.unlink()
+
+        if error is not None:
+            future.set_exception(RuntimeError(f"Inference worker failed: {error}"))
+        else:
+            future.set_result(boxes)
+
+    def _worker_died(self, worker: dict):
+        """Fail the tasks a dead worker held and start a replacement"""
+        process = worker['process']
+        process.join()
+        with self._lock:
+            if worker not in self._workers:
+                return
+            failed = [self._pending.pop(task_id) for task_id in worker['pending'] if task_id in self._pending]
+            worker['pending'].clear()
+            quick = time.monotonic() - worker['started'] < QUICK_CRASH_SECONDS
+            quick_crashes = worker['quick_crashes'] + 1 if quick else 0
+            restart = not self._closing and quick_crashes < MAX_QUICK_CRASHES
+            if restart:
+                replacement = self._start_worker(worker['index'], quick_crashes, restart=True)
+                self._workers[self._workers.index(worker)] = replacement
+                self.stats['worker_restarts'] += 1
+            else:
+                self._workers.remove(worker)
+            self.stats['tasks_failed_by_crash'] += len(failed)
+        worker['results'].close()
+
+        message = f"Inference worker {process.name} exited with code {process.exitcode}; failed {len(failed)} pending tasks"
+        if restart:
+            logger.error(f"{message} and restarted it")
+        elif not self._closing:
+            logger.error(f"{message}; not restarting it after {quick_crashes} quick crashes in a row")
+        elif failed:
+            logger.error(message)
+        for future, shm, _ in failed:
+            shm.close()
+            shm.unlink()
+            future.set_exception(RuntimeError(f"Inference worker {process.name} died (exit code {process.exitcode})"))
+
+    def close(self):
+        """Stop the workers and release any shared memory still in flight"""
+        with self._lock:
+            self._closing = True
+            workers = list(self._workers)
+        for worker in workers:
+            worker['tasks'].put(None)
+        for worker in workers:
+            worker['process'].join()
+
+        self._stopped = True
+        self._collector.join()
+
+        with self._lock:
+            for future, shm, _ in self._pending.values():
+                shm.close()
+                shm.unlink()
+                future.set_exception(RuntimeError("Inference pool closed"))
+            self._pending.clear()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+import yaml
+
+MODEL_DIR = 'model'
+DATASET_DIR = 'data/css-data'
+CLASSES_YAML = 'data/ppe.yaml'
+
+# Weights used by each inference backend. ultralytics picks the runtime from
+# the file type, so switching backend only means loading a different export.
+# Everything except 'pytorch' is produced by export_model.py.
+MODEL_BACKENDS = {
+    'pytorch': 'best.pt',
+    'onnx': 'best.onnx',
+    'onnx-int8': 'best-int8.onnx',
+    'openvino': 'best_openvino_model',
+    'openvino-int8': 'best_int8_openvino_model'
+}
+
+def backend_path(backend: str, model_dir: str = MODEL_DIR) -> str:
+    """Path of the weights for a backend name"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}'. Choose from: {', '.join(MODEL_BACKENDS)}")
+    return os.path.join(model_dir, MODEL_BACKENDS[backend])
+
+def load_model(backend: str, model_dir: str = MODEL_DIR):
+    """Load the YOLO detector for a backend"""
+    from ultralytics import YOLO
+
+    path = backend_path(backend, model_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No weights for backend '{backend}' at {path}. Run export_model.py first.")
+    return YOLO(path, task='detect')
+
+def dataset_yaml(dataset_dir: str = DATASET_DIR, classes_yaml: str = CLASSES_YAML) -> str:
+    """
+    Write a dataset YAML with absolute paths for validation and INT8 calibration.
+    data/ppe.yaml uses Windows-style paths relative to the notebook's folder.
+    """
+    with open(classes_yaml, 'r', encoding='utf-8') as f:
+        names = yaml.safe_load(f)['names']
+
+    data = {
+        'path': os.path.abspath(dataset_dir),
+        'train': 'train/images',
+        'val': 'valid/images',
+        'test': 'test/images',
+        'nc': len(names),
+        'names': names
+    }
+
+    fd, path = tempfile.mkstemp(prefix='ppe_', suffix='.yaml')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(data, f)
+    return path
@@ -0,0 +1,118 @@
+import logging
+import sqlite3
+import threading
+from typing import Callable, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Monotonic version of the reports table, bumped by triggers on every write,
+# so the /report insert path and any other writer invalidate cached renders
+VERSION_TABLE = """CREATE TABLE IF NOT EXISTS data_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+)"""
+
+VERSION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_reports_version_{event.lower()}
+       AFTER {event} ON reports
+       BEGIN
+           UPDATE data_versions SET version = version + 1 WHERE name = 'reports';
+       END"""
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+def init_data_version(db_path: str):
+    """Create the version table and the triggers that bump it on report writes"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'reports'").fetchone() is None:
+            logger.warning("reports table not found; skipping data version triggers")
+            return
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(VERSION_TABLE)
+            conn.execute("INSERT OR IGNORE INTO data_versions(name, version) VALUES ('reports', 0)")
+            for statement in VERSION_TRIGGERS:
+                conn.execute(statement)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+    finally:
+        conn.close()
+
+def data_version(conn, name: str = 'reports') -> int:
+    """Current version of a table; a primary-key lookup, cheap enough for every poll"""
+    try:
+        row = conn.execute('SELECT version FROM data_versions WHERE name = ?', (name,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return row[0] if row else 0
+
+class RenderCache:
+    """
+    Holds the latest rendering of a page keyed on a data version. Concurrent
+    requests for a version that is not cached yet wait for a single render
+    instead of each rendering the same output.
+    """
+
+    def __init__(self, name: str = 'render'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._version = None
+        self._value = None
+        self._inflight: Dict[int, threading.Event] = {}
+        self.stats = {'renders': 0, 'hits': 0, 'waits': 0, 'errors': 0}
+
+    def get(self, version: int, render: Callable[[], Any]) -> Any:
+        """
+        Rendered value for `version`, calling `render` at most once per version
+
+        Args:
+            version: Data version the caller observed
+            render: Builds the value for the current data
+
+        Returns:
+            The cached or freshly rendered value
+        """
+        while True:
+            with self._lock:
+                if self._version is not None and self._version >= version:
+                    self.stats['hits'] += 1
+                    return self._value
+                event = self._inflight.get(version)
+                leader = event is None
+                if leader:
+                    event = self._inflight[version] = threading.Event()
+                else:
+                    self.stats['waits'] += 1
+
+            if leader:
+                break
+            # Another request is rendering this version; if it failed, retry as leader
+            event.wait()
+
+        try:
+            value = render()
+        except Exception:
+            with self._lock:
+                self.stats['errors'] += 1
+                self._inflight.pop(version, None)
+            event.set()
+            raise
+
+        with self._lock:
+            self.stats['renders'] += 1
+            # A slower render of an older version must not replace a newer one
+            if self._version is None or version >= self._version:
+                self._version = version
+                self._value = value
+            self._inflight.pop(version, None)
+        event.set()
+        logger.info(f"Rendered {self.name} for data version {version}")
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, version=self._version)
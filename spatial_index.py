@@ -0,0 +1,207 @@
+import logging
+import math
+import sqlite3
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+# R*Tree over report coordinates kept in sync by triggers on `reports`, so
+# every insert path (the /report handler, imports, manual fixes) is indexed.
+# Points are stored as degenerate boxes (min == max).
+SPATIAL_TABLE = """CREATE VIRTUAL TABLE IF NOT EXISTS reports_rtree USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon
+)"""
+
+# The form posts coordinates as text; blank values must not land at (0, 0)
+_HAS_LOCATION = """{row}.latitude IS NOT NULL AND {row}.longitude IS NOT NULL
+           AND trim({row}.latitude) != '' AND trim({row}.longitude) != ''"""
+
+_INDEX_ROW = """INSERT OR REPLACE INTO reports_rtree(id, min_lat, max_lat, min_lon, max_lon)
+               VALUES (NEW.id, CAST(NEW.latitude AS REAL), CAST(NEW.latitude AS REAL),
+                       CAST(NEW.longitude AS REAL), CAST(NEW.longitude AS REAL))"""
+
+SPATIAL_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_insert
+       AFTER INSERT ON reports WHEN {_HAS_LOCATION.format(row='NEW')}
+       BEGIN
+           {_INDEX_ROW};
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_delete
+       AFTER DELETE ON reports
+       BEGIN
+           DELETE FROM reports_rtree WHERE id = OLD.id;
+       END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_reports_rtree_update
+       AFTER UPDATE OF latitude, longitude ON reports
+       BEGIN
+           DELETE FROM reports_rtree WHERE id = OLD.id;
+           INSERT OR REPLACE INTO reports_rtree(id, min_lat, max_lat, min_lon, max_lon)
+               SELECT NEW.id, CAST(NEW.latitude AS REAL), CAST(NEW.latitude AS REAL),
+                      CAST(NEW.longitude AS REAL), CAST(NEW.longitude AS REAL)
+               WHERE {_HAS_LOCATION.format(row='NEW')};
+       END"""
+]
+
+def _exists(conn, kind, name):
+    return conn.execute(
+        'SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?', (kind, name)
+    ).fetchone() is not None
+
+def init_spatial_index(db_path: str) -> bool:
+    """
+    Create the R*Tree and the triggers that keep it in sync. The first time the
+    triggers are installed the index is backfilled from existing reports in
+    the same transaction.
+
+    Returns:
+        True if the spatial index is available
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        if not _exists(conn, 'table', 'reports'):
+            logger.warning("reports table not found; skipping spatial index")
+            return False
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(SPATIAL_TABLE)
+            if not _exists(conn, 'trigger', 'trg_reports_rtree_insert'):
+                conn.execute('DELETE FROM reports_rtree')
+                conn.execute(f"""
+                    INSERT INTO reports_rtree(id, min_lat, max_lat, min_lon, max_lon)
+                    SELECT id, CAST(latitude AS REAL), CAST(latitude AS REAL),
+                           CAST(longitude AS REAL), CAST(longitude AS REAL)
+                    FROM reports WHERE {_HAS_LOCATION.format(row='reports')}
+                """)
+                logger.info("Backfilled spatial index from existing reports")
+
+            for statement in SPATIAL_TRIGGERS:
+                conn.execute(statement)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return True
+    except sqlite3.OperationalError as e:
+        # SQLite builds without the R*Tree module
+        logger.error(f"Spatial index unavailable: {e}")
+        return False
+    finally:
+        conn.close()
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Smallest west, south, east, north box containing a circle. Longitude span
+    widens with latitude; near the poles or across the antimeridian the box
+    falls back to all longitudes.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    south, north = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+
+    cos_lat = math.cos(math.radians(lat))
+    if north >= 90.0 or south <= -90.0 or cos_lat < 1e-9:
+        return -180.0, south, 180.0, north
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        return -180.0, south, 180.0, north
+    return lon - dlon, south, lon + dlon, north
+
+def _query_box(conn, bbox, incident_type=None, since_days=None, limit=None):
+    # CROSS JOIN pins the R*Tree as the outer loop; otherwise the planner may
+    # walk every report of a type through the created_at/type indexes instead.
+    # The R*Tree keeps float32 boxes rounded outward, so it is searched with
+    # overlap tests (a containment test drops points on the edge) and the
+    # exact coordinates are checked against the box afterwards.
+    west, south, east, north = bbox
+    sql = """
+        SELECT r.id, r.incident_type, r.description, r.latitude, r.longitude,
+               r.created_at, r.company_name
+        FROM reports_rtree t CROSS JOIN reports r ON r.id = t.id
+        WHERE t.max_lat >= ? AND t.min_lat <= ? AND t.max_lon >= ? AND t.min_lon <= ?
+          AND CAST(r.latitude AS REAL) BETWEEN ? AND ?
+          AND CAST(r.longitude AS REAL) BETWEEN ? AND ?
+    """
+    params = [south, north, west, east, south, north, west, east]
+    if incident_type:
+        sql += ' AND r.incident_type = ?'
+        params.append(incident_type)
+    if since_days is not None:
+        sql += " AND r.created_at >= datetime('now', ?)"
+        params.append(f'-{float(since_days)} days')
+    sql += ' ORDER BY r.created_at DESC'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(int(limit))
+    return conn.execute(sql, params).fetchall()
+
+def _to_incident(row) -> Dict[str, Any]:
+    return {
+        'id': row['id'],
+        'type': row['incident_type'] or 'Unknown',
+        'description': row['description'] or 'No description',
+        'latitude': float(row['latitude']),
+        'longitude': float(row['longitude']),
+        'timestamp': row['created_at'],
+        'company': row['company_name'] or 'Unknown Company'
+    }
+
+def incidents_in_bbox(conn, bbox: Tuple[float, float, float, float],
+                      incident_type: Optional[str] = None, since_days: Optional[float] = None,
+                      limit: Optional[int] = 1000) -> List[Dict[str, Any]]:
+    """
+    Incidents inside a west, south, east, north box, newest first
+
+    Args:
+        conn: Connection with sqlite3.Row row factory
+        bbox: Bounding box in degrees
+        incident_type: Only this incident type
+        since_days: Only incidents created in the last N days
+        limit: Maximum incidents returned, None for all
+
+    Returns:
+        Incident dicts in the same shape as the map's incident list
+    """
+    return [_to_incident(row) for row in _query_box(conn, bbox, incident_type, since_days, limit)]
+
+def incidents_within_radius(conn, lat: float, lon: float, radius_km: float,
+                            incident_type: Optional[str] = None, since_days: Optional[float] = None,
+                            limit: Optional[int] = 1000) -> List[Dict[str, Any]]:
+    """
+    Incidents within `radius_km` of a point, nearest first. The R*Tree narrows
+    the search to the circle's bounding box and the exact great-circle
+    distance is checked only for those candidates.
+
+    Args:
+        conn: Connection with sqlite3.Row row factory
+        lat: Centre latitude in degrees
+        lon: Centre longitude in degrees
+        radius_km: Search radius in kilometres
+        incident_type: Only this incident type
+        since_days: Only incidents created in the last N days
+        limit: Maximum incidents returned, None for all
+
+    Returns:
+        Incident dicts with an added `distance_km`
+    """
+    rows = _query_box(conn, radius_bbox(lat, lon, radius_km), incident_type, since_days)
+
+    incidents = []
+    for row in rows:
+        distance = haversine_km(lat, lon, float(row['latitude']), float(row['longitude']))
+        if distance <= radius_km:
+            incident = _to_incident(row)
+            incident['distance_km'] = round(distance, 3)
+            incidents.append(incident)
+
+    incidents.sort(key=lambda i: i['distance_km'])
+    return incidents[:limit] if limit is not None else incidents
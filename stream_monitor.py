@@ -0,0 +1,315 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Any, Iterator, List
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LIVE_PREFIXES = ('rtsp://', 'rtmp://', 'http://', 'https://')
+
+def parse_stream_sources(spec: str) -> Dict[str, str]:
+    """
+    Named live sources from a "name=url,name=url" setting (STREAM_SOURCES),
+    so callers pick a camera by name and never supply a URL themselves
+
+    Args:
+        spec: Comma-separated name=url pairs
+
+    Returns:
+        Mapping of name to stream URL
+    """
+    sources = {}
+    for entry in spec.split(','):
+        name, sep, url = entry.strip().partition('=')
+        if not sep or not name.strip() or not url.strip():
+            if entry.strip():
+                logger.warning(f"Ignoring malformed stream source entry: {entry.strip()!r}")
+            continue
+        sources[name.strip()] = url.strip()
+    return sources
+
+def box_iou(a, b):
+    """(len(a), len(b)) IoU matrix for [x1,y1,x2,y2] boxes"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+class PersonTracker:
+    """Greedy IoU tracker that keeps person identities stable across frames"""
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 15):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}
+        self._next_id = 1
+
+    def update(self, boxes: List) -> List[int]:
+        """Match this frame's person boxes to tracks and return a track id per box"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        track_ids = list(self.tracks.keys())
+        assigned = [None] * len(boxes)
+
+        if track_ids and len(boxes):
+            track_boxes = np.array([self.tracks[t]['box'] for t in track_ids], dtype=np.float32)
+            iou = box_iou(boxes, track_boxes)
+            # Take the best remaining pair each time until nothing clears the threshold
+            while True:
+                i, j = np.unravel_index(iou.argmax(), iou.shape)
+                if iou[i, j] < self.iou_threshold:
+                    break
+                assigned[i] = track_ids[j]
+                iou[i, :] = -1
+                iou[:, j] = -1
+
+        matched = set()
+        for i, track_id in enumerate(assigned):
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+                self.tracks[track_id] = {'reported': set()}
+                assigned[i] = track_id
+            self.tracks[track_id]['box'] = boxes[i]
+            self.tracks[track_id]['missed'] = 0
+            matched.add(track_id)
+
+        for track_id in track_ids:
+            if track_id not in matched:
+                self.tracks[track_id]['missed'] += 1
+                if self.tracks[track_id]['missed'] > self.max_missed:
+                    del self.tracks[track_id]
+
+        return assigned
+
+    def reported(self, track_id: int) -> set:
+        return self.tracks[track_id]['reported']
+
+class StreamMonitor:
+    """
+    Runs PPE detection over a video file or live stream and yields violation
+    events once per tracked person and violation type
+    """
+
+    def __init__(self, detect_frames: Callable[[list], list],
+                 person_violations: Callable[[Any], list],
+                 target_fps: float = 5.0, batch_size: int = 4,
+                 queue_size: int = 32, stats_interval: float = 5.0):
+        """
+        Initialize the monitor
+
+        Args:
+            detect_frames: Maps a list of BGR frames to one (N, 6) box array each
+            person_violations: Maps a box array to [{"box", "violations"}] per person
+            target_fps: Frames per second of video to analyze; live sources
+                lower this further when inference cannot keep up
+            batch_size: Frames sent to the model together
+            queue_size: Decoded frames buffered between producer and model
+            stats_interval: Seconds between throughput events
+        """
+        self.detect_frames = detect_frames
+        self.person_violations = person_violations
+        self.target_fps = target_fps
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.stats_interval = stats_interval
+
+        self._processing_fps = None
+        self.stats = {}
+
+    def _open(self, source):
+        capture = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+        if not capture.isOpened():
+            raise ValueError(f"Cannot open video source: {source}")
+        return capture
+
+    def _sample_interval(self, live):
+        """Seconds of video between analyzed frames"""
+        fps = self.target_fps
+        if live and self._processing_fps:
+            # Do not sample faster than the model has been draining frames
+            fps = min(fps, self._processing_fps * 1.1)
+        return 1.0 / fps if fps > 0 else 0.0
+
+    def _produce(self, capture, frames, stop, live):
+        """Decode frames, skipping ahead to hold the sampling rate"""
+        source_fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        started = time.monotonic()
+        next_due = 0.0
+        index = 0
+
+        try:
+            while not stop.is_set():
+                # grab() advances without decoding, so skipped frames stay cheap
+                if not capture.grab():
+                    break
+                index += 1
+                self.stats['frames_read'] += 1
+
+                if live or source_fps <= 0:
+                    timestamp = time.monotonic() - started
+                else:
+                    timestamp = index / source_fps
+
+                if timestamp < next_due:
+                    self.stats['frames_skipped'] += 1
+                    continue
+
+                ok, frame = capture.retrieve()
+                if not ok:
+                    continue
+                next_due = timestamp + self._sample_interval(live)
+                item = (index, timestamp, frame)
+
+                if live:
+                    # Never fall behind a live feed: replace the oldest buffered frame
+                    try:
+                        frames.put_nowait(item)
+                    except queue.Full:
+                        try:
+                            frames.get_nowait()
+                            self.stats['frames_dropped'] += 1
+                        except queue.Empty:
+                            pass
+                        frames.put_nowait(item)
+                else:
+                    while not stop.is_set():
+                        try:
+                            frames.put(item, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+        finally:
+            capture.release()
+            frames.put(None)
+
+    def _next_batch(self, frames):
+        first = frames.get()
+        if first is None:
+            return None, True
+
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                item = frames.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def events(self, source, live=None) -> Iterator[Dict[str, Any]]:
+        """
+        Generator of events for a video file path, stream URL or camera index.
+        Yields 'violation' events as they are found, periodic 'stats' events
+        and a final 'summary'.
+        """
+        if live is None:
+            live = str(source).startswith(LIVE_PREFIXES) or str(source).isdigit()
+
+        capture = self._open(source)
+        self.stats = {'frames_read': 0, 'frames_skipped': 0, 'frames_dropped': 0,
+                      'frames_analyzed': 0, 'violations': 0}
+        frames = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(capture, frames, stop, live),
+                                    name='stream-decoder')
+        producer.daemon = True
+        producer.start()
+
+        tracker = PersonTracker()
+        started = time.monotonic()
+        last_stats = started
+
+        try:
+            finished = False
+            while not finished:
+                batch, finished = self._next_batch(frames)
+                if not batch:
+                    break
+
+                batch_started = time.monotonic()
+                boxes_list = self.detect_frames([frame for _, _, frame in batch])
+                elapsed = time.monotonic() - batch_started
+                if elapsed > 0:
+                    rate = len(batch) / elapsed
+                    self._processing_fps = rate if self._processing_fps is None else \
+                        0.8 * self._processing_fps + 0.2 * rate
+
+                for (index, timestamp, _), boxes in zip(batch, boxes_list):
+                    persons = self.person_violations(boxes)
+                    track_ids = tracker.update([p['box'] for p in persons])
+
+                    for track_id, person in zip(track_ids, persons):
+                        reported = tracker.reported(track_id)
+                        new = person['violations'] - reported
+                        if not new:
+                            continue
+                        reported.update(new)
+                        self.stats['violations'] += 1
+                        yield {
+                            'type': 'violation',
+                            'track_id': track_id,
+                            'frame': index,
+                            'video_time': round(timestamp, 3),
+                            'violations': sorted(new),
+                            'box': [round(float(v), 1) for v in person['box']]
+                        }
+
+                self.stats['frames_analyzed'] += len(batch)
+
+                now = time.monotonic()
+                if now - last_stats >= self.stats_interval:
+                    last_stats = now
+                    yield self._stats_event('stats', now - started, len(tracker.tracks))
+        finally:
+            stop.set()
+            # Unblock a producer waiting on a full queue, then let it exit
+            while producer.is_alive():
+                try:
+                    frames.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            producer.join()
+
+        yield self._stats_event('summary', time.monotonic() - started, len(tracker.tracks))
+
+    def _stats_event(self, event_type, elapsed, active_tracks):
+        return {
+            'type': event_type,
+            **self.stats,
+            'active_tracks': active_tracks,
+            'elapsed_s': round(elapsed, 2),
+            'analyzed_fps': round(self.stats['frames_analyzed'] / elapsed, 2) if elapsed > 0 else 0.0,
+            'decoded_fps': round(self.stats['frames_read'] / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+if __name__ == "__main__":
+    # Local testing against a video file: python stream_monitor.py site.mp4 --fps 5
+    parser = argparse.ArgumentParser(description='Run PPE monitoring over a video file or stream')
+    parser.add_argument('source', help='Video file path, stream URL or camera index')
+    parser.add_argument('--fps', type=float, default=5.0, help='Target frames analyzed per second of video')
+    parser.add_argument('--batch', type=int, default=4, help='Frames per model batch')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Reuse the app's model and analysis without starting its photo workers
+    os.environ['CLASSIFY_WORKERS'] = '0'
+    import app as hsse_app
+
+    monitor = StreamMonitor(hsse_app.detect_frames, hsse_app.person_violations,
+                            target_fps=args.fps, batch_size=args.batch)
+    for event in monitor.events(args.source):
+        print(json.dumps(event))
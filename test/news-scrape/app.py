@@ -1,12 +1,11 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 import json
 import xml.etree.ElementTree as ET
 from datetime import datetime
 import os
 import logging
+import queue
 from pathlib import Path
-import threading
-import time
 
 # Load .env file if it exists (Windows-friendly)
 def load_env_file():
@@ -35,8 +34,10 @@ else:
     print("💡 Create a .env file with: GEMINI_API_KEY=your_key_here")
 
 # Import processors
-from gemini_rest_processor import GeminiRestProcessor, DataProcessor
-from scraper import HealthSafetyScraper
+from gemini_rest_processor import GeminiRestProcessor, DataProcessor, ProcessingCheckpoint, default_response_cache
+from scraper import HealthSafetyScraper, ScrapeWriter, ScrapeIndex
+from jobs import JobStore, JobManager
+from article_warehouse import ArticleWarehouse, query_filters
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -44,93 +45,160 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# Global status tracking
-scraping_status = {
-    'running': False,
-    'progress': 0,
-    'message': 'Ready to scrape',
-    'last_run': None,
-    'files_created': []
-}
+# One response cache for every processing run, so hit-rate stats accumulate
+gemini_cache = default_response_cache()
 
-processing_status = {
-    'running': False,
-    'progress': 0,
-    'message': 'Ready to process',
-    'last_run': None,
-    'files_created': []
-}
+# Summarized articles are committed here one by one, so an interrupted run resumes
+CHECKPOINT_DB = os.getenv('PROCESSING_CHECKPOINT_DB', 'processing_checkpoints.db')
+
+# Every scraped and processed article across all runs; the dashboard APIs query
+# it instead of reading the newest output file. Processed files from before the
+# warehouse (or copied in) are imported at startup.
+article_warehouse = ArticleWarehouse(os.getenv('ARTICLE_WAREHOUSE_DB', 'articles.db'))
+article_warehouse.import_processed_files('.')
+
+# Seen-URL index of incremental scrapes. Scraped articles stay pending in it, and
+# are scraped again by the next run, until they are confirmed once processed
+SCRAPE_INDEX_DB = os.getenv('SCRAPE_INDEX_DB', 'scrape_index.db')
+scrape_index = ScrapeIndex(SCRAPE_INDEX_DB)
+
+# Scrape/process runs are jobs in a persistent table (see jobs.py), so progress
+# survives restarts and concurrent requests cannot race each other
+job_store = JobStore(os.getenv('JOBS_DB', 'jobs.db'))
 
 @app.route('/')
 def dashboard():
     """Main dashboard page"""
     return render_template('automated_dashboard.html')
 
+def submit_job(kind, params, started_message, busy_message):
+    """Queue a job for one of the dashboard buttons"""
+    job, created = job_manager.submit(kind, params)
+    if not created:
+        return jsonify({'error': busy_message, 'job_id': job['id']}), 400
+    return jsonify({'message': started_message, 'status': job['status'], 'job_id': job['id']})
+
+def max_articles_param():
+    return request.json.get('max_articles', 10) if request.is_json and request.json else 10
+
 @app.route('/api/scrape', methods=['POST'])
 def start_scraping():
     """Start automated scraping in background"""
-    if scraping_status['running']:
-        return jsonify({'error': 'Scraping already in progress'}), 400
-    
-    # Start scraping in background thread
-    thread = threading.Thread(target=run_scraping_task)
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({'message': 'Scraping started', 'status': 'running'})
+    return submit_job('scrape', {}, 'Scraping started', 'Scraping already in progress')
 
 @app.route('/api/process', methods=['POST'])
 def start_processing():
     """Start automated processing in background"""
-    if processing_status['running']:
-        return jsonify({'error': 'Processing already in progress'}), 400
-    
-    max_articles = request.json.get('max_articles', 10) if request.json else 10
-    
-    # Start processing in background thread
-    thread = threading.Thread(target=run_processing_task, args=(max_articles,))
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({'message': 'Processing started', 'status': 'running'})
+    return submit_job('process', {'max_articles': max_articles_param()},
+                      'Processing started', 'Processing already in progress')
 
 @app.route('/api/scrape_and_process', methods=['POST'])
 def scrape_and_process():
     """Run complete automated workflow"""
-    if scraping_status['running'] or processing_status['running']:
-        return jsonify({'error': 'Another task is already running'}), 400
-    
-    max_articles = request.json.get('max_articles', 10) if request.json else 10
-    
-    # Start complete workflow in background
-    thread = threading.Thread(target=run_complete_workflow, args=(max_articles,))
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({'message': 'Complete workflow started', 'status': 'running'})
+    return submit_job('scrape_and_process', {'max_articles': max_articles_param()},
+                      'Complete workflow started', 'Complete workflow already in progress')
 
 @app.route('/api/status')
 def get_status():
     """Get current status of scraping and processing"""
-    return jsonify({
-        'scraping': scraping_status,
-        'processing': processing_status
-    })
+    return jsonify(status_snapshot())
+
+@app.route('/api/events')
+def status_events():
+    """Server-sent events with the dashboard status and job snapshots as they change"""
+    events = job_manager.subscribe()
+
+    def generate():
+        try:
+            yield f"event: status\ndata: {json.dumps(status_snapshot())}\n\n"
+            while True:
+                try:
+                    job = events.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: job\ndata: {json.dumps(job)}\n\n"
+                yield f"event: status\ndata: {json.dumps(status_snapshot())}\n\n"
+        finally:
+            job_manager.unsubscribe(events)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/jobs')
+def list_jobs():
+    """Recent jobs with their stages, newest first"""
+    return jsonify({'jobs': job_store.list_jobs(limit=request.args.get('limit', 20, type=int))})
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue a job: {"kind": "scrape" | "process" | "scrape_and_process", "params": {...}}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        job, created = job_manager.submit(data.get('kind', ''), data.get('params') or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'job': job, 'created': created}), 201 if created else 200
+
+@app.route('/api/jobs/<int:job_id>')
+def get_job(job_id):
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    if not job_manager.cancel(job_id):
+        return jsonify({'error': 'Job is not queued or running'}), 400
+    return jsonify(job_store.get_job(job_id))
+
+@app.route('/api/jobs/<int:job_id>/resume', methods=['POST'])
+def resume_job(job_id):
+    """Re-queue a failed or cancelled job from its first unfinished stage"""
+    if not job_manager.resume(job_id):
+        return jsonify({'error': 'Only failed or cancelled jobs can be resumed, one per kind at a time'}), 400
+    return jsonify(job_store.get_job(job_id))
+
+@app.route('/api/schedules')
+def list_schedules():
+    return jsonify({'schedules': job_store.list_schedules()})
+
+@app.route('/api/schedules', methods=['POST'])
+def set_schedule():
+    """Run a job kind every N minutes: {"kind", "interval_minutes", "params"}; 0 minutes disables it"""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind', 'scrape_and_process')
+    if kind not in WORKFLOWS:
+        return jsonify({'error': f'Unknown job kind: {kind}'}), 400
+    minutes = float(data.get('interval_minutes', 0))
+    job_store.set_schedule(data.get('name', kind), kind, data.get('params') or {'max_articles': 10},
+                           max(minutes, 1) * 60, enabled=minutes > 0)
+    return jsonify({'schedules': job_store.list_schedules()})
+
+@app.route('/api/gemini_cache')
+def get_gemini_cache_stats():
+    """Hit rate and time saved by the Gemini response cache since startup"""
+    if gemini_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(gemini_cache.get_stats(), enabled=True))
+
+def page_params(default_limit=50):
+    """limit/offset query arguments, with the limit capped"""
+    return min(request.args.get('limit', default_limit, type=int), 500), request.args.get('offset', 0, type=int)
 
 @app.route('/api/latest_summary')
 def get_latest_summary():
-    """Get the latest processed summary for dashboard"""
+    """Get the latest dashboard summary and the most recent processed articles"""
     try:
-        processed_files = list(Path('.').glob('processed_articles_*.json'))
-        if not processed_files:
+        latest = article_warehouse.latest_dashboard_summary()
+        if latest is None:
             return jsonify({'error': 'No processed data found. Run scrape & process first.'}), 404
-            
-        latest_file = max(processed_files, key=os.path.getctime)
         
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        return jsonify(data)
+        limit, offset = page_params()
+        latest['articles'] = article_warehouse.query_articles(limit=limit, offset=offset)
+        return jsonify(latest)
         
     except Exception as e:
         logger.error(f"Error retrieving summary: {e}")
@@ -138,20 +206,21 @@ def get_latest_summary():
 
 @app.route('/api/articles')
 def get_articles():
-    """Get processed articles for display"""
+    """
+    Get processed articles for display, newest first across all runs. Accepts
+    source, severity, industry, type, company, since and until filters plus
+    limit and offset.
+    """
     try:
-        processed_files = list(Path('.').glob('processed_articles_*.json'))
-        if not processed_files:
+        filters = query_filters(request.args)
+        total = article_warehouse.count_articles(**filters)
+        if not total and not filters:
             return jsonify({'error': 'No processed data found. Run scrape & process first.'}), 404
-            
-        latest_file = max(processed_files, key=os.path.getctime)
         
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
+        limit, offset = page_params()
         return jsonify({
-            'articles': data.get('articles', []),
-            'total': data.get('processed_articles', 0)
+            'articles': article_warehouse.query_articles(limit=limit, offset=offset, **filters),
+            'total': total
         })
         
     except Exception as e:
@@ -201,181 +270,220 @@ def test_gemini_connection():
 
 @app.route('/api/files')
 def list_files():
-    """List all generated files"""
+    """List the scraper and processor outputs recorded in the warehouse, newest first"""
     try:
-        xml_files = list(Path('.').glob('health_safety_news_*.xml'))
-        json_files = list(Path('.').glob('processed_articles_*.json'))
-        
         files = []
-        
-        for file in xml_files:
-            stat = file.stat()
-            files.append({
-                'name': file.name,
-                'type': 'scraped_data',
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat()
-            })
-            
-        for file in json_files:
-            stat = file.stat()
+        for source in article_warehouse.list_sources(limit=request.args.get('limit', 100, type=int)):
+            path = Path(source['name'])
             files.append({
-                'name': file.name,
-                'type': 'processed_data',
-                'size': stat.st_size,
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat()
+                'name': source['name'],
+                'type': source['kind'],
+                'articles': source['articles'],
+                'size': path.stat().st_size if path.exists() else None,
+                'created': source['created_at']
             })
         
-        # Sort by creation time (newest first)
-        files.sort(key=lambda x: x['created'], reverse=True)
-        
         return jsonify({'files': files})
         
     except Exception as e:
         logger.error(f"Error listing files: {e}")
         return jsonify({'error': str(e)}), 500
 
-# Background task functions
-def run_scraping_task():
-    """Background task to run scraping"""
-    global scraping_status
-    
-    scraping_status['running'] = True
-    scraping_status['progress'] = 0
-    scraping_status['message'] = 'Initializing scraper...'
+# Job stages. Each returns a JSON result that later stages read from ctx.results
+def scrape_stage(ctx):
+    """Scrape all sites, streaming articles to new XML/JSONL files"""
+    ctx.progress(0, 'Initializing scraper...')
+    scraper = HealthSafetyScraper(index_path=SCRAPE_INDEX_DB)
     
-    try:
-        scraper = HealthSafetyScraper()
-        
-        scraping_status['progress'] = 10
-        scraping_status['message'] = 'Scraping Construction News...'
-        
-        # Get all links and content
-        all_links, articles_content = scraper.scrape_all_sites(
+    ctx.progress(10, 'Scraping news sites...')
+    # Articles are streamed to the output files, and upserted into the warehouse, as their content arrives
+    with ScrapeWriter(warehouse=article_warehouse) as writer:
+        all_links, _ = scraper.scrape_all_sites(
             fetch_content=True, 
-            max_articles_per_site=10
+            max_articles_per_site=10,
+            writer=writer
         )
-        
-        scraping_status['progress'] = 80
-        scraping_status['message'] = 'Saving scraped data...'
-        
-        # Save the data
-        xml_file, json_file = scraper.save_data(all_links, articles_content)
-        
-        scraping_status['progress'] = 100
-        scraping_status['message'] = f'Scraping complete! Created {len(all_links)} links, {len(articles_content)} articles'
-        scraping_status['last_run'] = datetime.now().isoformat()
-        scraping_status['files_created'] = [xml_file, json_file]
-        
-        logger.info(f"Scraping completed: {xml_file}, {json_file}")
-        
-    except Exception as e:
-        logger.error(f"Scraping failed: {e}")
-        scraping_status['message'] = f'Scraping failed: {str(e)}'
-        scraping_status['progress'] = 0
-    finally:
-        scraping_status['running'] = False
-
-def run_processing_task(max_articles=10):
-    """Background task to run Gemini processing"""
-    global processing_status, API_KEY
     
-    processing_status['running'] = True
-    processing_status['progress'] = 0
-    processing_status['message'] = 'Checking API key...'
+    if not writer.articles_with_content:
+        # Incremental run with nothing new: keep the previous files as the latest data
+        writer.discard()
+        ctx.progress(100, 'Scraping complete! No new or changed articles')
+        logger.info("Scraping completed: no new or changed articles")
+        return {'files': [], 'skip_remaining': True}
     
-    try:
-        # Use the global API_KEY first, then try environment
-        api_key = API_KEY or os.getenv('GEMINI_API_KEY')
-        
-        if not api_key:
-            # Try loading .env again in this thread
-            load_env_file()
-            api_key = os.getenv('GEMINI_API_KEY')
-        
-        if not api_key:
-            raise Exception("GEMINI_API_KEY not found. Please check your .env file or set environment variable.")
-        
-        processing_status['progress'] = 5
-        processing_status['message'] = f'API key found ({len(api_key)} chars), finding scraped data...'
-        
-        # Find latest XML file
+    xml_file, json_file = writer.xml_filename, writer.jsonl_filename
+    ctx.progress(100, f'Scraping complete! Created {len(all_links)} links, {writer.articles_with_content} articles')
+    logger.info(f"Scraping completed: {xml_file}, {json_file}")
+    return {'files': [xml_file, json_file], 'xml_file': xml_file, 'links': len(all_links),
+            'articles': writer.articles_with_content}
+
+def process_stage(ctx):
+    """Summarize the scraped articles with Gemini, checkpointing each one for the summary stage"""
+    global API_KEY
+    
+    ctx.progress(0, 'Checking API key...')
+    # Use the global API_KEY first, then try environment
+    api_key = API_KEY or os.getenv('GEMINI_API_KEY')
+    
+    if not api_key:
+        # Try loading .env again in this thread
+        load_env_file()
+        api_key = os.getenv('GEMINI_API_KEY')
+    
+    if not api_key:
+        raise Exception("GEMINI_API_KEY not found. Please check your .env file or set environment variable.")
+    
+    ctx.progress(5, f'API key found ({len(api_key)} chars), finding scraped data...')
+    
+    # Prefer the file this job scraped; a process-only job takes the latest one
+    source = (ctx.results.get('scrape') or {}).get('xml_file')
+    if not source:
         xml_files = list(Path('.').glob('health_safety_news_*.xml'))
         if not xml_files:
             raise Exception("No scraped data found. Run scraping first.")
-        
-        latest_xml = max(xml_files, key=os.path.getctime)
-        
-        processing_status['progress'] = 10
-        processing_status['message'] = f'Loading data from {latest_xml.name}...'
-        
-        # Load and process data - explicitly pass API key
-        processor = DataProcessor(api_key=api_key, model="gemini-2.0-flash")
-        articles = processor.load_scraped_data(latest_xml)
-        
-        processing_status['progress'] = 30
-        processing_status['message'] = f'Processing {len(articles)} articles with Gemini...'
-        
-        processed_articles = processor.process_articles_with_gemini(articles, max_articles)
-        
-        processing_status['progress'] = 80
-        processing_status['message'] = 'Generating dashboard summary...'
-        
-        dashboard_summary = processor.gemini.generate_dashboard_summary(processed_articles)
-        
-        processing_status['progress'] = 90
-        processing_status['message'] = 'Saving processed data...'
-        
-        # Save results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f'processed_articles_{timestamp}.json'
-        
-        output_data = {
-            'processed_at': datetime.now().isoformat(),
-            'total_articles': len(articles),
-            'processed_articles': len(processed_articles),
-            'dashboard_summary': dashboard_summary,
-            'articles': processed_articles
-        }
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2, ensure_ascii=False)
-        
-        processing_status['progress'] = 100
-        processing_status['message'] = f'Processing complete! Generated {output_file}'
-        processing_status['last_run'] = datetime.now().isoformat()
-        processing_status['files_created'] = [output_file]
-        
-        logger.info(f"Processing completed: {output_file}")
-        
-    except Exception as e:
-        logger.error(f"Processing failed: {e}")
-        processing_status['message'] = f'Processing failed: {str(e)}'
-        processing_status['progress'] = 0
-    finally:
-        processing_status['running'] = False
-
-def run_complete_workflow(max_articles=10):
-    """Run complete scraping + processing workflow"""
-    logger.info("Starting complete automated workflow...")
+        source = str(max(xml_files, key=os.path.getctime))
+    
+    # A resumed job keeps processing the file it started on, skipping articles already done
+    checkpoint = ProcessingCheckpoint(f'job-{ctx.job_id}', CHECKPOINT_DB)
+    source = checkpoint.begin(source)
+    already_done = len(checkpoint)
+    
+    ctx.progress(10, f'Loading data from {Path(source).name}...')
+    
+    processor = DataProcessor(api_key=api_key, model="gemini-2.0-flash", cache=gemini_cache)
+    # Count in one streaming pass, then stream again to process, so bodies are never all in memory
+    total_articles = sum(1 for _ in processor.iter_scraped_data(source))
+    max_articles = ctx.params.get('max_articles', 10)
+    
+    resuming = f' (resuming, {already_done} already done)' if already_done else ''
+    ctx.progress(15, f'Processing {total_articles} articles with Gemini{resuming}...')
+    
+    def on_progress(done, total):
+        ctx.progress(15 + 75 * done / max(total, 1), f'Processed {done}/{total} articles with Gemini...')
+    
+    processed_articles = processor.process_articles_with_gemini(
+        processor.iter_scraped_data(source), max_articles,
+        progress=on_progress, stop=ctx.cancel_event, checkpoint=checkpoint)
+    ctx.check_cancelled()
+    
+    ctx.progress(100, f'Processed {len(processed_articles)} articles')
+    return {'checkpoint_run': checkpoint.run_id, 'source': source, 'total_articles': total_articles,
+            'processed': len(processed_articles), 'resumed': already_done}
+
+def summary_stage(ctx):
+    """Generate the dashboard summary and publish processed_articles_<ts>.json from the checkpoints"""
+    work = ctx.results['process']
+    checkpoint = ProcessingCheckpoint(work['checkpoint_run'], CHECKPOINT_DB)
+    processed_articles = checkpoint.articles()
+    
+    ctx.progress(10, 'Generating dashboard summary...')
+    processor = GeminiRestProcessor(api_key=API_KEY or os.getenv('GEMINI_API_KEY'), model="gemini-2.0-flash",
+                                    cache=gemini_cache)
+    dashboard_summary = processor.generate_dashboard_summary(processed_articles)
+    
+    ctx.progress(90, 'Saving processed data...')
+    
+    # Save results
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_file = f'processed_articles_{timestamp}.json'
     
-    # Step 1: Scraping
-    run_scraping_task()
+    output_data = {
+        'processed_at': datetime.now().isoformat(),
+        'total_articles': work['total_articles'],
+        'processed_articles': len(processed_articles),
+        'dashboard_summary': dashboard_summary,
+        'articles': processed_articles
+    }
     
-    # Wait for scraping to complete
-    while scraping_status['running']:
-        time.sleep(1)
+    # Written under a temporary name so readers never see a partial file
+    with open(output_file + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(output_data, f, indent=2, ensure_ascii=False)
+    os.replace(output_file + '.tmp', output_file)
     
-    # Check if scraping was successful
-    if scraping_status['progress'] != 100:
-        logger.error("Scraping failed, stopping workflow")
-        return
+    article_warehouse.upsert_processed(processed_articles, source_file=output_file)
+    article_warehouse.add_dashboard_summary(dashboard_summary, work['total_articles'], len(processed_articles),
+                                            output_file, output_data['processed_at'])
+    scrape_index.confirm(article['url'] for article in processed_articles)
+    checkpoint.clear()
+    
+    ctx.progress(100, f'Processing complete! Generated {output_file}')
+    logger.info(f"Processing completed: {output_file}")
+    result = {'files': [output_file]}
+    if gemini_cache is not None:
+        result['cache_stats'] = gemini_cache.get_stats()
+    return result
+
+STAGES = {'scrape': scrape_stage, 'process': process_stage, 'summary': summary_stage}
+STAGE_DEPENDENCIES = {'process': ['scrape'], 'summary': ['process']}
+WORKFLOWS = {
+    'scrape': ['scrape'],
+    'process': ['process', 'summary'],
+    'scrape_and_process': ['scrape', 'process', 'summary']
+}
+
+job_manager = JobManager(job_store, STAGES, WORKFLOWS, STAGE_DEPENDENCIES,
+                         max_workers=int(os.getenv('JOB_WORKERS', '1')))
+
+# SCRAPE_SCHEDULE_MINUTES runs the complete workflow on a timer (0 turns it off);
+# unset leaves any schedule saved through /api/schedules as it is
+if os.getenv('SCRAPE_SCHEDULE_MINUTES') is not None:
+    schedule_minutes = float(os.getenv('SCRAPE_SCHEDULE_MINUTES'))
+    job_store.set_schedule('scrape_and_process', 'scrape_and_process',
+                           {'max_articles': int(os.getenv('SCHEDULE_MAX_ARTICLES', '10'))},
+                           max(schedule_minutes, 1) * 60, enabled=schedule_minutes > 0)
+
+@app.before_request
+def start_job_manager():
+    # Started lazily so the debug reloader's parent process never runs jobs
+    job_manager.start(resume=os.getenv('JOBS_RESUME', '1') != '0')
+
+def stage_status(job, stages, idle_message):
+    """One progress card of the dashboard (scraping or processing) from a job's stages"""
+    if job is None:
+        return {'running': False, 'progress': 0, 'message': idle_message, 'last_run': None,
+                'files_created': [], 'job_id': None}
     
-    # Step 2: Processing
-    time.sleep(2)  # Brief pause
-    run_processing_task(max_articles)
+    parts = [s for s in job['stages'] if s['stage'] in stages]
+    # Processing spans two stages: summarizing is most of the work
+    weights = {'process': 0.8, 'summary': 0.2} if len(parts) > 1 else {parts[0]['stage']: 1.0}
+    progress = sum(weights[s['stage']] * (100 if s['status'] in ('succeeded', 'skipped') else s['progress'])
+                   for s in parts)
+    current = next((s for s in parts if s['status'] in ('running', 'failed', 'cancelled')), None)
+    if current is None:
+        current = next((s for s in reversed(parts) if s['status'] == 'succeeded'), parts[0])
+    failed = any(s['status'] in ('failed', 'cancelled') for s in parts)
     
-    logger.info("Complete workflow finished")
+    files = []
+    for s in parts:
+        files.extend((s['result'] or {}).get('files', []))
+    status = {
+        'running': job['status'] in ('queued', 'running') and not all(
+            s['status'] in ('succeeded', 'skipped') for s in parts),
+        'progress': 0 if failed else int(progress),
+        'message': current['message'] or idle_message,
+        'last_run': job['finished_at'] or job['started_at'],
+        'files_created': files,
+        'job_id': job['id'],
+        'job_status': job['status']
+    }
+    summary_result = next((s['result'] for s in parts if s['stage'] == 'summary' and s['result']), None)
+    if summary_result and 'cache_stats' in summary_result:
+        status['cache_stats'] = summary_result['cache_stats']
+    return status
+
+def status_snapshot():
+    """Dashboard status in the shape /api/status has always returned, plus active jobs"""
+    scrape_job = next(iter(job_store.list_jobs(limit=1, stage='scrape')), None)
+    process_job = next(iter(job_store.list_jobs(limit=1, stage='process')), None)
+    # A scrape that found nothing new skips processing; show the older processing run instead
+    if process_job and all(s['status'] == 'skipped' for s in process_job['stages'] if s['stage'] != 'scrape'):
+        process_job = next((j for j in job_store.list_jobs(limit=10, stage='process')
+                            if any(s['stage'] == 'process' and s['status'] != 'skipped' for s in j['stages'])), None)
+    return {
+        'scraping': stage_status(scrape_job, ('scrape',), 'Ready to scrape'),
+        'processing': stage_status(process_job, ('process', 'summary'), 'Ready to process'),
+        'active_jobs': job_store.list_jobs(limit=10, statuses=('queued', 'running'))
+    }
 
 # CLI function for standalone processing
 def process_scraped_file(file_path, max_articles=10):
@@ -384,11 +492,17 @@ def process_scraped_file(file_path, max_articles=10):
         processor = DataProcessor(model="gemini-2.0-flash")
         
         print(f"Loading data from {file_path}...")
-        articles = processor.load_scraped_data(file_path)
-        print(f"Loaded {len(articles)} articles")
+        total_articles = sum(1 for _ in processor.iter_scraped_data(file_path))
+        print(f"Found {total_articles} articles")
+        
+        # Re-running after a failure picks up where the last attempt on this file stopped
+        checkpoint = ProcessingCheckpoint(f'file-{Path(file_path).resolve()}-{max_articles}', CHECKPOINT_DB)
+        if len(checkpoint):
+            print(f"Resuming: {len(checkpoint)} articles already processed")
         
         print(f"Processing up to {max_articles} articles with Gemini REST API...")
-        processed_articles = processor.process_articles_with_gemini(articles, max_articles)
+        processed_articles = processor.process_articles_with_gemini(
+            processor.iter_scraped_data(file_path), max_articles, checkpoint=checkpoint)
         print(f"Successfully processed {len(processed_articles)} articles")
         
         print("Generating dashboard summary...")
@@ -400,7 +514,7 @@ def process_scraped_file(file_path, max_articles=10):
         
         output_data = {
             'processed_at': datetime.now().isoformat(),
-            'total_articles': len(articles),
+            'total_articles': total_articles,
             'processed_articles': len(processed_articles),
             'dashboard_summary': dashboard_summary,
             'articles': processed_articles
@@ -408,6 +522,12 @@ def process_scraped_file(file_path, max_articles=10):
         
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(output_data, f, indent=2, ensure_ascii=False)
+        
+        article_warehouse.upsert_processed(processed_articles, source_file=output_file)
+        article_warehouse.add_dashboard_summary(dashboard_summary, total_articles, len(processed_articles),
+                                                output_file, output_data['processed_at'])
+        scrape_index.confirm(article['url'] for article in processed_articles)
+        checkpoint.clear()
             
         print(f"Results saved to {output_file}")
         return output_file
@@ -447,4 +567,7 @@ if __name__ == '__main__':
         print("  • See dashboard with AI insights")
         print()
         
+        # With the reloader, only the child process that serves requests runs jobs
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            job_manager.start(resume=os.getenv('JOBS_RESUME', '1') != '0')
         app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -1,34 +1,501 @@
 import requests
+from requests.adapters import HTTPAdapter
+import hashlib
 import json
 import os
+import re
+import sqlite3
+import time
+import threading
 import logging
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+# Field rules shared by the single-article and batch summary prompts
+SUMMARY_RULES = """- type: ONLY use Fatality, Injury, Fine, Fire, Chemical, Equipment, Fall, Guidance  
+- severity: ONLY use Critical, High, Medium, Low
+- industry: ONLY use Construction, Manufacturing, Healthcare, Mining, Transport, Energy, General
+- company: actual company name or "Unknown"
+- location: actual location or "Unknown"
+- summary: 1-2 sentences in plain English
+- fine: amount like "£50000" or "None"
+- lesson: what to learn from this"""
+
+SUMMARY_EXAMPLE = '{"type": "Fatality", "severity": "Critical", "industry": "Construction", "company": "Company Name", "location": "Location", "summary": "Plain English summary", "fine": "£50000", "lesson": "Safety lesson"}'
+
+ARTICLE_CONTENT_CHARS = 2500
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def strip_code_fence(response: str) -> str:
+    """A model response with any markdown code fence around its JSON removed"""
+    cleaned = response.strip()
+    if cleaned.startswith('```'):
+        # Extract JSON from code blocks
+        lines = cleaned.split('\n')
+        json_lines = []
+        in_json = False
+        for line in lines:
+            if line.strip().startswith('{'):
+                in_json = True
+            if in_json:
+                json_lines.append(line)
+            if line.strip().endswith('}') and in_json:
+                break
+        cleaned = '\n'.join(json_lines)
+    return cleaned
+
+def parse_summary(response: str) -> Optional[dict]:
+    """The summary object in a single-article response, or None if it is not a JSON object"""
+    try:
+        summary = json.loads(strip_code_fence(response))
+    except json.JSONDecodeError:
+        return None
+    return summary if isinstance(summary, dict) else None
+
+def parse_batch_items(response: str) -> Optional[list]:
+    """The JSON array in a batch response, tolerating code fences or stray text around it"""
+    start, end = response.find('['), response.rfind(']')
+    if start == -1 or end <= start:
+        return None
+    try:
+        items = json.loads(response[start:end + 1])
+    except json.JSONDecodeError as e:
+        logger.warning(f"Failed to parse batch JSON response: {e}")
+        return None
+    return items if isinstance(items, list) else None
+
+def is_plain_text(response: str) -> bool:
+    """False for a response that came back as JSON or a code block instead of prose"""
+    cleaned = response.strip()
+    return not (cleaned.startswith('```') or cleaned.startswith('{'))
+
+def pack_batches(articles: Iterable[Tuple[int, dict]], token_budget: int,
+                 max_size: int) -> Iterable[List[Tuple[int, dict]]]:
+    """
+    Group (index, article) pairs into batches, in order, so that each batch's
+    article text stays under `token_budget` and holds at most `max_size`
+    articles. An article larger than the budget gets a batch of its own.
+    Lazy, so it can be fed from a stream of scraped articles.
+    """
+    batch, tokens = [], 0
+    for i, article in articles:
+        cost = estimate_tokens(article['title']) + estimate_tokens(article['content'][:ARTICLE_CONTENT_CHARS])
+        if batch and (len(batch) >= max_size or tokens + cost > token_budget):
+            yield batch
+            batch, tokens = [], 0
+        batch.append((i, article))
+        tokens += cost
+    if batch:
+        yield batch
+
+class AdaptiveConcurrency:
+    """
+    Limits requests in flight with AIMD: the limit grows by about one per
+    round of successful requests and halves when the API answers 429, and
+    everyone pauses for the Retry-After the API asked for.
+    """
+    
+    def __init__(self, initial: int = 2, minimum: int = 1, maximum: int = 8,
+                 decrease_interval: float = 1.0):
+        """
+        Args:
+            initial: Starting number of concurrent requests
+            minimum: Floor the limit never drops below
+            maximum: Ceiling, also the size of the worker pool using it
+            decrease_interval: Seconds after a decrease during which further
+                429s (from requests already in flight) do not cut again
+        """
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.decrease_interval = decrease_interval
+        
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self.stats = {'succeeded': 0, 'throttled': 0, 'decreases': 0, 'peak_limit': self.limit}
+        
+    @contextmanager
+    def slot(self):
+        """Wait for a free slot (and any Retry-After pause) before a request"""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight < int(self.limit):
+                    break
+                else:
+                    self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+                
+    def on_success(self):
+        with self._cond:
+            self.stats['succeeded'] += 1
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self.stats['peak_limit'] = max(self.stats['peak_limit'], self.limit)
+            self._cond.notify_all()
+            
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._cond:
+            now = time.monotonic()
+            self.stats['throttled'] += 1
+            if now - self._last_decrease >= self.decrease_interval:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = now
+                self.stats['decreases'] += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+                
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self.stats, limit=round(self.limit, 2))
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Delay requested by a 429: Retry-After header, or the RetryInfo delay in the error body"""
+    header = response.headers.get('Retry-After')
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    try:
+        for detail in response.json().get('error', {}).get('details', []):
+            match = re.match(r'^([\d.]+)s$', str(detail.get('retryDelay', '')))
+            if match:
+                return float(match.group(1))
+    except (ValueError, AttributeError):
+        pass
+    return None
+
+class ResponseCache:
+    """
+    Persistent cache of Gemini responses keyed by model and normalized
+    prompt, so re-processing the same articles does not pay for the same
+    completions again. Entries expire after a TTL and the table is trimmed
+    to a size budget, least recently used first.
+    """
+    
+    def __init__(self, db_path: str = 'gemini_cache.db', ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the cache
+        
+        Args:
+            db_path: SQLite file holding cached responses
+            ttl_seconds: Age after which a cached response is requested again
+            max_bytes: Total size of stored responses before the least recently used are evicted
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evictions': 0,
+            'saved_seconds': 0.0
+        }
+        self.init_schema()
+        
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+        
+    def init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    latency REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used_at)")
+            conn.commit()
+        finally:
+            conn.close()
+            
+    @staticmethod
+    def key_for(model: str, prompt: str) -> str:
+        # Whitespace-only differences (indentation, trailing newlines) map to the same entry
+        normalized = ' '.join(prompt.split())
+        return hashlib.sha256(f"{model}\n{normalized}".encode('utf-8')).hexdigest()
+        
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for a key, or None if missing or expired"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    'SELECT response, latency, created_at FROM llm_cache WHERE cache_key = ?', (key,)
+                ).fetchone()
+                if row and now - row['created_at'] > self.ttl_seconds:
+                    conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (key,))
+                    conn.commit()
+                    with self._lock:
+                        self.stats['expired'] += 1
+                    row = None
+                elif row:
+                    conn.execute('UPDATE llm_cache SET last_used_at = ? WHERE cache_key = ?', (now, key))
+                    conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Gemini cache read failed: {e}")
+            row = None
+            
+        with self._lock:
+            if not row:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            self.stats['saved_seconds'] += row['latency']
+            return row['response']
+            
+    def put(self, key: str, model: str, response: str, latency: float):
+        """Store a response with the time it took, then trim the table to max_bytes"""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    '''INSERT OR REPLACE INTO llm_cache(cache_key, model, response, size, latency, created_at, last_used_at)
+                       VALUES(?,?,?,?,?,?,?)''',
+                    (key, model, response, len(response.encode('utf-8')), latency, now, now)
+                )
+                self._evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Gemini cache write failed: {e}")
+            
+    def delete(self, key: str):
+        """Drop a cached response, e.g. one the caller could not use"""
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('DELETE FROM llm_cache WHERE cache_key = ?', (key,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Gemini cache delete failed: {e}")
+            
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM llm_cache').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+            
+        # Drop least recently used rows until the table fits again
+        excess = total - self.max_bytes
+        doomed = []
+        for row in conn.execute('SELECT cache_key, size FROM llm_cache ORDER BY last_used_at'):
+            if excess <= 0:
+                break
+            doomed.append((row['cache_key'],))
+            excess -= row['size']
+            
+        conn.executemany('DELETE FROM llm_cache WHERE cache_key = ?', doomed)
+        with self._lock:
+            self.stats['evictions'] += len(doomed)
+            
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['saved_seconds'] = round(stats['saved_seconds'], 2)
+        return stats
+
+class ProcessingCheckpoint:
+    """
+    Durable record of the articles summarized so far in one processing run.
+    Each article is committed as soon as its request completes, so a run
+    that dies part way can be restarted and skip the URLs already done.
+    """
+    
+    def __init__(self, run_id: str, db_path: str = 'processing_checkpoints.db'):
+        """
+        Initialize the checkpoint
+        
+        Args:
+            run_id: Identifies the run, e.g. the job id or the scraped file being processed
+            db_path: SQLite file shared by all runs
+        """
+        self.run_id = run_id
+        self.db_path = db_path
+        
+        conn = self._connect()
+        try:
+            # WAL keeps the per-article commits cheap
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS processing_runs (
+                    run_id TEXT PRIMARY KEY,
+                    source TEXT,
+                    created_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS processed_checkpoints (
+                    run_id TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    article TEXT NOT NULL,
+                    processed_at TEXT NOT NULL,
+                    PRIMARY KEY (run_id, url)
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+        
+    def begin(self, source: str) -> str:
+        """Record the run's input; a restarted run gets back the source it started with"""
+        from datetime import datetime
+        
+        conn = self._connect()
+        try:
+            conn.execute('INSERT OR IGNORE INTO processing_runs(run_id, source, created_at) VALUES(?,?,?)',
+                         (self.run_id, source, datetime.now().isoformat()))
+            conn.commit()
+            return conn.execute('SELECT source FROM processing_runs WHERE run_id = ?', (self.run_id,)).fetchone()[0]
+        finally:
+            conn.close()
+            
+    def done_urls(self) -> set:
+        conn = self._connect()
+        try:
+            return {row[0] for row in conn.execute(
+                'SELECT url FROM processed_checkpoints WHERE run_id = ?', (self.run_id,))}
+        finally:
+            conn.close()
+            
+    def save(self, position: int, article: dict):
+        """Commit one summarized article"""
+        from datetime import datetime
+        
+        conn = self._connect()
+        try:
+            conn.execute(
+                '''INSERT OR REPLACE INTO processed_checkpoints(run_id, url, position, article, processed_at)
+                   VALUES(?,?,?,?,?)''',
+                (self.run_id, article['url'], position, json.dumps(article, ensure_ascii=False),
+                 datetime.now().isoformat())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+            
+    def articles(self) -> list:
+        """Every article checkpointed in this run, in input order"""
+        conn = self._connect()
+        try:
+            return [json.loads(row[0]) for row in conn.execute(
+                'SELECT article FROM processed_checkpoints WHERE run_id = ? ORDER BY position', (self.run_id,))]
+        finally:
+            conn.close()
+            
+    def __len__(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM processed_checkpoints WHERE run_id = ?',
+                                (self.run_id,)).fetchone()[0]
+        finally:
+            conn.close()
+            
+    def clear(self):
+        """Drop the run once its output has been written"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM processed_checkpoints WHERE run_id = ?', (self.run_id,))
+            conn.execute('DELETE FROM processing_runs WHERE run_id = ?', (self.run_id,))
+            conn.commit()
+        finally:
+            conn.close()
+
+def default_response_cache() -> Optional[ResponseCache]:
+    """Cache configured from the environment; GEMINI_CACHE=0 disables it"""
+    if os.getenv('GEMINI_CACHE', '1') == '0':
+        return None
+    return ResponseCache(
+        os.getenv('GEMINI_CACHE_DB', 'gemini_cache.db'),
+        ttl_seconds=float(os.getenv('GEMINI_CACHE_TTL_HOURS', '168')) * 3600,
+        max_bytes=int(os.getenv('GEMINI_CACHE_MAX_MB', '64')) * 1024 * 1024
+    )
+
 class GeminiRestProcessor:
     """
     Gemini API processor using direct REST API calls to match the curl example format
     """
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash",
+                 base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None):
         """
         Initialize Gemini REST API processor
         
         Args:
             api_key: Gemini API key (or uses GEMINI_API_KEY env var)
             model: Model to use (default: gemini-2.0-flash to match curl example)
+            base_url: API root (or GEMINI_BASE_URL, e.g. a local mock server)
+            max_concurrency: Most requests in flight (or GEMINI_MAX_CONCURRENCY, default 8)
+            cache: Response cache shared between processors (default: from GEMINI_CACHE_* env vars)
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         if not self.api_key:
             raise ValueError("API key must be provided or set in GEMINI_API_KEY environment variable")
         
         self.model = model
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self.base_url = (base_url or os.getenv('GEMINI_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
         self.headers = {
             'Content-Type': 'application/json',
             'X-goog-api-key': self.api_key
         }
+        self.max_throttle_retries = 8
+        self.cache = cache if cache is not None else default_response_cache()
+        
+        max_concurrency = max_concurrency or int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+        self.concurrency = AdaptiveConcurrency(initial=min(2, max_concurrency), maximum=max_concurrency)
+        
+        # One pooled session so requests reuse TLS connections instead of opening one per call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def _make_request(self, prompt: str, max_retries: int = 3) -> Optional[str]:
         """
@@ -56,23 +523,27 @@ class GeminiRestProcessor:
             ]
         }
         
-        for attempt in range(max_retries):
+        attempt = 0
+        throttled = 0
+        while attempt < max_retries:
             try:
                 logger.info(f"Making Gemini API request (attempt {attempt + 1}/{max_retries})")
                 logger.debug(f"URL: {url}")
                 logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
                 
-                response = requests.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30
-                )
+                with self.concurrency.slot():
+                    response = self.session.post(
+                        url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=30
+                    )
                 
                 logger.debug(f"Response status: {response.status_code}")
                 logger.debug(f"Response headers: {dict(response.headers)}")
                 
                 if response.status_code == 200:
+                    self.concurrency.on_success()
                     response_data = response.json()
                     logger.debug(f"Response data: {json.dumps(response_data, indent=2)}")
                     
@@ -89,10 +560,16 @@ class GeminiRestProcessor:
                     return None
                     
                 elif response.status_code == 429:
-                    # Rate limited, wait and retry
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limited, waiting {wait_time}s before retry")
-                    import time
+                    # Rate limited: back off concurrency and wait as long as the API asks.
+                    # Throttling is expected under load, so it does not use up an attempt.
+                    retry_after = retry_after_seconds(response)
+                    self.concurrency.on_throttle(retry_after)
+                    throttled += 1
+                    if throttled > self.max_throttle_retries:
+                        logger.error("Still rate limited after repeated retries, giving up")
+                        return None
+                    wait_time = retry_after if retry_after is not None else min(2 ** throttled, 30)
+                    logger.warning(f"Rate limited, waiting {wait_time:.1f}s before retry")
                     time.sleep(wait_time)
                     continue
                     
@@ -112,9 +589,39 @@ class GeminiRestProcessor:
                 logger.error(f"JSON decode error: {e}")
                 logger.error(f"Raw response: {response.text}")
                 return None
+            
+            attempt += 1
                 
         return None
     
+    def _cached_request(self, prompt: str,
+                        validate: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        _make_request behind the response cache
+        
+        Args:
+            prompt: Prompt to send
+            validate: Whether a response is usable; only usable responses are
+                stored, and a cached one that is not is dropped and requested again
+        """
+        if self.cache is None:
+            return self._make_request(prompt)
+            
+        key = self.cache.key_for(self.model, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if validate is None or validate(cached):
+                logger.info("Gemini response served from cache")
+                return cached
+            logger.warning("Dropping unusable cached Gemini response")
+            self.cache.delete(key)
+            
+        start = time.perf_counter()
+        response = self._make_request(prompt)
+        if response and (validate is None or validate(response)):
+            self.cache.put(key, self.model, response, time.perf_counter() - start)
+        return response
+    
     def summarize_article(self, title: str, content: str, url: str, source: str) -> Optional[str]:
         """
         Summarize a single article - FORCE simple clean JSON
@@ -123,50 +630,80 @@ class GeminiRestProcessor:
 You are analyzing a workplace safety incident. Return ONLY clean JSON with these exact field names.
 
 TITLE: {title}
-CONTENT: {content[:2500]}
+CONTENT: {content[:ARTICLE_CONTENT_CHARS]}
 
 Return exactly this format with NO extra text, NO markdown, NO code blocks:
 
-{{"type": "Fatality", "severity": "Critical", "industry": "Construction", "company": "Company Name", "location": "Location", "summary": "Plain English summary", "fine": "£50000", "lesson": "Safety lesson"}}
+{SUMMARY_EXAMPLE}
 
 Rules:
-- type: ONLY use Fatality, Injury, Fine, Fire, Chemical, Equipment, Fall, Guidance  
-- severity: ONLY use Critical, High, Medium, Low
-- industry: ONLY use Construction, Manufacturing, Healthcare, Mining, Transport, Energy, General
-- company: actual company name or "Unknown"
-- location: actual location or "Unknown"
-- summary: 1-2 sentences in plain English
-- fine: amount like "£50000" or "None"
-- lesson: what to learn from this
+{SUMMARY_RULES}
 
 Return ONLY the JSON object. Nothing else.
 """
         
         try:
-            response = self._make_request(prompt)
+            response = self._cached_request(prompt, validate=lambda r: parse_summary(r) is not None)
             if response:
                 # Strip any markdown formatting
-                cleaned = response.strip()
-                if cleaned.startswith('```'):
-                    # Extract JSON from code blocks
-                    lines = cleaned.split('\n')
-                    json_lines = []
-                    in_json = False
-                    for line in lines:
-                        if line.strip().startswith('{'):
-                            in_json = True
-                        if in_json:
-                            json_lines.append(line)
-                        if line.strip().endswith('}') and in_json:
-                            break
-                    cleaned = '\n'.join(json_lines)
-                
-                return cleaned
+                return strip_code_fence(response)
             return None
         except Exception as e:
             logger.error(f"Error processing article {title}: {e}")
             return None
     
+    def summarize_batch(self, articles: List[Tuple[str, dict]]) -> Dict[str, dict]:
+        """
+        Summarize several articles in one request
+        
+        Args:
+            articles: (id, article) pairs; ids must be unique within the batch
+            
+        Returns:
+            Summary dicts keyed by article id. Articles the model left out or
+            answered with something unparseable are missing from the result.
+        """
+        sections = '\n\n'.join(
+            f"ID: {article_id}\nTITLE: {article['title']}\nCONTENT: {article['content'][:ARTICLE_CONTENT_CHARS]}"
+            for article_id, article in articles
+        )
+        prompt = f"""
+You are analyzing {len(articles)} workplace safety incidents. Return ONLY a clean JSON array with one object per article.
+
+{sections}
+
+Each object must have an "id" copied exactly from the article's ID line, plus these exact field names, like:
+
+{SUMMARY_EXAMPLE[:-1]}, "id": "ID"}}
+
+Rules:
+{SUMMARY_RULES}
+
+Return ONLY the JSON array, NO extra text, NO markdown, NO code blocks.
+"""
+        
+        try:
+            response = self._cached_request(prompt, validate=lambda r: parse_batch_items(r) is not None)
+        except Exception as e:
+            logger.error(f"Error processing batch of {len(articles)} articles: {e}")
+            return {}
+        if not response:
+            return {}
+            
+        items = parse_batch_items(response)
+        if items is None:
+            return {}
+            
+        wanted = {article_id for article_id, _ in articles}
+        summaries = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            article_id = str(item.pop('id', ''))
+            if article_id in wanted and item:
+                summaries[article_id] = item
+        return summaries
+    
     def generate_dashboard_summary(self, processed_articles: list) -> Optional[str]:
         """
         Generate PLAIN TEXT executive summary - NO JSON AT ALL
@@ -223,11 +760,11 @@ Write like you're briefing executives. Use normal business language. NO technica
 """
         
         try:
-            response = self._make_request(prompt)
+            response = self._cached_request(prompt, validate=is_plain_text)
             if response:
                 # Ensure it's plain text by stripping any formatting
                 cleaned = response.strip()
-                if cleaned.startswith('```') or cleaned.startswith('{'):
+                if not is_plain_text(cleaned):
                     # If AI returned JSON/code despite instructions, extract readable content
                     return f"Recent analysis of {total_incidents} workplace incidents shows {high_risk_total} high-risk cases requiring immediate attention. Construction remains the most affected sector with {construction_incidents} incidents and £{fine_total:,} in fines issued. Companies should prioritize equipment safety training, fall protection measures, and regulatory compliance to prevent similar incidents."
                 return cleaned
@@ -256,49 +793,76 @@ Write like you're briefing executives. Use normal business language. NO technica
 
 # Updated DataProcessor class to use REST API
 class DataProcessor:
-    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "gemini-2.0-flash",
+                 base_url: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None):
         """
         Initialize with REST API processor
         """
-        self.gemini = GeminiRestProcessor(api_key, model)
+        self.gemini = GeminiRestProcessor(api_key, model, base_url=base_url,
+                                          max_concurrency=max_concurrency, cache=cache)
         
     def load_scraped_data(self, file_path):
-        """Load scraped data from XML or JSON file"""
+        """Load scraped data from XML, JSONL or JSON file"""
+        return list(self.iter_scraped_data(file_path))
+        
+    def iter_scraped_data(self, file_path):
+        """
+        Yield scraped articles one at a time. XML is read with iterparse and
+        JSONL line by line, so memory stays flat however large the crawl.
+        """
         from pathlib import Path
-        import xml.etree.ElementTree as ET
         
         file_path = Path(file_path)
         
         if file_path.suffix == '.xml':
-            return self._load_xml_data(file_path)
+            return self._iter_xml_data(file_path)
+        elif file_path.suffix == '.jsonl':
+            return self._iter_jsonl_data(file_path)
         elif file_path.suffix == '.json':
-            return self._load_json_data(file_path)
+            return iter(self._load_json_data(file_path))
         else:
-            raise ValueError("Unsupported file format. Use XML or JSON.")
+            raise ValueError("Unsupported file format. Use XML, JSONL or JSON.")
             
-    def _load_xml_data(self, xml_file):
-        """Load data from XML file"""
+    def _iter_xml_data(self, xml_file):
+        """Stream articles from an XML file"""
         import xml.etree.ElementTree as ET
         
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
+        def text(elem, tag):
+            child = elem.find(tag)
+            return (child.text or '') if child is not None else ''
         
-        articles = []
-        for article_elem in root.findall('article'):
-            article = {
-                'id': article_elem.get('id'),
-                'title': article_elem.find('title').text if article_elem.find('title') is not None else '',
-                'url': article_elem.find('url').text if article_elem.find('url') is not None else '',
-                'source': article_elem.find('source').text if article_elem.find('source') is not None else '',
-                'content': article_elem.find('content').text if article_elem.find('content') is not None else '',
-                'scraped_at': article_elem.find('scraped_at').text if article_elem.find('scraped_at') is not None else ''
-            }
-            articles.append(article)
-            
-        return articles
+        context = ET.iterparse(xml_file, events=('start', 'end'))
+        _, root = next(context)
+        for event, elem in context:
+            if event == 'end' and elem.tag == 'article':
+                yield {
+                    'id': elem.get('id'),
+                    'title': text(elem, 'title'),
+                    'url': text(elem, 'url'),
+                    'source': text(elem, 'source'),
+                    'content': text(elem, 'content'),
+                    'scraped_at': text(elem, 'scraped_at')
+                }
+                # Drop parsed articles so the tree never holds more than one
+                root.clear()
+                
+    def _iter_jsonl_data(self, jsonl_file):
+        """Stream articles from a JSONL file written by ScrapeWriter"""
+        with open(jsonl_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield {
+                        'title': record.get('title', ''),
+                        'url': record.get('url', ''),
+                        'source': record.get('source', ''),
+                        'content': record.get('content', ''),
+                        'scraped_at': record.get('scraped_at', '')
+                    }
         
     def _load_json_data(self, json_file):
-        """Load data from JSON file"""
+        """Load data from JSON file (format written before JSONL output)"""
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
             
@@ -315,48 +879,150 @@ class DataProcessor:
             
         return articles
         
-    def process_articles_with_gemini(self, articles: list, max_articles: int = 20) -> list:
+    def process_articles_with_gemini(self, articles, max_articles: int = 20,
+                                     batch_size: Optional[int] = None,
+                                     batch_tokens: Optional[int] = None,
+                                     progress: Optional[Callable[[int, int], None]] = None,
+                                     stop: Optional[threading.Event] = None,
+                                     checkpoint: Optional[ProcessingCheckpoint] = None) -> list:
         """
         Process articles using Gemini REST API
+        
+        Articles are summarized concurrently on a bounded worker pool. The
+        number of requests actually in flight follows the API's rate limit
+        (see AdaptiveConcurrency), and results keep the input order.
+        
+        With a batch size above 1, consecutive articles are packed into one
+        request under a token budget; any article missing from a batch
+        result is retried on its own.
+        
+        Args:
+            articles: List or iterator of articles (e.g. from iter_scraped_data)
+            max_articles: Articles taken from the front of `articles`
+            batch_size: Most articles per request (or GEMINI_BATCH_SIZE, default 1)
+            batch_tokens: Estimated article tokens per request (or GEMINI_BATCH_TOKENS, default 8000)
+            progress: Called with (articles done, total) as requests complete
+            stop: When set, no further requests are started and the articles
+                finished so far are returned
+            checkpoint: Commits each summarized article as it completes; articles
+                whose URL it already holds are not sent again, and the result
+                is read back from it, including articles from earlier attempts
         """
-        from datetime import datetime
-        import time
+        from itertools import islice
+        
+        if batch_size is None:
+            batch_size = int(os.getenv('GEMINI_BATCH_SIZE', '1'))
+        if batch_tokens is None:
+            batch_tokens = int(os.getenv('GEMINI_BATCH_TOKENS', '8000'))
+            
+        total = min(len(articles), max_articles) if hasattr(articles, '__len__') else max_articles
+        workers = self.gemini.concurrency.maximum
+        results = {}
+        pending = set()
         
-        processed_articles = []
+        done_urls = checkpoint.done_urls() if checkpoint is not None else set()
+        resumed = 0
         
-        for i, article in enumerate(articles[:max_articles]):
-            if not article['content']:  # Skip articles without content
-                continue
-                
-            logger.info(f"Processing article {i+1}/{min(len(articles), max_articles)}: {article['title'][:50]}...")
+        def to_process():
+            nonlocal resumed
+            for i, article in enumerate(islice(articles, max_articles)):
+                if not article['content']:  # Skip articles without content
+                    continue
+                if article['url'] in done_urls:
+                    resumed += 1
+                    continue
+                yield i, article
+        
+        def collect(done):
+            for f in done:
+                for i, processed in f.result():
+                    results[i] = processed
+                    if checkpoint is not None and processed is not None:
+                        checkpoint.save(i, processed)
+            if progress:
+                progress(resumed + len(results), total)
+        
+        # Results are collected (and checkpointed) as each request finishes, never
+        # a whole window at a time, so an interrupted run loses at most the
+        # requests still in flight
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for batch in pack_batches(to_process(), batch_tokens, max(1, batch_size)):
+                if stop is not None and stop.is_set():
+                    logger.info("Stop requested; not starting further articles")
+                    break
+                pending.add(pool.submit(self._process_batch, batch, total))
+                done = {f for f in pending if f.done()}
+                if done:
+                    pending -= done
+                    collect(done)
+                # Keep only a couple of rounds of articles in memory when reading a stream
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                    
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
             
-            summary = self.gemini.summarize_article(
-                article['title'],
-                article['content'],
-                article['url'],
-                article['source']
-            )
+        logger.info(f"Gemini concurrency: {self.gemini.concurrency.get_stats()}")
+        if self.gemini.cache is not None:
+            logger.info(f"Gemini cache: {self.gemini.cache.get_stats()}")
+        if checkpoint is not None:
+            if resumed:
+                logger.info(f"Skipped {resumed} articles already checkpointed in run {checkpoint.run_id}")
+            return checkpoint.articles()
+        return [results[i] for i in sorted(results) if results[i] is not None]
+        
+    def _process_batch(self, batch: list, total: int) -> list:
+        """Summarize a batch of (index, article) pairs; returns (index, processed article or None) pairs"""
+        if len(batch) == 1:
+            return [self._process_article(batch[0][0], total, batch[0][1])]
             
-            if summary:
-                try:
-                    # Try to parse JSON response
-                    summary_data = json.loads(summary)
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse JSON response: {e}")
-                    # Fallback to raw text if JSON parsing fails
-                    summary_data = {"raw_summary": summary}
-                
-                processed_article = {
-                    **article,
-                    'gemini_summary': summary_data,
-                    'processed_at': datetime.now().isoformat()
-                }
-                processed_articles.append(processed_article)
-                
-            # Be respectful to API rate limits
-            time.sleep(1)
-                
-        return processed_articles
+        logger.info(f"Processing articles {', '.join(str(i + 1) for i, _ in batch)}/{total} in one request...")
+        summaries = self.gemini.summarize_batch([(str(i), article) for i, article in batch])
+        
+        processed = []
+        for i, article in batch:
+            summary_data = summaries.get(str(i))
+            if summary_data is None:
+                logger.info(f"Article {i+1} missing from batch result; summarizing it on its own")
+                processed.append(self._process_article(i, total, article))
+            else:
+                processed.append((i, self._with_summary(article, summary_data)))
+        return processed
+        
+    def _process_article(self, i: int, total: int, article: dict):
+        """Summarize one article; returns (input index, processed article or None)"""
+        logger.info(f"Processing article {i+1}/{total}: {article['title'][:50]}...")
+        
+        summary = self.gemini.summarize_article(
+            article['title'],
+            article['content'],
+            article['url'],
+            article['source']
+        )
+        
+        if not summary:
+            return i, None
+            
+        try:
+            # Try to parse JSON response
+            summary_data = json.loads(summary)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse JSON response: {e}")
+            # Fallback to raw text if JSON parsing fails
+            summary_data = {"raw_summary": summary}
+        
+        return i, self._with_summary(article, summary_data)
+        
+    def _with_summary(self, article: dict, summary_data: dict) -> dict:
+        from datetime import datetime
+        
+        return {
+            **article,
+            'gemini_summary': summary_data,
+            'processed_at': datetime.now().isoformat()
+        }
 
 # Test function
 def test_gemini_rest_api():
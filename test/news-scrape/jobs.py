@@ -0,0 +1,498 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from graphlib import TopologicalSorter
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+class JobCancelled(Exception):
+    """Raised inside a stage once its job has been cancelled"""
+
+class StageContext:
+    """What a stage function sees: its job's parameters, earlier stage results and progress reporting"""
+
+    def __init__(self, manager: 'JobManager', job: Dict[str, Any], stage: str,
+                 results: Dict[str, Any], cancel_event: threading.Event):
+        self.manager = manager
+        self.job_id = job['id']
+        self.params = job['params']
+        self.stage = stage
+        self.results = results
+        self.cancel_event = cancel_event
+
+    def progress(self, percent: float, message: str):
+        """Record and publish stage progress (0-100)"""
+        self.manager._update_stage(self.job_id, self.stage, progress=int(percent), message=message)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+class JobStore:
+    """
+    SQLite tables for jobs, their stages and recurring schedules. Every call
+    opens its own connection, so the store can be shared between threads.
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT,
+            error TEXT,
+            schedule TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)",
+        """CREATE TABLE IF NOT EXISTS job_stages (
+            job_id INTEGER NOT NULL REFERENCES jobs(id),
+            stage TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            progress INTEGER NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            PRIMARY KEY (job_id, stage)
+        )""",
+        """CREATE TABLE IF NOT EXISTS schedules (
+            name TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            interval_seconds REAL NOT NULL,
+            next_run_at REAL NOT NULL,
+            enabled INTEGER NOT NULL DEFAULT 1
+        )"""
+    ]
+
+    def __init__(self, db_path: str = 'jobs.db'):
+        self.db_path = db_path
+        conn = self._connect()
+        try:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _job(row, stages) -> Dict[str, Any]:
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['stages'] = [dict(s, result=json.loads(s['result']) if s['result'] else None) for s in stages]
+        return job
+
+    def create_job(self, kind: str, params: dict, stages: List[str], schedule: Optional[str] = None) -> int:
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                'INSERT INTO jobs(kind, params, status, message, schedule, created_at) VALUES(?,?,?,?,?,?)',
+                (kind, json.dumps(params), 'queued', 'Queued', schedule, datetime.now().isoformat())
+            )
+            conn.executemany(
+                "INSERT INTO job_stages(job_id, stage, position, status, message) VALUES(?,?,?,'pending','Waiting')",
+                [(cur.lastrowid, stage, n) for n, stage in enumerate(stages)]
+            )
+            conn.commit()
+            return cur.lastrowid
+        finally:
+            conn.close()
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            stages = conn.execute('SELECT * FROM job_stages WHERE job_id = ? ORDER BY position', (job_id,)).fetchall()
+            return self._job(row, stages)
+        finally:
+            conn.close()
+
+    def list_jobs(self, limit: int = 20, statuses: Optional[Tuple[str, ...]] = None,
+                  stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest jobs first, optionally only those in `statuses` or containing `stage`"""
+        sql = 'SELECT id FROM jobs j WHERE 1 = 1'
+        params: list = []
+        if statuses:
+            sql += f" AND status IN ({','.join('?' * len(statuses))})"
+            params.extend(statuses)
+        if stage:
+            sql += ' AND EXISTS (SELECT 1 FROM job_stages s WHERE s.job_id = j.id AND s.stage = ?)'
+            params.append(stage)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+
+        conn = self._connect()
+        try:
+            ids = [row['id'] for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+        return [self.get_job(job_id) for job_id in ids]
+
+    def update_job(self, job_id: int, **fields):
+        self._update('jobs', 'id = ?', (job_id,), fields)
+
+    def update_stage(self, job_id: int, stage: str, **fields):
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        self._update('job_stages', 'job_id = ? AND stage = ?', (job_id, stage), fields)
+
+    def _update(self, table, where, key, fields):
+        conn = self._connect()
+        try:
+            assignments = ', '.join(f'{name} = ?' for name in fields)
+            conn.execute(f'UPDATE {table} SET {assignments} WHERE {where}', (*fields.values(), *key))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def claim_next(self) -> Optional[int]:
+        """Mark the oldest queued job running and return its id"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', message = 'Running', started_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), row['id'])
+            )
+            conn.commit()
+            return row['id']
+        finally:
+            conn.close()
+
+    def requeue_interrupted(self) -> List[int]:
+        """Queue again the jobs a previous process left running; their finished stages are kept"""
+        conn = self._connect()
+        try:
+            ids = [row['id'] for row in conn.execute("SELECT id FROM jobs WHERE status = 'running'")]
+            if ids:
+                marks = ','.join('?' * len(ids))
+                conn.execute(f"UPDATE jobs SET status = 'queued', message = 'Resuming after restart' WHERE id IN ({marks})", ids)
+                conn.execute(f"""UPDATE job_stages SET status = 'pending', progress = 0, message = 'Resuming after restart'
+                                 WHERE job_id IN ({marks}) AND status = 'running'""", ids)
+                conn.commit()
+            return ids
+        finally:
+            conn.close()
+
+    # Schedules
+
+    def set_schedule(self, name: str, kind: str, params: dict, interval_seconds: float, enabled: bool = True):
+        """Create or change a recurring job; the next run is one interval from now"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                '''INSERT INTO schedules(name, kind, params, interval_seconds, next_run_at, enabled)
+                   VALUES(?,?,?,?,?,?)
+                   ON CONFLICT(name) DO UPDATE SET kind = excluded.kind, params = excluded.params,
+                       interval_seconds = excluded.interval_seconds, enabled = excluded.enabled,
+                       next_run_at = CASE WHEN schedules.interval_seconds = excluded.interval_seconds
+                                          AND schedules.enabled = excluded.enabled
+                                     THEN schedules.next_run_at ELSE excluded.next_run_at END''',
+                (name, kind, json.dumps(params), interval_seconds, time.time() + interval_seconds, int(enabled))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def list_schedules(self) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            return [dict(row, params=json.loads(row['params']), enabled=bool(row['enabled']),
+                         next_run=datetime.fromtimestamp(row['next_run_at']).isoformat())
+                    for row in conn.execute('SELECT * FROM schedules ORDER BY name')]
+        finally:
+            conn.close()
+
+    def take_due_schedules(self, now: float) -> List[Dict[str, Any]]:
+        """Enabled schedules whose time has come, advancing each to its next run"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            due = [dict(row, params=json.loads(row['params'])) for row in conn.execute(
+                'SELECT * FROM schedules WHERE enabled = 1 AND next_run_at <= ?', (now,))]
+            for schedule in due:
+                # Skip runs missed while the app was down instead of firing them all at once
+                conn.execute('UPDATE schedules SET next_run_at = ? WHERE name = ?',
+                             (now + schedule['interval_seconds'], schedule['name']))
+            conn.commit()
+            return due
+        finally:
+            conn.close()
+
+class JobManager:
+    """
+    Runs jobs from a JobStore on a bounded set of worker threads. A job is a
+    list of stages executed in dependency order; a stage's return value is
+    saved and handed to later stages, so a job interrupted by a crash or a
+    cancel resumes from its first unfinished stage. Every state change is
+    pushed to subscribers (the dashboard's event stream).
+    """
+
+    def __init__(self, store: JobStore, stages: Dict[str, Callable[[StageContext], Optional[dict]]],
+                 workflows: Dict[str, List[str]], dependencies: Optional[Dict[str, List[str]]] = None,
+                 max_workers: int = 1, schedule_interval: float = 30.0):
+        """
+        Initialize the manager
+
+        Args:
+            store: Persistent job tables
+            stages: Stage name to function; the function gets a StageContext and
+                returns a JSON-serializable result. A result with
+                `skip_remaining` set ends the job early as succeeded.
+            workflows: Job kind to the stages it runs
+            dependencies: Stage name to the stages that must finish before it
+            max_workers: Jobs run at the same time
+            schedule_interval: Seconds between checks for due schedules
+        """
+        self.store = store
+        self.stages = stages
+        self.workflows = workflows
+        self.dependencies = dependencies or {}
+        self.max_workers = max_workers
+        self.schedule_interval = schedule_interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._cancel_events: Dict[int, threading.Event] = {}
+        self._subscribers: List[queue.Queue] = []
+        self._started = False
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+
+    def start(self, resume: bool = True):
+        """Start workers and the scheduler; safe to call more than once"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        if resume:
+            resumed = self.store.requeue_interrupted()
+            if resumed:
+                logger.info(f"Resuming interrupted jobs {resumed}")
+        else:
+            for job in self.store.list_jobs(limit=1000, statuses=('running',)):
+                self.store.update_job(job['id'], status='failed', error='Interrupted by restart',
+                                      message='Interrupted by restart', finished_at=datetime.now().isoformat())
+
+        for n in range(self.max_workers):
+            self._spawn(self._worker, f'job-worker-{n}')
+        self._spawn(self._scheduler, 'job-scheduler')
+
+    def stop(self):
+        with self._wake:
+            self._stopping = True
+            for event in self._cancel_events.values():
+                event.set()
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # Submitting and controlling jobs
+
+    def submit(self, kind: str, params: Optional[dict] = None, schedule: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a job unless the same kind is already queued or running
+
+        Returns:
+            (job, created) where job is the new job or the existing one
+        """
+        if kind not in self.workflows:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._wake:
+            existing = [job for job in self.store.list_jobs(limit=50, statuses=ACTIVE_STATUSES)
+                        if job['kind'] == kind]
+            if existing:
+                return existing[-1], False
+            job_id = self.store.create_job(kind, params or {}, self._stage_order(self.workflows[kind]), schedule)
+            self._wake.notify_all()
+
+        job = self.store.get_job(job_id)
+        logger.info(f"Queued job {job_id} ({kind})")
+        self._publish(job)
+        return job, True
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued job, or ask a running one to stop at its next checkpoint"""
+        with self._lock:
+            job = self.store.get_job(job_id)
+            if job is None or job['status'] not in ACTIVE_STATUSES:
+                return False
+            if job['status'] == 'queued':
+                self.store.update_job(job_id, status='cancelled', message='Cancelled',
+                                      finished_at=datetime.now().isoformat())
+            else:
+                self._cancel_events.setdefault(job_id, threading.Event()).set()
+                self.store.update_job(job_id, message='Cancelling...')
+        self._publish(self.store.get_job(job_id))
+        return True
+
+    def resume(self, job_id: int) -> bool:
+        """Queue a failed or cancelled job again; stages that succeeded are not re-run"""
+        with self._wake:
+            job = self.store.get_job(job_id)
+            if job is None or job['status'] not in ('failed', 'cancelled'):
+                return False
+            if any(j['kind'] == job['kind'] for j in self.store.list_jobs(limit=50, statuses=ACTIVE_STATUSES)):
+                return False
+            for stage in job['stages']:
+                if stage['status'] != 'succeeded':
+                    self.store.update_stage(job_id, stage['stage'], status='pending', progress=0, message='Waiting')
+            self.store.update_job(job_id, status='queued', message='Queued to resume', error=None, finished_at=None)
+            self._wake.notify_all()
+        self._publish(self.store.get_job(job_id))
+        return True
+
+    def _stage_order(self, stages: List[str]) -> List[str]:
+        graph = {stage: [d for d in self.dependencies.get(stage, []) if d in stages] for stage in stages}
+        return list(TopologicalSorter(graph).static_order())
+
+    # Progress events
+
+    def subscribe(self) -> queue.Queue:
+        """Queue receiving a job snapshot on every change; pass it to unsubscribe when done"""
+        q = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _publish(self, job: Optional[Dict[str, Any]]):
+        if job is None:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(job)
+            except queue.Full:
+                # A stalled client only misses intermediate progress
+                try:
+                    q.get_nowait()
+                    q.put_nowait(job)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _update_stage(self, job_id: int, stage: str, **fields):
+        self.store.update_stage(job_id, stage, **fields)
+        if 'message' in fields:
+            self.store.update_job(job_id, message=fields['message'])
+        self._publish(self.store.get_job(job_id))
+
+    # Workers
+
+    def _worker(self):
+        while True:
+            with self._wake:
+                if self._stopping:
+                    return
+                job_id = self.store.claim_next()
+                if job_id is None:
+                    self._wake.wait(timeout=self.schedule_interval)
+                    continue
+                cancel_event = self._cancel_events.setdefault(job_id, threading.Event())
+            try:
+                self._run(self.store.get_job(job_id), cancel_event)
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed: {e}")
+                self.store.update_job(job_id, status='failed', error=str(e), message=f'Failed: {e}',
+                                      finished_at=datetime.now().isoformat())
+                self._publish(self.store.get_job(job_id))
+            finally:
+                with self._lock:
+                    self._cancel_events.pop(job_id, None)
+
+    def _run(self, job: Dict[str, Any], cancel_event: threading.Event):
+        job_id = job['id']
+        logger.info(f"Running job {job_id} ({job['kind']})")
+        self._publish(job)
+
+        results = {s['stage']: s['result'] for s in job['stages'] if s['status'] == 'succeeded'}
+        stages = [s['stage'] for s in job['stages']]
+        for n, stage in enumerate(stages):
+            if stage in results:
+                continue
+
+            self._update_stage(job_id, stage, status='running', progress=0, message='Starting...',
+                               started_at=datetime.now().isoformat(), finished_at=None)
+            context = StageContext(self, job, stage, results, cancel_event)
+            try:
+                context.check_cancelled()
+                # A stage that returns has finished its side effects; record it even if a cancel arrived meanwhile
+                result = self.stages[stage](context) or {}
+            except JobCancelled:
+                self._finish(job_id, stage, 'cancelled', 'Cancelled')
+                return
+            except Exception as e:
+                logger.error(f"Job {job_id} stage {stage} failed: {e}")
+                self._finish(job_id, stage, 'failed', f'{stage.capitalize()} failed: {e}', error=str(e))
+                return
+
+            results[stage] = result
+            self.store.update_stage(job_id, stage, status='succeeded', progress=100, result=result,
+                                    finished_at=datetime.now().isoformat())
+            if result.get('skip_remaining'):
+                for later in stages[n + 1:]:
+                    self.store.update_stage(job_id, later, status='skipped', message='Skipped: nothing to do')
+                break
+            if cancel_event.is_set() and n + 1 < len(stages):
+                self._finish(job_id, stages[n + 1], 'cancelled', 'Cancelled')
+                return
+
+        self.store.update_job(job_id, status='succeeded', finished_at=datetime.now().isoformat())
+        self._publish(self.store.get_job(job_id))
+        logger.info(f"Job {job_id} finished")
+
+    def _finish(self, job_id: int, stage: str, status: str, message: str, error: Optional[str] = None):
+        now = datetime.now().isoformat()
+        self.store.update_stage(job_id, stage, status=status, progress=0, message=message, finished_at=now)
+        self.store.update_job(job_id, status=status, message=message, error=error, finished_at=now)
+        self._publish(self.store.get_job(job_id))
+
+    def _scheduler(self):
+        while True:
+            with self._wake:
+                if self._stopping:
+                    return
+            try:
+                for schedule in self.store.take_due_schedules(time.time()):
+                    job, created = self.submit(schedule['kind'], schedule['params'], schedule=schedule['name'])
+                    if not created:
+                        logger.info(f"Schedule {schedule['name']}: job {job['id']} still active, skipping this run")
+            except Exception as e:
+                logger.error(f"Scheduler error: {e}")
+            with self._wake:
+                self._wake.wait(timeout=self.schedule_interval)
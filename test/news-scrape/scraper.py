@@ -1,9 +1,17 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import time
+import threading
 import xml.etree.ElementTree as ET
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
 import json
+import os
+import re
+import hashlib
+import sqlite3
 from datetime import datetime
 import logging
 
@@ -11,9 +19,389 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Parsing backends: 'lxml' parses and matches selectors natively (compiled
+# XPath), 'html.parser' is BeautifulSoup's pure-Python fallback.
+# Set SCRAPER_PARSER to force one.
+try:
+    import lxml.html
+    from lxml import etree
+    DEFAULT_PARSER = os.getenv('SCRAPER_PARSER', 'lxml')
+except ImportError:
+    lxml = None
+    DEFAULT_PARSER = os.getenv('SCRAPER_PARSER', 'html.parser')
+
+# Elements stripped before extracting article text
+UNWANTED_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'aside', 'noscript', 'iframe']
+
+# Main content areas, most specific first
+CONTENT_SELECTORS = [
+    'article .content',
+    'article .post-content',
+    'article .entry-content',
+    '.main-content article',
+    '.content article',
+    'article',
+    '.post-content',
+    '.entry-content',
+    '#content',
+    'main',
+    '.main'
+]
+
+_CSS_STEP = re.compile(r'([a-zA-Z][\w-]*)?((?:[.#][\w-]+|\[[\w-]+(?:="[^"]*")?\])*)$')
+_CSS_PART = re.compile(r'([.#])([\w-]+)|\[([\w-]+)(?:="([^"]*)")?\]')
+
+def _css_steps(selector):
+    """XPath steps for the simple CSS used by the extractors: tag, .class, #id,
+    [attr], [attr="value"] and descendant combinators"""
+    steps = []
+    for step in selector.split():
+        match = _CSS_STEP.match(step)
+        if not match:
+            raise ValueError(f"Unsupported selector: {selector}")
+        conditions = []
+        for kind, name, attr, value in _CSS_PART.findall(match.group(2)):
+            if kind == '.':
+                conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')")
+            elif kind == '#':
+                conditions.append(f'@id="{name}"')
+            elif value:
+                conditions.append(f'@{attr}="{value}"')
+            else:
+                conditions.append(f'@{attr}')
+        steps.append((match.group(1) or '*') + ''.join(f'[{c}]' for c in conditions))
+    return steps
+
+def css_to_xpath(selector):
+    """XPath selecting every element that matches a CSS selector"""
+    return 'descendant-or-self::' + '//'.join(_css_steps(selector))
+
+def css_match_xpath(selector):
+    """XPath that is true for an element matching a CSS selector, like Tag.css.match"""
+    steps = _css_steps(selector)
+    ancestors = None
+    for step in steps[:-1]:
+        ancestors = step if ancestors is None else f'{step}[ancestor::{ancestors}]'
+    return f'boolean(self::{steps[-1]}' + (f'[ancestor::{ancestors}]' if ancestors else '') + ')'
+
+def compile_selectors(selectors):
+    """
+    One XPath for a selector list. The union yields matches in document
+    order, so use it only where the caller re-ranks them (see
+    extract_article_text); link extraction queries each selector in turn.
+    """
+    return etree.XPath(' | '.join(css_to_xpath(s) for s in selectors))
+
+def element_text(element, separator=''):
+    """Stripped text of an lxml element, like BeautifulSoup's get_text(separator, strip=True)"""
+    return separator.join(t.strip() for t in element.itertext() if t.strip())
+
+class HostRateLimiter:
+    """
+    Per-host token bucket plus a cap on concurrent requests, so different
+    hosts are fetched in parallel while each host sees a polite request rate
+    """
+    
+    def __init__(self, rate=0.5, burst=2, concurrency=2):
+        """
+        Args:
+            rate: Sustained requests per second allowed per host
+            burst: Requests a host may receive back to back after being idle
+            concurrency: Requests in flight per host at once
+        """
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self._lock = threading.Lock()
+        self._hosts = {}
+        
+    def _host(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = {
+                    'tokens': float(self.burst),
+                    'updated': time.monotonic(),
+                    'slots': threading.BoundedSemaphore(self.concurrency)
+                }
+            return self._hosts[host]
+            
+    def _take_token(self, state):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                state['tokens'] = min(self.burst, state['tokens'] + (now - state['updated']) * self.rate)
+                state['updated'] = now
+                if state['tokens'] >= 1:
+                    state['tokens'] -= 1
+                    return
+                delay = (1 - state['tokens']) / self.rate
+            time.sleep(delay)
+            
+    @contextmanager
+    def slot(self, url):
+        """Hold one of the host's concurrency slots and one rate token for a request"""
+        state = self._host(url)
+        with state['slots']:
+            self._take_token(state)
+            yield
+
+class ScrapeIndex:
+    """
+    Persistent record of every URL fetched: HTTP validators for conditional
+    requests, a hash of the extracted content and, for listing pages, the
+    links found on them. Lets repeat runs skip content they already have.
+    
+    New or changed article content is held as a pending hash until confirm()
+    is called once the article has been processed downstream. Until then the
+    article is fetched and emitted again on every run, so an article that
+    failed processing or was cut off by a run's limit is not lost.
+    """
+    
+    def __init__(self, db_path='scrape_index.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS scraped_urls (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                pending_hash TEXT,
+                links TEXT,
+                last_scraped REAL NOT NULL,
+                last_changed REAL NOT NULL
+            )
+        ''')
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(scraped_urls)')}
+        if 'pending_hash' not in columns:
+            self.conn.execute('ALTER TABLE scraped_urls ADD COLUMN pending_hash TEXT')
+        self.conn.commit()
+        
+    @staticmethod
+    def url_hash(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+        
+    @staticmethod
+    def content_hash(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+        
+    def get(self, url):
+        """Stored entry for a URL, or None if it was never fetched"""
+        with self._lock:
+            row = self.conn.execute('SELECT * FROM scraped_urls WHERE url_hash = ?',
+                                    (self.url_hash(url),)).fetchone()
+        return dict(row) if row else None
+        
+    def validators(self, entry):
+        """Conditional request headers for a stored entry"""
+        headers = {}
+        if entry and entry.get('pending_hash'):
+            # Not yet processed downstream: a 304 would drop it, so fetch the body again
+            return headers
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+        
+    def is_fresh(self, url, max_age_seconds):
+        """True if the URL was scraped within max_age_seconds, so it need not be requested at all"""
+        entry = self.get(url)
+        return bool(entry and entry['content_hash'] and not entry['pending_hash']
+                    and time.time() - entry['last_scraped'] < max_age_seconds)
+        
+    def touch(self, url):
+        """Mark an unchanged URL (304 or same content) as scraped now"""
+        with self._lock:
+            self.conn.execute('UPDATE scraped_urls SET last_scraped = ? WHERE url_hash = ?',
+                              (time.time(), self.url_hash(url)))
+            self.conn.commit()
+            
+    def record(self, url, kind, response, content_hash, links=None, pending=False):
+        """
+        Store the validators and content hash of a fetched URL
+        
+        Args:
+            pending: Hold new or changed content as pending until confirm(),
+                instead of treating it as already handled
+        
+        Returns:
+            True if the content is new or changed since it was last confirmed
+        """
+        now = time.time()
+        entry = self.get(url)
+        changed = entry is None or entry['content_hash'] != content_hash
+        if pending and changed:
+            committed, pending_hash = entry['content_hash'] if entry else None, content_hash
+        else:
+            committed, pending_hash = content_hash, None
+        with self._lock:
+            self.conn.execute('''
+                INSERT INTO scraped_urls(url_hash, url, kind, etag, last_modified, content_hash,
+                                         pending_hash, links, last_scraped, last_changed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url_hash) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash,
+                    pending_hash = excluded.pending_hash,
+                    links = excluded.links,
+                    last_scraped = excluded.last_scraped,
+                    last_changed = CASE WHEN scraped_urls.content_hash IS excluded.content_hash
+                                        AND scraped_urls.pending_hash IS excluded.pending_hash
+                                        THEN scraped_urls.last_changed ELSE excluded.last_changed END
+            ''', (self.url_hash(url), url, kind, response.headers.get('ETag'),
+                  response.headers.get('Last-Modified'), committed, pending_hash,
+                  json.dumps(links) if links is not None else None, now, now))
+            self.conn.commit()
+        return changed
+        
+    def confirm(self, urls):
+        """
+        Mark articles as processed downstream, so their pending content counts
+        as seen and later runs skip it while it stays the same
+        
+        Returns:
+            Number of URLs that had pending content
+        """
+        with self._lock:
+            cursor = self.conn.executemany(
+                '''UPDATE scraped_urls SET content_hash = pending_hash, pending_hash = NULL
+                   WHERE url_hash = ? AND pending_hash IS NOT NULL''',
+                [(self.url_hash(url),) for url in urls])
+            self.conn.commit()
+        return cursor.rowcount
+        
+    def has_content(self, url):
+        entry = self.get(url)
+        return bool(entry and entry['content_hash'])
+        
+    def close(self):
+        self.conn.close()
+
+class ScrapeWriter:
+    """
+    Streams scraped articles to an XML file for Gemini processing and a JSONL
+    file (one article per line) as they are fetched, instead of building the
+    whole corpus in memory first. Read them back with
+    DataProcessor.iter_scraped_data.
+    
+    Given an ArticleWarehouse, the articles are also upserted into it in
+    batches of `batch_size`.
+    """
+    
+    def __init__(self, filename_base='health_safety_news', warehouse=None, batch_size=100):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.xml_filename = f'{filename_base}_{timestamp}.xml'
+        self.jsonl_filename = f'{filename_base}_{timestamp}.jsonl'
+        self.total_articles = 0
+        self.articles_with_content = 0
+        self.warehouse = warehouse
+        self.batch_size = batch_size
+        self._pending = []
+        
+        self._xml = open(self.xml_filename, 'w', encoding='utf-8')
+        self._jsonl = open(self.jsonl_filename, 'w', encoding='utf-8')
+        root = ET.Element('health_safety_news', scraped_at=datetime.now().isoformat())
+        # Opening tag only; articles are appended as children and the root closed in close()
+        self._xml.write(ET.tostring(root, encoding='unicode').replace(' />', '>') + '\n')
+        
+    def write_article(self, link, content=None):
+        """Append one article (and its content, if fetched) to both files"""
+        article_elem = ET.Element('article', id=str(self.total_articles))
+        ET.SubElement(article_elem, 'title').text = link['title']
+        ET.SubElement(article_elem, 'url').text = link['url']
+        ET.SubElement(article_elem, 'source').text = link['source']
+        ET.SubElement(article_elem, 'scraped_at').text = link.get('scraped_at', '')
+        if content:
+            ET.SubElement(article_elem, 'content').text = content
+        self._xml.write(ET.tostring(article_elem, encoding='unicode') + '\n')
+        
+        record = {
+            'title': link['title'],
+            'url': link['url'],
+            'source': link['source'],
+            'scraped_at': link.get('scraped_at', ''),
+            'content': content or ''
+        }
+        self._jsonl.write(json.dumps(record, ensure_ascii=False) + '\n')
+        
+        if self.warehouse is not None:
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        
+        self.total_articles += 1
+        if content:
+            self.articles_with_content += 1
+            
+    def flush(self):
+        """Upsert the articles buffered for the warehouse"""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.warehouse.upsert_scraped(pending, source_file=self.xml_filename)
+            
+    def close(self):
+        if self._xml.closed:
+            return
+        summary = ET.Element('summary', total_articles=str(self.total_articles),
+                             total_articles_with_content=str(self.articles_with_content))
+        self._xml.write(ET.tostring(summary, encoding='unicode') + '\n</health_safety_news>\n')
+        self._xml.close()
+        self._jsonl.close()
+        logger.info(f"Saved {self.total_articles} articles to {self.xml_filename} and {self.jsonl_filename}")
+        self.flush()
+        
+    def discard(self):
+        """Close and delete the files, e.g. when a run found nothing new"""
+        self._pending = []
+        self.close()
+        for filename in (self.xml_filename, self.jsonl_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+        if self.warehouse is not None:
+            # Batches already flushed listed the XML file as their source
+            self.warehouse.forget_source(self.xml_filename)
+                
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 class HealthSafetyScraper:
-    def __init__(self):
+    def __init__(self, max_workers=8, host_rate=0.5, host_burst=2, host_concurrency=2,
+                 index_path='scrape_index.db', refresh_after_hours=24, parser=None):
+        """
+        Args:
+            max_workers: Fetch threads shared by all hosts
+            host_rate: Requests per second per host
+            host_burst: Back-to-back requests a host may receive after being idle
+            host_concurrency: Simultaneous requests per host
+            index_path: SQLite seen-URL index for incremental runs; None re-fetches everything
+            refresh_after_hours: Articles scraped more recently than this are not requested again
+            parser: BeautifulSoup tree builder, 'lxml' or 'html.parser' (default: SCRAPER_PARSER or lxml if installed)
+        """
+        self.max_workers = max_workers
+        self.parser = parser or DEFAULT_PARSER
+        self._xpaths = {}
+        if self.parser == 'lxml':
+            self._content_matchers = [(s, etree.XPath(css_match_xpath(s))) for s in CONTENT_SELECTORS]
+        self.index = ScrapeIndex(index_path) if index_path else None
+        self.refresh_after = refresh_after_hours * 3600
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self.limiter = HostRateLimiter(host_rate, host_burst, host_concurrency)
         self.session = requests.Session()
+        # Enough pooled connections for every fetch thread to keep its connection alive
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -25,12 +413,18 @@ class HealthSafetyScraper:
         
     def fetch_page(self, url, retries=3):
         """Fetch a single page with error handling and retries"""
+        response = self.fetch_response(url, retries=retries)
+        return response.text if response is not None else None
+        
+    def fetch_response(self, url, headers=None, retries=3):
+        """Fetch a URL, returning the response (200 or 304 for conditional requests) or None"""
         for attempt in range(retries):
             try:
-                logger.info(f"Fetching: {url} (attempt {attempt + 1})")
-                response = self.session.get(url, timeout=15)
+                with self.limiter.slot(url):
+                    logger.info(f"Fetching: {url} (attempt {attempt + 1})")
+                    response = self.session.get(url, headers=headers, timeout=15)
                 response.raise_for_status()
-                return response.text
+                return response
             except requests.exceptions.RequestException as e:
                 logger.warning(f"Error fetching {url} (attempt {attempt + 1}): {e}")
                 if attempt < retries - 1:
@@ -39,35 +433,95 @@ class HealthSafetyScraper:
                     logger.error(f"Failed to fetch {url} after {retries} attempts")
                     return None
                     
-    def extract_links_constructionnews(self, html, base_url):
-        """Extract h2 a href links from Construction News"""
-        soup = BeautifulSoup(html, 'html.parser')
+    def parse_html(self, html):
+        """Build the DOM for a page with the configured parser backend"""
+        if self.parser != 'lxml':
+            return BeautifulSoup(html, self.parser)
+        try:
+            return lxml.html.document_fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode('utf-8'))
+        except etree.ParserError:
+            return None
+            
+    def _select(self, selectors):
+        """Compiled XPath for a selector list, built once per scraper"""
+        key = tuple(selectors)
+        if key not in self._xpaths:
+            self._xpaths[key] = compile_selectors(selectors)
+        return self._xpaths[key]
+        
+    def _anchors(self, html, selectors):
+        """
+        (href, title) of the elements matching each selector in turn, so the
+        links of the first selector come first, as the site configs rank them
+        """
+        tree = self.parse_html(html)
+        if tree is None:
+            return []
+        anchors = []
+        for selector in selectors:
+            if self.parser == 'lxml':
+                anchors.extend((a.get('href'), element_text(a)) for a in self._select([selector])(tree))
+            else:
+                anchors.extend((a.get('href'), a.get_text(strip=True)) for a in tree.select(selector))
+        return anchors
+        
+    def _first_anchors(self, html, container):
+        """(href, title) of the first <a href> inside each `container` element"""
+        tree = self.parse_html(html)
+        if tree is None:
+            return []
+        anchors = []
+        if self.parser == 'lxml':
+            for element in tree.iter(container):
+                a = next(iter(element.iterfind('.//a[@href]')), None)
+                if a is not None:
+                    anchors.append((a.get('href'), element_text(a)))
+        else:
+            for element in tree.find_all(container):
+                a = element.find('a', href=True)
+                if a is not None:
+                    anchors.append((a['href'], a.get_text(strip=True)))
+        return anchors
+        
+    def _extract_links(self, html, base_url, selectors, source, accept=None, anchors=None):
+        """
+        Collect article links matching `selectors` in selector priority order
+        (or from precomputed `anchors`), dropping duplicate URLs with a set
+        """
+        scraped_at = datetime.now().isoformat()
         links = []
+        seen = set()
         
-        # Find all h2 elements with anchor tags
-        h2_elements = soup.find_all('h2')
-        for h2 in h2_elements:
-            a_tag = h2.find('a', href=True)
-            if a_tag:
-                title = a_tag.get_text(strip=True)
-                url = urljoin(base_url, a_tag['href'])
-                
-                # Skip non-article links
-                if title and '/health-and-safety/' in url:
-                    links.append({
-                        'title': title,
-                        'url': url,
-                        'source': 'constructionnews',
-                        'scraped_at': datetime.now().isoformat()
-                    })
+        if anchors is None:
+            anchors = self._anchors(html, selectors)
+        for href, title in anchors:
+            if not href:
+                continue
+            url = urljoin(base_url, href)
+            
+            if title and url not in seen and (accept is None or accept(title, url)):
+                seen.add(url)
+                links.append({
+                    'title': title,
+                    'url': url,
+                    'source': source,
+                    'scraped_at': scraped_at
+                })
         
         return links
         
+    def extract_links_constructionnews(self, html, base_url):
+        """Extract h2 a href links from Construction News"""
+        # The first link of each h2 is the headline; skip non-article links
+        return self._extract_links(html, base_url, None, 'constructionnews',
+                                   accept=lambda title, url: '/health-and-safety/' in url,
+                                   anchors=self._first_anchors(html, 'h2'))
+        
     def extract_links_bbc(self, html, base_url):
         """Extract BBC topic links with specific class structure"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-        
         # Try multiple BBC selectors as their structure may vary
         selectors = [
             'div.liverpool-card div.anchor-inner-wrapper a',
@@ -75,29 +529,10 @@ class HealthSafetyScraper:
             'article a',
             '.media__link'
         ]
-        
-        for selector in selectors:
-            elements = soup.select(selector)
-            for a_tag in elements:
-                if a_tag.get('href'):
-                    title = a_tag.get_text(strip=True)
-                    url = urljoin(base_url, a_tag['href'])
-                    
-                    if title and url not in [link['url'] for link in links]:
-                        links.append({
-                            'title': title,
-                            'url': url,
-                            'source': 'bbc',
-                            'scraped_at': datetime.now().isoformat()
-                        })
-        
-        return links
+        return self._extract_links(html, base_url, selectors, 'bbc')
         
     def extract_links_hse_network(self, html, base_url):
         """Extract article links from HSE Network"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-        
         # Look for article elements and various link patterns
         selectors = [
             'article a[href]',
@@ -105,33 +540,12 @@ class HealthSafetyScraper:
             'h2 a[href]',
             'h3 a[href]'
         ]
-        
-        for selector in selectors:
-            elements = soup.select(selector)
-            for a_tag in elements:
-                title = a_tag.get_text(strip=True)
-                url = urljoin(base_url, a_tag['href'])
-                
-                # Filter out navigation and non-article links
-                if (title and 
-                    len(title) > 10 and  # Reasonable title length
-                    url not in [link['url'] for link in links] and
-                    'hse-network.com' in url):
-                    
-                    links.append({
-                        'title': title,
-                        'url': url,
-                        'source': 'hse-network',
-                        'scraped_at': datetime.now().isoformat()
-                    })
-        
-        return links
+        # Filter out navigation and non-article links
+        return self._extract_links(html, base_url, selectors, 'hse-network',
+                                   accept=lambda title, url: len(title) > 10 and 'hse-network.com' in url)
         
     def extract_links_hse_press(self, html, base_url):
         """Extract h2 a href links from HSE Press"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = []
-        
         # Look for article titles and links
         selectors = [
             'h2 a[href]',
@@ -139,58 +553,56 @@ class HealthSafetyScraper:
             'article h2 a[href]',
             'h3 a[href]'
         ]
-        
-        for selector in selectors:
-            elements = soup.select(selector)
-            for a_tag in elements:
-                title = a_tag.get_text(strip=True)
-                url = urljoin(base_url, a_tag['href'])
-                
-                if (title and 
-                    url not in [link['url'] for link in links] and
-                    'press.hse.gov.uk' in url):
-                    
-                    links.append({
-                        'title': title,
-                        'url': url,
-                        'source': 'hse-press',
-                        'scraped_at': datetime.now().isoformat()
-                    })
-        
-        return links
+        return self._extract_links(html, base_url, selectors, 'hse-press',
+                                   accept=lambda title, url: 'press.hse.gov.uk' in url)
         
     def fetch_article_content(self, url):
         """Fetch full article content with intelligent content extraction"""
         html = self.fetch_page(url)
         if not html:
             return None
+        return self.extract_article_text(html)
+        
+    def fetch_article_if_changed(self, url):
+        """
+        Conditionally fetch an article against the seen-URL index.
+        Returns its text only if it is new or changed since it was last
+        confirmed (see ScrapeIndex.confirm).
+        """
+        entry = self.index.get(url)
+        response = self.fetch_response(url, headers=self.index.validators(entry))
+        if response is None:
+            return None
+        if response.status_code == 304:
+            self.index.touch(url)
+            self._count('articles_not_modified')
+            return None
             
-        soup = BeautifulSoup(html, 'html.parser')
+        text = self.extract_article_text(response.text)
+        if not text:
+            return None
+        if not self.index.record(url, 'article', response, self.index.content_hash(text), pending=True):
+            self._count('articles_unchanged')
+            return None
+        self._count('articles_new_or_changed')
+        return text
+        
+    def extract_article_text(self, html):
+        """Extract the readable article text from a page"""
+        if self.parser == 'lxml':
+            return self._extract_article_text_lxml(html)
+        soup = self.parse_html(html)
         
         # Remove unwanted elements
-        for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 
-                           'noscript', 'iframe', '.advertisement', '.ads', 
-                           '.social-share', '.navigation', '.sidebar']):
+        for element in soup(UNWANTED_TAGS):
             element.decompose()
             
-        # Try to find main content area with various selectors
-        content_selectors = [
-            'article .content',
-            'article .post-content', 
-            'article .entry-content',
-            '.main-content article',
-            '.content article',
-            'article',
-            '.post-content',
-            '.entry-content',
-            '#content',
-            'main',
-            '.main'
-        ]
+        # One walk collects every candidate; they are then tried in selector priority order
+        candidates = soup.select(', '.join(CONTENT_SELECTORS))
         
         content = None
-        for selector in content_selectors:
-            content = soup.select_one(selector)
+        for selector in CONTENT_SELECTORS:
+            content = next((c for c in candidates if c.css.match(selector)), None)
             if content and len(content.get_text(strip=True)) > 100:
                 break
                 
@@ -207,46 +619,83 @@ class HealthSafetyScraper:
         
         return None
         
+    def _extract_article_text_lxml(self, html):
+        tree = self.parse_html(html)
+        if tree is None:
+            return None
+            
+        # drop_tree keeps the text that follows an element, as decompose() does
+        for element in list(tree.iter(*UNWANTED_TAGS)):
+            element.drop_tree()
+            
+        # One walk collects every candidate; they are then tried in selector priority order
+        candidates = self._select(CONTENT_SELECTORS)(tree)
+        content = None
+        for selector, matches in self._content_matchers:
+            content = next((c for c in candidates if matches(c)), None)
+            if content is not None and len(element_text(content)) > 100:
+                break
+                
+        if content is None:
+            # Fallback to body but try to exclude headers/footers
+            content = tree.find('body')
+            
+        if content is not None:
+            return ' '.join(element_text(content, ' ').split())
+        return None
+        
+    def page_urls(self, site_config):
+        """Main page followed by any pagination pages of a site"""
+        urls = [site_config['url']]
+        for page in site_config.get('pagination', []):
+            if page == 1:  # Page 1 is the main page
+                continue
+                
+            if 'hse-network' in site_config['url']:
+                urls.append(f"{site_config['url']}page/{page}/")
+            elif 'press.hse.gov.uk' in site_config['url']:
+                urls.append(f"{site_config['url']}page/{page}/")
+        return urls
+        
+    def fetch_links(self, site_config, url):
+        """Fetch one listing page and extract its article links"""
+        if self.index is None:
+            html = self.fetch_page(url)
+            if not html:
+                return []
+            links = site_config['extractor'](html, url)
+        else:
+            entry = self.index.get(url)
+            response = self.fetch_response(url, headers=self.index.validators(entry))
+            if response is None:
+                return []
+            if response.status_code == 304 and entry and entry['links'] is not None:
+                # Unchanged listing: reuse the links extracted last time
+                self.index.touch(url)
+                self._count('pages_not_modified')
+                links = json.loads(entry['links'])
+            else:
+                links = site_config['extractor'](response.text, url)
+                self.index.record(url, 'listing', response, self.index.content_hash(response.text), links)
+        logger.info(f"Found {len(links)} links from {site_config['name']}: {url}")
+        return links
+        
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+        
     def scrape_site(self, site_config):
         """Scrape a single site with pagination support"""
-        all_links = []
-        
         logger.info(f"Scraping {site_config['name']}...")
         
-        # Scrape main page
-        html = self.fetch_page(site_config['url'])
-        if html:
-            links = site_config['extractor'](html, site_config['url'])
-            all_links.extend(links)
-            logger.info(f"Found {len(links)} links from {site_config['name']} main page")
-            
-            # Handle pagination if specified
-            if 'pagination' in site_config:
-                for page in site_config['pagination']:
-                    if page == 1:  # Skip page 1 as we already scraped it
-                        continue
-                        
-                    if 'hse-network' in site_config['url']:
-                        paginated_url = f"{site_config['url']}page/{page}/"
-                    elif 'press.hse.gov.uk' in site_config['url']:
-                        paginated_url = f"{site_config['url']}page/{page}/"
-                    else:
-                        continue
-                        
-                    logger.info(f"Scraping page {page}: {paginated_url}")
-                    html = self.fetch_page(paginated_url)
-                    if html:
-                        links = site_config['extractor'](html, paginated_url)
-                        all_links.extend(links)
-                        logger.info(f"Found {len(links)} links from page {page}")
-                        
-                    time.sleep(1)  # Be respectful to servers
-                    
+        all_links = []
+        for url in self.page_urls(site_config):
+            all_links.extend(self.fetch_links(site_config, url))
         return all_links
         
-    def scrape_all_sites(self, fetch_content=True, max_articles_per_site=10):
-        """Main scraping function for all sites"""
-        sites = [
+    def site_configs(self):
+        """Sites scraped by scrape_all_sites"""
+        return [
             {
                 'url': 'https://www.constructionnews.co.uk/health-and-safety/',
                 'extractor': self.extract_links_constructionnews,
@@ -271,32 +720,108 @@ class HealthSafetyScraper:
             }
         ]
         
-        all_links = []
+    def scrape_all_sites(self, fetch_content=True, max_articles_per_site=10, writer=None):
+        """
+        Main scraping function for all sites.
+        
+        All listing pages are fetched concurrently and article bodies are
+        queued as soon as the pages before them are in, so hosts are crawled
+        in parallel. Politeness is enforced per host by the rate limiter
+        instead of fixed sleeps. Links come back in the same site and page
+        order as a sequential crawl.
+        
+        With the seen-URL index enabled, requests are conditional, articles
+        scraped within refresh_after_hours are not requested, and only links
+        whose content is new or changed are returned. Returned articles stay
+        pending in the index, and are returned again by later runs, until
+        they are confirmed with self.index.confirm() after processing.
+        
+        With a ScrapeWriter, each article is written out as soon as its
+        content arrives and the returned content dict stays empty, so memory
+        does not grow with the number of articles.
+        """
+        self.stats = {}
+        incremental = self.index is not None
+        fetch_article = self.fetch_article_if_changed if incremental else self.fetch_article_content
+        sites = self.site_configs()
+        site_pages = []
+        next_page = [0] * len(sites)
+        queued = [0] * len(sites)
         articles_content = {}
+        content_urls = set()
+        submitted_urls = set()
+        pending = {}
         
-        for site in sites:
-            try:
-                site_links = self.scrape_site(site)
-                all_links.extend(site_links)
-                
-                # Fetch content for articles if requested
-                if fetch_content:
-                    # Limit articles per site to avoid overwhelming servers
-                    limited_links = site_links[:max_articles_per_site]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            
+            def queue_articles(i):
+                # Article slots follow link order, so only pages whose predecessors are done can fill them
+                pages = site_pages[i]
+                while next_page[i] < len(pages) and pages[next_page[i]] is not None:
+                    for link in pages[next_page[i]]:
+                        if queued[i] >= max_articles_per_site:
+                            break
+                        if incremental and self.index.is_fresh(link['url'], self.refresh_after):
+                            # Recently scraped: no request, and the slot goes to the next link
+                            self._count('articles_skipped_fresh')
+                            continue
+                        queued[i] += 1
+                        if link['url'] not in submitted_urls:
+                            submitted_urls.add(link['url'])
+                            logger.info(f"Queueing content {queued[i]}/{max_articles_per_site} from {sites[i]['name']}: {link['title'][:50]}...")
+                            pending[pool.submit(fetch_article, link['url'])] = ('article', i, link)
+                    next_page[i] += 1
+            
+            for i, site in enumerate(sites):
+                logger.info(f"Scraping {site['name']}...")
+                urls = self.page_urls(site)
+                site_pages.append([None] * len(urls))
+                for p, url in enumerate(urls):
+                    pending[pool.submit(self.fetch_links, site, url)] = ('page', i, p)
                     
-                    for i, link in enumerate(limited_links):
-                        logger.info(f"Fetching content {i+1}/{len(limited_links)} from {site['name']}: {link['title'][:50]}...")
-                        content = self.fetch_article_content(link['url'])
-                        if content:
-                            articles_content[link['url']] = content
-                        time.sleep(2)  # Be respectful to servers
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, i, key = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error scraping {sites[i]['name']}: {e}")
+                        result = [] if kind == 'page' else None
                         
-                time.sleep(3)  # Pause between sites
-                
-            except Exception as e:
-                logger.error(f"Error scraping {site['name']}: {e}")
-                continue
-                
+                    if kind == 'page':
+                        site_pages[i][key] = result
+                        if fetch_content:
+                            queue_articles(i)
+                    elif result:
+                        content_urls.add(key['url'])
+                        if writer is not None:
+                            writer.write_article(key, result)
+                        else:
+                            articles_content[key['url']] = result
+                        
+        all_links = [link for pages in site_pages for links in pages for link in links]
+        # Completion order is arbitrary; keep the saved content in link order
+        articles_content = {link['url']: articles_content[link['url']]
+                            for link in all_links if link['url'] in articles_content}
+        
+        if incremental:
+            # Emit only new or changed articles downstream, once each
+            new_links = []
+            emitted = set()
+            for link in all_links:
+                if link['url'] in content_urls and link['url'] not in emitted:
+                    emitted.add(link['url'])
+                    new_links.append(link)
+            all_links = new_links
+            logger.info(f"Incremental scrape: {len(all_links)} new or changed articles, stats: {self.stats}")
+        elif writer is not None:
+            # Links whose content was not fetched follow the streamed articles
+            written = set(content_urls)
+            for link in all_links:
+                if link['url'] not in written:
+                    written.add(link['url'])
+                    writer.write_article(link)
         return all_links, articles_content
         
     def convert_to_xml(self, links, articles_content):
@@ -328,31 +853,11 @@ class HealthSafetyScraper:
         return ET.tostring(root, encoding='unicode')
         
     def save_data(self, links, articles_content, filename_base='health_safety_news'):
-        """Save data in multiple formats"""
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Save as XML for Gemini processing
-        xml_output = self.convert_to_xml(links, articles_content)
-        xml_filename = f'{filename_base}_{timestamp}.xml'
-        with open(xml_filename, 'w', encoding='utf-8') as f:
-            f.write(xml_output)
-        logger.info(f"XML data saved to {xml_filename}")
-        
-        # Save as JSON for easier processing
-        json_data = {
-            'scraped_at': datetime.now().isoformat(),
-            'total_links': len(links),
-            'total_articles_with_content': len(articles_content),
-            'links': links,
-            'articles_content': articles_content
-        }
-        
-        json_filename = f'{filename_base}_{timestamp}.json'
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-        logger.info(f"JSON data saved to {json_filename}")
-        
-        return xml_filename, json_filename
+        """Save already collected data as XML and JSONL, one article at a time"""
+        with ScrapeWriter(filename_base) as writer:
+            for link in links:
+                writer.write_article(link, articles_content.get(link['url']))
+        return writer.xml_filename, writer.jsonl_filename
 
 # Usage example and testing
 if __name__ == "__main__":
@@ -360,24 +865,23 @@ if __name__ == "__main__":
     
     # Test with limited articles first
     print("Starting health & safety news scraping...")
-    print("This will take several minutes to complete respectfully...")
+    print("Sites are crawled in parallel with per-host rate limits...")
     
     try:
-        # Get all links and fetch content for first 5 articles per site
-        all_links, articles_content = scraper.scrape_all_sites(
-            fetch_content=True, 
-            max_articles_per_site=5
-        )
-        
-        # Save the data
-        xml_file, json_file = scraper.save_data(all_links, articles_content)
+        # Get all links and stream content for the first 5 articles per site to disk
+        with ScrapeWriter() as writer:
+            all_links, _ = scraper.scrape_all_sites(
+                fetch_content=True, 
+                max_articles_per_site=5,
+                writer=writer
+            )
         
         # Print summary
         print(f"\n=== SCRAPING COMPLETE ===")
         print(f"Total links found: {len(all_links)}")
-        print(f"Articles with content: {len(articles_content)}")
-        print(f"XML file: {xml_file}")
-        print(f"JSON file: {json_file}")
+        print(f"Articles with content: {writer.articles_with_content}")
+        print(f"XML file: {writer.xml_filename}")
+        print(f"JSONL file: {writer.jsonl_filename}")
         
         # Show sample of what was found
         print(f"\nSample links by source:")